@@ -0,0 +1,142 @@
+"""End to end benchmark of poll cycles against the simulated inverter.
+
+Starts benchmarks.simulator in process and polls it through the connection,
+hub and coordinator of the integration. Reports the wall time and number of
+requests of a poll cycle reading all blocks, and the time it takes to poll
+successfully again after the inverter was unreachable.
+
+Run from the repository root with the integration requirements installed:
+
+    python -m benchmarks.bench_cycle --latency 0.02 --jitter 0.01 --followers 1
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+import statistics
+import time
+
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from custom_components.solaredge_modbus import (
+    SolaredgeModbusCoordinator,
+    SolaredgeModbusHub,
+)
+from custom_components.solaredge_modbus.connection import SolaredgeModbusConnection
+
+from .simulator import DEFAULT_FIXTURE, SunSpecSimulator, load_fixture
+
+# Delay between poll attempts while the inverter is unreachable
+RETRY_DELAY = 0.1
+
+
+def create_coordinator(args, connection) -> SolaredgeModbusCoordinator:
+    """Create a coordinator polling the simulated units."""
+    return SolaredgeModbusCoordinator(
+        None,
+        None,
+        SolaredgeModbusHub(connection, 1),
+        "bench",
+        scan_interval=10,
+        power_control=True,
+        read_meter1=args.meters >= 1,
+        read_meter2=args.meters >= 2,
+        read_meter3=args.meters >= 3,
+        read_battery1=args.batteries >= 1,
+        read_battery2=args.batteries >= 2,
+        read_battery3=args.batteries >= 3,
+        followers=[
+            SolaredgeModbusHub(connection, unit)
+            for unit in range(2, args.followers + 2)
+        ],
+    )
+
+
+async def poll(coordinator: SolaredgeModbusCoordinator) -> None:
+    """Run a poll cycle reading all tiers."""
+    coordinator._next_poll = dict.fromkeys(coordinator._next_poll, 0.0)
+    await coordinator._async_update_data()
+
+
+async def bench(args) -> None:
+    """Run the benchmark."""
+    simulator = SunSpecSimulator(
+        load_fixture(args.fixture),
+        port=args.port,
+        units=tuple(range(1, args.followers + 2)),
+        meters=args.meters,
+        batteries=args.batteries,
+        latency=args.latency,
+        jitter=args.jitter,
+        drop=args.drop,
+    )
+    await simulator.start()
+    connection = SolaredgeModbusConnection(
+        "127.0.0.1", args.port, args.timeout, args.pipeline_depth
+    )
+    coordinator = create_coordinator(args, connection)
+    try:
+        await coordinator._async_setup()
+
+        durations = []
+        requests = []
+        failed = 0
+        for _ in range(args.cycles):
+            start_requests = simulator.requests
+            start = time.perf_counter()
+            try:
+                await poll(coordinator)
+            except UpdateFailed:
+                failed += 1
+                continue
+            durations.append(time.perf_counter() - start)
+            requests.append(simulator.requests - start_requests)
+
+        if durations:
+            print(
+                f"poll cycle: median {statistics.median(durations) * 1e3:.1f} ms, "
+                f"min {min(durations) * 1e3:.1f} ms, "
+                f"max {max(durations) * 1e3:.1f} ms, "
+                f"{statistics.mean(requests):.1f} requests"
+            )
+        print(f"failed cycles: {failed} of {args.cycles}, {simulator.dropped} dropped")
+
+        await simulator.restart(args.downtime)
+        start = time.perf_counter()
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                await poll(coordinator)
+                break
+            except UpdateFailed:
+                await asyncio.sleep(RETRY_DELAY)
+        print(
+            f"recovery: {(time.perf_counter() - start) * 1e3:.1f} ms "
+            f"after {args.downtime} s downtime, {attempts} attempts"
+        )
+    finally:
+        await connection.close()
+        await simulator.stop()
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixture", type=Path, default=DEFAULT_FIXTURE)
+    parser.add_argument("--port", type=int, default=15020)
+    parser.add_argument("--cycles", type=int, default=50)
+    parser.add_argument("--followers", type=int, default=0)
+    parser.add_argument("--meters", type=int, choices=range(4), default=1)
+    parser.add_argument("--batteries", type=int, choices=range(4), default=1)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--drop", type=float, default=0.0)
+    parser.add_argument("--timeout", type=float, default=1.0)
+    parser.add_argument("--pipeline-depth", type=int, default=1)
+    parser.add_argument("--downtime", type=float, default=1.0)
+    asyncio.run(bench(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+"""Benchmark of the decode path on captured register blocks.
+
+Feeds the register blocks of a fixture (see benchmarks.capture) into the
+decode methods of the hub and runs whole poll cycles against an in-process
+connection serving the fixture, so no inverter is needed. Reports for every
+block the decode time and the peak memory allocated by one decode, and the
+CPU time of a poll cycle. Decoding the inverter block and the little endian
+word order storage block with BinaryPayloadDecoder, value by value and with
+decode_many, is included as reference.
+
+Run from the repository root with the integration requirements installed:
+
+    python -m benchmarks.bench_decode [fixture] [--save] [--compare]
+
+--save stores the results next to the fixture in benchmarks/results, a later
+run with --compare exits non-zero when a result got slower than the stored
+one by more than the tolerance. Results are only comparable on the same
+machine. The decoded values of the fixture are checked by the tests:
+
+    python -m pytest tests
+"""
+
+import argparse
+import asyncio
+from functools import partial
+import json
+from pathlib import Path
+from struct import calcsize
+import sys
+import time
+import timeit
+import tracemalloc
+
+from custom_components.solaredge_modbus import (
+    INVERTER_DECODER,
+    SolaredgeModbusCoordinator,
+    SolaredgeModbusHub,
+)
+from custom_components.solaredge_modbus.const import (
+    INVERTER_REGISTERS,
+    STORAGE_REGISTERS,
+)
+from custom_components.solaredge_modbus.decoder import calculate_value
+from custom_components.solaredge_modbus.metrics import ConnectionMetrics
+from custom_components.solaredge_modbus.payload import BinaryPayloadDecoder, Endian
+
+BENCHMARKS = Path(__file__).parent
+DEFAULT_FIXTURE = BENCHMARKS / "fixtures" / "sample_inverter_meter_battery.json"
+RESULTS = BENCHMARKS / "results"
+
+ROUNDS = 2000
+CYCLES = 200
+MIN_REGRESSION_US = 2
+
+
+class FixtureResponse:
+    """Response to a read of the fixture registers."""
+
+    def __init__(self, registers) -> None:
+        """Initialize the response, None for an illegal address."""
+        self.registers = registers or []
+        self._error = registers is None
+
+    def isError(self) -> bool:
+        """Return True when the registers were not in the fixture."""
+        return self._error
+
+
+class FixtureConnection:
+    """Connection serving the registers of a fixture."""
+
+    def __init__(self, fixture) -> None:
+        """Initialize the connection."""
+        self.unit = fixture["unit"]
+        self.metrics = ConnectionMetrics()
+        self.registers = {}
+        for block in fixture["blocks"]:
+            for offset, value in enumerate(block["registers"]):
+                self.registers[block["address"] + offset] = value
+
+    async def check_and_reconnect(self):
+        return True
+
+    async def close(self):
+        """Nothing to close."""
+
+    async def read_holding_registers(
+        self, unit, address, count, priority=None, retries=None
+    ):
+        """Read registers of the fixture."""
+        try:
+            registers = [self.registers[address + i] for i in range(count)]
+        except KeyError:
+            registers = None
+        return FixtureResponse(registers if unit == self.unit else None)
+
+
+def payload_format(fields) -> str:
+    """Return the decode_many format of the fields of a block, in offset order."""
+    fmt = ""
+    position = 0
+    for field in sorted(fields, key=lambda field: field.offset):
+        if field.offset > position:
+            fmt += f"{(field.offset - position) * 2}x"
+        fmt += field.fmt
+        position = field.offset + calcsize(f">{field.fmt}") // 2
+    return fmt
+
+
+INVERTER_FORMAT = payload_format(INVERTER_REGISTERS)
+INVERTER_KEYS = [
+    field.key for field in sorted(INVERTER_REGISTERS, key=lambda field: field.offset)
+]
+STORAGE_FORMAT = payload_format(STORAGE_REGISTERS)
+
+PAYLOAD_DECODE = {
+    "H": BinaryPayloadDecoder.decode_16bit_uint,
+    "h": BinaryPayloadDecoder.decode_16bit_int,
+    "I": BinaryPayloadDecoder.decode_32bit_uint,
+    "Q": BinaryPayloadDecoder.decode_64bit_uint,
+    "f": BinaryPayloadDecoder.decode_32bit_float,
+}
+
+
+def scale_inverter(raw):
+    """Scale the raw values of the inverter block like the hub."""
+    data = {}
+    for field in INVERTER_REGISTERS:
+        if not field.output:
+            continue
+        value = raw[field.key]
+        if field.sf is not None:
+            value = calculate_value(value, raw[field.sf])
+        if field.scale is not None:
+            value = round(value * field.scale, field.digits)
+        data[field.key] = value
+    return data
+
+
+def payload_decode_inverter(registers):
+    """Decode the inverter block value by value with BinaryPayloadDecoder."""
+    decoder = BinaryPayloadDecoder.fromRegisters(
+        registers, byteorder=Endian.BIG, wordorder=Endian.BIG
+    )
+    raw = {}
+    for field in INVERTER_REGISTERS:
+        decoder.reset()
+        decoder.skip_bytes(field.offset * 2)
+        raw[field.key] = PAYLOAD_DECODE[field.fmt](decoder)
+    return scale_inverter(raw)
+
+
+def payload_decode_many_inverter(registers):
+    """Decode the inverter block at once with BinaryPayloadDecoder.decode_many."""
+    decoder = BinaryPayloadDecoder.fromRegisters(
+        registers, byteorder=Endian.BIG, wordorder=Endian.BIG
+    )
+    return scale_inverter(
+        dict(zip(INVERTER_KEYS, decoder.decode_many(INVERTER_FORMAT)))
+    )
+
+
+def payload_decode_storage(registers):
+    """Decode the raw values of the storage block value by value."""
+    decoder = BinaryPayloadDecoder.fromRegisters(
+        registers, byteorder=Endian.BIG, wordorder=Endian.LITTLE
+    )
+    values = []
+    for field in sorted(STORAGE_REGISTERS, key=lambda field: field.offset):
+        decoder.reset()
+        decoder.skip_bytes(field.offset * 2)
+        values.append(PAYLOAD_DECODE[field.fmt](decoder))
+    return tuple(values)
+
+
+def payload_decode_many_storage(registers):
+    """Decode the raw values of the storage block at once with decode_many."""
+    decoder = BinaryPayloadDecoder.fromRegisters(
+        registers, byteorder=Endian.BIG, wordorder=Endian.LITTLE
+    )
+    return decoder.decode_many(STORAGE_FORMAT)
+
+
+def block_benchmarks(hub, blocks):
+    """Return the decode function of every block of the fixture."""
+    benchmarks = {}
+    if "inverter" in blocks:
+        benchmarks["inverter (payload decoder)"] = partial(
+            payload_decode_inverter, blocks["inverter"]
+        )
+        benchmarks["inverter (decode_many)"] = partial(
+            payload_decode_many_inverter, blocks["inverter"]
+        )
+        benchmarks["inverter"] = partial(
+            hub.decode_modbus_data_inverter, blocks["inverter"]
+        )
+    if "power_limit" in blocks:
+        benchmarks["power_limit"] = partial(
+            hub.decode_modbus_power_limit, blocks["power_limit"]
+        )
+    for meter in ("m1", "m2", "m3"):
+        if meter in blocks:
+            benchmarks[meter] = partial(
+                hub.decode_modbus_data_meter, meter + "_", blocks[meter]
+            )
+        if meter + "_energy" in blocks:
+            benchmarks[meter + "_energy"] = partial(
+                hub.decode_modbus_data_meter_energy,
+                meter + "_",
+                blocks[meter + "_energy"],
+            )
+    if "storage" in blocks:
+        benchmarks["storage (payload decoder)"] = partial(
+            payload_decode_storage, blocks["storage"]
+        )
+        benchmarks["storage (decode_many)"] = partial(
+            payload_decode_many_storage, blocks["storage"]
+        )
+        benchmarks["storage"] = partial(
+            hub.decode_modbus_data_storage, blocks["storage"], True
+        )
+    for battery in ("battery1", "battery2", "battery3"):
+        for suffix, decode in (
+            ("_info", hub.decode_modbus_data_battery_info),
+            ("_state", hub.decode_modbus_data_battery_state),
+            ("", hub.decode_modbus_data_battery),
+        ):
+            if battery + suffix in blocks:
+                benchmarks[battery + suffix] = partial(
+                    decode, battery + "_", blocks[battery + suffix]
+                )
+    return benchmarks
+
+
+def allocated(func) -> int:
+    """Return the peak memory in bytes allocated by one call of func."""
+    func()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - before
+
+
+def create_coordinator(fixture, connection) -> SolaredgeModbusCoordinator:
+    """Create a coordinator reading the blocks present in the fixture."""
+    keys = {block["key"] for block in fixture["blocks"]}
+    return SolaredgeModbusCoordinator(
+        None,
+        None,
+        SolaredgeModbusHub(connection, fixture["unit"]),
+        "bench",
+        scan_interval=10,
+        power_control="power_limit" in keys,
+        read_meter1="m1" in keys,
+        read_meter2="m2" in keys,
+        read_meter3="m3" in keys,
+        read_battery1="battery1" in keys,
+        read_battery2="battery2" in keys,
+        read_battery3="battery3" in keys,
+    )
+
+
+def cycle_time(fixture) -> float:
+    """Return the CPU time in seconds of a poll cycle reading all tiers."""
+    coordinator = create_coordinator(fixture, FixtureConnection(fixture))
+
+    async def cycles():
+        for _ in range(CYCLES):
+            coordinator._next_poll = dict.fromkeys(coordinator._next_poll, 0.0)
+            if not await coordinator.read_modbus_data():
+                sys.exit("Poll cycle failed on the fixture")
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(cycles())
+        start = time.process_time()
+        loop.run_until_complete(cycles())
+        return (time.process_time() - start) / CYCLES
+    finally:
+        loop.close()
+
+
+def run(fixture) -> dict[str, dict[str, float]]:
+    """Run all benchmarks on a fixture."""
+    blocks = {block["key"]: block["registers"] for block in fixture["blocks"]}
+    hub = SolaredgeModbusHub(FixtureConnection(fixture), fixture["unit"])
+    results = {}
+    for name, func in block_benchmarks(hub, blocks).items():
+        seconds = min(timeit.repeat(func, number=ROUNDS, repeat=5)) / ROUNDS
+        results[name] = {"time_us": seconds * 1e6, "bytes": allocated(func)}
+    results["poll cycle"] = {"time_us": cycle_time(fixture) * 1e6}
+
+    # The reference decoder must agree with the hub
+    if "inverter" in blocks:
+        expected = INVERTER_DECODER.decode(blocks["inverter"])
+        for decode in (payload_decode_inverter, payload_decode_many_inverter):
+            if decode(blocks["inverter"]) != expected:
+                sys.exit("Payload decoder and block decoder disagree")
+    if "storage" in blocks and payload_decode_many_storage(
+        blocks["storage"]
+    ) != payload_decode_storage(blocks["storage"]):
+        sys.exit("decode_many and the payload decoder disagree")
+    return results
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("fixture", nargs="?", type=Path, default=DEFAULT_FIXTURE)
+    parser.add_argument("--save", action="store_true", help="store the results")
+    parser.add_argument(
+        "--compare", action="store_true", help="compare with the stored results"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed slowdown for --compare (default 0.25)",
+    )
+    args = parser.parse_args()
+
+    fixture = json.loads(args.fixture.read_text())
+    results = run(fixture)
+    stored_path = RESULTS / args.fixture.name
+    stored = json.loads(stored_path.read_text()) if stored_path.exists() else {}
+
+    regressions = []
+    for name, result in results.items():
+        line = f"{name:>26}: {result['time_us']:8.2f} us"
+        if "bytes" in result:
+            line += f" {result['bytes']:7d} bytes"
+        if name in stored:
+            change = result["time_us"] / stored[name]["time_us"] - 1
+            line += f" {change:+7.1%}"
+            # Ignore the timer noise of the shortest benchmarks
+            slower = result["time_us"] - stored[name]["time_us"]
+            if change > args.tolerance and slower > MIN_REGRESSION_US:
+                regressions.append(name)
+        print(line)
+
+    if args.save:
+        RESULTS.mkdir(exist_ok=True)
+        stored_path.write_text(json.dumps(results, indent=1) + "\n")
+        print(f"Saved results to {stored_path}")
+    if args.compare:
+        if not stored:
+            sys.exit(f"No stored results in {stored_path}")
+        if regressions:
+            sys.exit(f"Slower than stored results: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Microbenchmark of scale factor application.
+
+Compares applying a SunSpec scale factor value by value with
+calculate_value() to the batched scale_values() used by the block decoders.
+
+Run from the repository root with the integration requirements installed:
+
+    python -m benchmarks.bench_scaling
+"""
+
+import random
+import timeit
+
+from custom_components.solaredge_modbus.decoder import calculate_value, scale_values
+
+ROUNDS = 20000
+
+# Value groups of a meter block as (number of values, scale factor)
+METER_GROUPS = [(4, -2), (8, -1), (1, -2), (4, 1), (4, 1), (4, 1), (4, -3)]
+METER_GROUPS += [(8, 0), (8, 0), (16, 0)]
+
+
+def main():
+    """Run the benchmark."""
+    random.seed(0)
+    groups = [
+        ([random.randrange(-30000, 30000) for _ in range(count)], sf)
+        for count, sf in METER_GROUPS
+    ]
+    values = sum(count for count, _ in METER_GROUPS)
+
+    def per_value():
+        for raw, sf in groups:
+            [calculate_value(value, sf) for value in raw]
+
+    def batched():
+        for raw, sf in groups:
+            scale_values(raw, sf)
+
+    results = {}
+    for name, func in (("per value", per_value), ("batched", batched)):
+        results[name] = min(timeit.repeat(func, number=ROUNDS, repeat=5)) / ROUNDS
+        print(
+            f"{name:>10}: {results[name] * 1e6:7.2f} us per meter block, "
+            f"{results[name] / values * 1e9:6.1f} ns per value"
+        )
+    print(f"   speedup: {results['per value'] / results['batched']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Capture the register blocks of an inverter into a benchmark fixture.
+
+Reads every register block the integration polls from a live inverter once
+and writes them as JSON, for use by the decode benchmark:
+
+    python -m benchmarks.capture 192.168.1.10 --meter 1 --battery 1 \
+        > benchmarks/fixtures/my_inverter.json
+
+Blocks the inverter rejects are left out of the fixture.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+from pymodbus.client import AsyncModbusTcpClient
+
+from custom_components.solaredge_modbus import (
+    BATTERY_BLOCKS,
+    DEVICE_INFO_DECODER,
+    INVERTER_BLOCK,
+    METER_BLOCKS,
+    POWER_LIMIT_BLOCK,
+    STORAGE_BLOCK,
+)
+from custom_components.solaredge_modbus.planner import RegisterBlock
+
+
+def capture_blocks(args) -> list[RegisterBlock]:
+    """Return the blocks to capture."""
+    blocks = [
+        RegisterBlock("device_info", 40004, DEVICE_INFO_DECODER.count),
+        INVERTER_BLOCK,
+    ]
+    for meter in args.meter:
+        blocks.extend(METER_BLOCKS[f"m{meter}_"])
+    if args.meter or args.battery:
+        blocks.append(STORAGE_BLOCK)
+    for battery in args.battery:
+        blocks.extend(BATTERY_BLOCKS[f"battery{battery}_"])
+    if args.power_limit:
+        blocks.append(POWER_LIMIT_BLOCK)
+    return blocks
+
+
+async def capture(args) -> dict:
+    """Read the blocks from the inverter."""
+    client = AsyncModbusTcpClient(host=args.host, port=args.port, timeout=5)
+    if not await client.connect():
+        sys.exit(f"Not able to connect to {args.host}:{args.port}")
+
+    fixture = {
+        "description": f"Captured from unit {args.unit} at {args.host}",
+        "unit": args.unit,
+        "blocks": [],
+    }
+    try:
+        for block in capture_blocks(args):
+            response = await client.read_holding_registers(
+                address=block.address, count=block.count, device_id=args.unit
+            )
+            if response.isError():
+                print(f"Skipped {block.key}: {response}", file=sys.stderr)
+                continue
+            fixture["blocks"].append(
+                {
+                    "key": block.key,
+                    "address": block.address,
+                    "registers": response.registers,
+                }
+            )
+    finally:
+        client.close()
+    return fixture
+
+
+def main():
+    """Capture a fixture."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("host")
+    parser.add_argument("--port", type=int, default=1502)
+    parser.add_argument("--unit", type=int, default=1)
+    parser.add_argument("--meter", type=int, action="append", default=[])
+    parser.add_argument("--battery", type=int, action="append", default=[])
+    parser.add_argument("--power-limit", action="store_true")
+    fixture = asyncio.run(capture(parser.parse_args()))
+    json.dump(fixture, sys.stdout, indent=1)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+"""Simulated SolarEdge inverter serving Modbus TCP on localhost.
+
+Serves the SunSpec register image of an inverter built from a fixture (see
+benchmarks.capture): the common block at 40000, the inverter model, up to
+three meters, the storage control block at 0xE000, up to three batteries at
+0xE100, 0xE200 and 0xE400 and the active power limit at 0xF001. Meters and
+batteries missing in the fixture are copies of the first one.
+
+Run from the repository root with the integration requirements installed:
+
+    python -m benchmarks.simulator --port 1502 --unit 1 --unit 2 \
+        --meters 2 --batteries 1 --latency 0.05 --jitter 0.02 --drop 0.01
+
+Every request is answered after the latency plus a random part of the jitter
+(seconds). A fraction --drop of the requests is never answered, and neither
+are requests for unit ids which are not simulated.
+"""
+
+import argparse
+import asyncio
+import json
+from pathlib import Path
+import random
+import struct
+
+from pymodbus.constants import ExcCodes
+from pymodbus.datastore import (
+    ModbusDeviceContext,
+    ModbusServerContext,
+    ModbusSparseDataBlock,
+)
+from pymodbus.exceptions import ModbusIOException, NoSuchIdException
+from pymodbus.pdu import ExceptionResponse
+from pymodbus.server import ModbusTcpServer
+from pymodbus.server.requesthandler import ServerRequestHandler
+from pymodbus.transaction import TransactionManager
+
+from custom_components.solaredge_modbus import BATTERY_BLOCKS, METER_BLOCKS
+
+DEFAULT_FIXTURE = (
+    Path(__file__).parent / "fixtures" / "sample_inverter_meter_battery.json"
+)
+
+SUNSPEC_ID = (0x5375, 0x6E53)  # "SunS"
+COMMON_MODEL = 1
+COMMON_LENGTH = 65
+INVERTER_MODEL = 103  # Three phase inverter
+INVERTER_LENGTH = 50
+METER_MODEL = 203  # Three phase meter
+METER_LENGTH = 105
+END_MODEL = 0xFFFF
+
+
+def string_registers(text: str, count: int) -> list[int]:
+    """Return text as count registers, padded with NUL."""
+    return list(struct.unpack(f">{count}H", text.encode().ljust(2 * count, b"\0")))
+
+
+def padded(registers: list[int], count: int) -> list[int]:
+    """Return registers padded with zeros to count registers."""
+    return registers + [0] * (count - len(registers))
+
+
+def build_image(fixture, unit: int, meters: int, batteries: int) -> dict[int, int]:
+    """Return the register image of a unit by address."""
+    blocks = {block["key"]: block["registers"] for block in fixture["blocks"]}
+    image = {}
+
+    def put(address: int, registers: list[int]) -> None:
+        image.update(zip(range(address, address + len(registers)), registers))
+
+    put(40000, [*SUNSPEC_ID, COMMON_MODEL, COMMON_LENGTH])
+    put(40004, padded(blocks["device_info"], COMMON_LENGTH - 1))
+    image[40068] = unit
+    put(40069, [INVERTER_MODEL, INVERTER_LENGTH])
+    put(40071, padded(blocks["inverter"], INVERTER_LENGTH))
+
+    address = 40071 + INVERTER_LENGTH
+    for meter in range(1, meters + 1):
+        meter_block, _energy_block = METER_BLOCKS[f"m{meter}_"]
+        # The meter data follows its common block, start the common block
+        # where the data of the integration is expected
+        common = meter_block.address - 2 - COMMON_LENGTH - 2
+        if common < address:
+            raise ValueError(f"Meter {meter} overlaps the preceding model")
+        put(common, [COMMON_MODEL, COMMON_LENGTH])
+        put(
+            common + 2,
+            string_registers("SolarEdge", 16)
+            + string_registers("WND-3Y-400-MB", 16)
+            + string_registers("Export+Import", 8)
+            + string_registers("0001", 8)
+            + string_registers(f"{unit}{meter:03d}5678", 16)
+            + [unit],
+        )
+        put(meter_block.address - 2, [METER_MODEL, METER_LENGTH])
+        put(
+            meter_block.address,
+            padded(
+                blocks.get(f"m{meter}", blocks["m1"])
+                + blocks.get(f"m{meter}_energy", blocks["m1_energy"]),
+                METER_LENGTH,
+            ),
+        )
+        address = meter_block.address + METER_LENGTH
+    put(address, [END_MODEL, 0])
+
+    put(0xE000, blocks["storage"])
+    for battery in range(1, batteries + 1):
+        info_block, battery_block, state_block = BATTERY_BLOCKS[f"battery{battery}_"]
+        put(info_block.address, blocks["battery1_info"])
+        put(
+            info_block.address + len(blocks["battery1_info"]),
+            [0]
+            * (
+                battery_block.address
+                - info_block.address
+                - len(blocks["battery1_info"])
+            ),
+        )
+        put(battery_block.address, blocks.get(f"battery{battery}", blocks["battery1"]))
+        put(
+            state_block.address,
+            blocks.get(f"battery{battery}_state", blocks["battery1_state"]),
+        )
+    put(0xF001, blocks.get("power_limit", [100]))
+    return image
+
+
+class SimulatedUnit(ModbusDeviceContext):
+    """Holding registers of a unit, answered with latency and drops."""
+
+    def __init__(self, image: dict[int, int], simulator: "SunSpecSimulator") -> None:
+        """Initialize the unit."""
+        # The device context adds 1 to every address
+        super().__init__(
+            hr=ModbusSparseDataBlock(
+                {address + 1: value for address, value in image.items()},
+                mutable=False,
+            )
+        )
+        self._simulator = simulator
+
+    async def _respond(self) -> None:
+        """Delay the response, or drop it."""
+        simulator = self._simulator
+        simulator.requests += 1
+        await asyncio.sleep(simulator.latency + random.uniform(0, simulator.jitter))
+        if random.random() < simulator.drop:
+            simulator.dropped += 1
+            # Requests of units which are not simulated are not answered
+            raise NoSuchIdException("Dropped response")
+
+    async def async_getValues(self, func_code, address, count=1):
+        """Return registers after the response delay."""
+        await self._respond()
+        return self.getValues(func_code, address, count)
+
+    async def async_setValues(self, func_code, address, values):
+        """Write registers after the response delay."""
+        await self._respond()
+        return self.setValues(func_code, address, values)
+
+
+class PipelinedRequestHandler(ServerRequestHandler):
+    """Handles every request of a client connection concurrently.
+
+    The pymodbus handler only keeps the last request received, requests
+    pipelined behind another one are lost.
+    """
+
+    def __init__(self, *args) -> None:
+        """Initialize the handler."""
+        super().__init__(*args)
+        self._tasks: set[asyncio.Task] = set()
+
+    def callback_data(self, data: bytes, addr: tuple | None = None) -> int:
+        """Handle all requests received."""
+        used_len = 0
+        while used_len < len(data):
+            try:
+                used = TransactionManager.callback_data(self, data[used_len:], addr)
+            except ModbusIOException:
+                self.server_send(ExceptionResponse(40, ExcCodes.ILLEGAL_FUNCTION), 0)
+                return len(data)
+            if not self.last_pdu:
+                break
+            used_len += used
+            task = self.loop.create_task(self._handle(self.last_pdu, self.last_addr))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return used_len
+
+    async def _handle(self, pdu, addr) -> None:
+        """Execute a request and send its response."""
+        try:
+            response = await pdu.update_datastore(self.server.context[pdu.dev_id])
+        except NoSuchIdException:
+            return
+        except Exception:  # noqa: BLE001
+            response = ExceptionResponse(pdu.function_code, ExcCodes.DEVICE_FAILURE)
+        response.transaction_id = pdu.transaction_id
+        response.dev_id = pdu.dev_id
+        self.server_send(response, addr)
+
+
+class SimulatorServer(ModbusTcpServer):
+    """Modbus TCP server answering pipelined requests."""
+
+    def callback_new_connection(self):
+        """Handle a new client connection."""
+        return PipelinedRequestHandler(
+            self, self.trace_packet, self.trace_pdu, self.trace_connect
+        )
+
+
+class SunSpecSimulator:
+    """Modbus TCP server simulating SolarEdge units."""
+
+    def __init__(
+        self,
+        fixture,
+        host: str = "127.0.0.1",
+        port: int = 1502,
+        units: tuple[int, ...] = (1,),
+        meters: int = 1,
+        batteries: int = 1,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        drop: float = 0.0,
+    ) -> None:
+        """Initialize the simulator."""
+        self.address = (host, port)
+        self.latency = latency
+        self.jitter = jitter
+        self.drop = drop
+        self.requests = 0
+        self.dropped = 0
+        self.units = {
+            unit: SimulatedUnit(build_image(fixture, unit, meters, batteries), self)
+            for unit in units
+        }
+        self._server: SimulatorServer | None = None
+
+    async def start(self) -> None:
+        """Start serving."""
+        self._server = SimulatorServer(
+            ModbusServerContext(devices=self.units, single=False),
+            address=self.address,
+        )
+        await self._server.serve_forever(background=True)
+
+    async def stop(self) -> None:
+        """Stop serving and close all connections."""
+        if self._server is not None:
+            await self._server.shutdown()
+            self._server = None
+
+    async def restart(self, downtime: float) -> None:
+        """Stop serving for downtime seconds, e.g. for a reboot of the inverter."""
+        await self.stop()
+        await asyncio.sleep(downtime)
+        await self.start()
+
+
+def load_fixture(path: Path) -> dict:
+    """Load a fixture."""
+    return json.loads(path.read_text())
+
+
+async def serve(args) -> None:
+    """Serve until interrupted."""
+    simulator = SunSpecSimulator(
+        load_fixture(args.fixture),
+        args.host,
+        args.port,
+        tuple(args.unit or [1]),
+        args.meters,
+        args.batteries,
+        args.latency,
+        args.jitter,
+        args.drop,
+    )
+    await simulator.start()
+    print(
+        f"Simulating units {', '.join(map(str, simulator.units))} on {args.host}:{args.port}"
+    )
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await simulator.stop()
+
+
+def main():
+    """Run the simulator."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixture", type=Path, default=DEFAULT_FIXTURE)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1502)
+    parser.add_argument("--unit", type=int, action="append")
+    parser.add_argument("--meters", type=int, choices=range(4), default=1)
+    parser.add_argument("--batteries", type=int, choices=range(4), default=1)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--drop", type=float, default=0.0)
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
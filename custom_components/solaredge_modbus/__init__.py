@@ -1,31 +1,47 @@
 """The SolarEdge Modbus Integration."""
 
 import asyncio
+from dataclasses import replace
 from datetime import timedelta
+from functools import cache, cached_property, partial
 import logging
-import operator
-from typing import cast
+import time
+from typing import Any, cast
 
-from pymodbus.client import AsyncModbusTcpClient
-from pymodbus.exceptions import ModbusException
+from pymodbus.exceptions import ModbusException, ModbusIOException
 import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, CONF_NAME, CONF_PORT, CONF_SCAN_INTERVAL
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import HomeAssistantError
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryNotReady
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
     DataUpdateCoordinator,
     UpdateFailed,
 )
 
+from .connection import (
+    TRANSPORT_ERRORS,
+    RetryBudget,
+    SolaredgeModbusConnection,
+    get_connection_pool,
+)
 from .const import (
+    BATTERY_INFO_REGISTERS,
+    BATTERY_REGISTERS,
     BATTERY_STATUSSES,
+    CONF_FAST_KEYS,
+    CONF_FAST_SCAN_INTERVAL,
+    CONF_FOLLOWER_ADDRESSES,
+    CONF_FORCE_REFRESH_INTERVAL,
+    CONF_IDLE_BATTERY_SCAN_INTERVAL,
     CONF_MAX_EXPORT_CONTROL_SITE_LIMIT,
     CONF_MODBUS_ADDRESS,
+    CONF_PIPELINE_DEPTH,
     CONF_POWER_CONTROL,
     CONF_READ_BATTERY1,
     CONF_READ_BATTERY2,
@@ -33,9 +49,18 @@ from .const import (
     CONF_READ_METER1,
     CONF_READ_METER2,
     CONF_READ_METER3,
+    CONF_SCAN_INTERVAL_MEDIUM,
+    CONF_SCAN_INTERVAL_SLOW,
+    CONF_SLEEP_SCAN_INTERVAL,
+    CONF_WRITE_DEBOUNCE,
+    DEFAULT_FAST_KEYS,
+    DEFAULT_FAST_SCAN_INTERVAL,
+    DEFAULT_FORCE_REFRESH_INTERVAL,
+    DEFAULT_IDLE_BATTERY_SCAN_INTERVAL,
     DEFAULT_MAX_EXPORT_CONTROL_SITE_LIMIT,
     DEFAULT_MODBUS_ADDRESS,
     DEFAULT_NAME,
+    DEFAULT_PIPELINE_DEPTH,
     DEFAULT_POWER_CONTROL,
     DEFAULT_READ_BATTERY1,
     DEFAULT_READ_BATTERY2,
@@ -44,14 +69,49 @@ from .const import (
     DEFAULT_READ_METER2,
     DEFAULT_READ_METER3,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_SCAN_INTERVAL_MEDIUM,
+    DEFAULT_SCAN_INTERVAL_SLOW,
+    DEFAULT_SLEEP_SCAN_INTERVAL,
+    DEFAULT_WRITE_DEBOUNCE,
+    DEVICE_INFO_REGISTERS,
     DOMAIN,
-    EXPORT_CONTROL_LIMIT_MODE,
-    EXPORT_CONTROL_MODE,
-    STORAGE_AC_CHARGE_POLICY,
-    STORAGE_CHARGE_DISCHARGE_MODE,
-    STORAGE_CONTROL_MODE,
+    EXPORT_CONTROL_REGISTERS,
+    INVERTER_REGISTERS,
+    METER_REGISTERS,
+    POLL_TIER_FAST,
+    POLL_TIER_MEDIUM,
+    POLL_TIER_SLOW,
+    POWER_LIMIT_REGISTERS,
+    PRIORITY_BACKGROUND,
+    PRIORITY_CONTROL,
+    PRIORITY_FAST,
+    PRIORITY_POLL,
+    STORAGE_REGISTERS,
+)
+from .decoder import BlockDecoder
+from .metrics import CycleMetrics, UnitMetrics, poll_statistics
+from .payload import Endian
+from .planner import (
+    DEFAULT_MAX_READ_GAP,
+    ReadRequest,
+    RegisterBlock,
+    describe_plan,
+    plan_reads,
+)
+from .policy import poll_rules
+from .services import async_setup_services
+from .snapshot import DataLayout, Snapshot
+from .static_info import STATIC_INFO_TTL, get_static_info_cache
+from .sunspec import (
+    INVERTER_MODELS,
+    METER_MODELS,
+    SunSpecModel,
+    SunSpecModelCache,
+    discover_models,
+    find_models,
+    get_model_cache,
 )
-from .payload import BinaryPayloadDecoder, Endian
+from .writer import RegisterWriter
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -77,6 +137,36 @@ SOLAREDGE_MODBUS_SCHEMA = vol.Schema(
             CONF_MAX_EXPORT_CONTROL_SITE_LIMIT,
             default=DEFAULT_MAX_EXPORT_CONTROL_SITE_LIMIT,
         ): cv.positive_int,
+        vol.Optional(
+            CONF_SCAN_INTERVAL_MEDIUM, default=DEFAULT_SCAN_INTERVAL_MEDIUM
+        ): cv.positive_int,
+        vol.Optional(
+            CONF_SCAN_INTERVAL_SLOW, default=DEFAULT_SCAN_INTERVAL_SLOW
+        ): cv.positive_int,
+        vol.Optional(
+            CONF_PIPELINE_DEPTH, default=DEFAULT_PIPELINE_DEPTH
+        ): cv.positive_int,
+        vol.Optional(
+            CONF_FORCE_REFRESH_INTERVAL, default=DEFAULT_FORCE_REFRESH_INTERVAL
+        ): cv.positive_int,
+        vol.Optional(
+            CONF_WRITE_DEBOUNCE, default=DEFAULT_WRITE_DEBOUNCE
+        ): cv.positive_int,
+        vol.Optional(
+            CONF_SLEEP_SCAN_INTERVAL, default=DEFAULT_SLEEP_SCAN_INTERVAL
+        ): cv.positive_int,
+        vol.Optional(
+            CONF_IDLE_BATTERY_SCAN_INTERVAL, default=DEFAULT_IDLE_BATTERY_SCAN_INTERVAL
+        ): cv.positive_int,
+        vol.Optional(
+            CONF_FAST_SCAN_INTERVAL, default=DEFAULT_FAST_SCAN_INTERVAL
+        ): cv.positive_int,
+        vol.Optional(CONF_FAST_KEYS, default=DEFAULT_FAST_KEYS): vol.All(
+            cv.ensure_list, [cv.string]
+        ),
+        vol.Optional(CONF_FOLLOWER_ADDRESSES, default=[]): vol.All(
+            cv.ensure_list, [cv.positive_int]
+        ),
     }
 )
 
@@ -90,6 +180,7 @@ PLATFORMS = ["number", "select", "sensor"]
 async def async_setup(hass: HomeAssistant, config):
     """Set up the Solaredge modbus component."""
     hass.data[DOMAIN] = {}
+    async_setup_services(hass)
     return True
 
 
@@ -108,10 +199,35 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     read_battery2 = entry.data[CONF_READ_BATTERY2]
     read_battery3 = entry.data[CONF_READ_BATTERY3]
     max_export_control_site_limit = entry.data[CONF_MAX_EXPORT_CONTROL_SITE_LIMIT]
+    scan_interval_medium = entry.data.get(CONF_SCAN_INTERVAL_MEDIUM, scan_interval)
+    scan_interval_slow = entry.data.get(CONF_SCAN_INTERVAL_SLOW, scan_interval)
+    pipeline_depth = entry.data.get(CONF_PIPELINE_DEPTH, DEFAULT_PIPELINE_DEPTH)
+    follower_addresses = entry.data.get(CONF_FOLLOWER_ADDRESSES, [])
+    force_refresh_interval = entry.data.get(
+        CONF_FORCE_REFRESH_INTERVAL, DEFAULT_FORCE_REFRESH_INTERVAL
+    )
+    write_debounce = entry.data.get(CONF_WRITE_DEBOUNCE, DEFAULT_WRITE_DEBOUNCE) / 1000
+    sleep_scan_interval = entry.data.get(
+        CONF_SLEEP_SCAN_INTERVAL, DEFAULT_SLEEP_SCAN_INTERVAL
+    )
+    idle_battery_scan_interval = entry.data.get(
+        CONF_IDLE_BATTERY_SCAN_INTERVAL, DEFAULT_IDLE_BATTERY_SCAN_INTERVAL
+    )
+    fast_scan_interval = (
+        entry.data.get(CONF_FAST_SCAN_INTERVAL, DEFAULT_FAST_SCAN_INTERVAL) / 1000
+    )
+    fast_keys = entry.data.get(CONF_FAST_KEYS, DEFAULT_FAST_KEYS)
 
     _LOGGER.debug("Setup %s.%s", DOMAIN, name)
 
-    hub = SolaredgeModbusHub(host, port, address, scan_interval)
+    connection = get_connection_pool(hass).acquire(
+        host, port, max(3, scan_interval - 1), pipeline_depth
+    )
+    hub = SolaredgeModbusHub(connection, address, write_debounce)
+    followers = [
+        SolaredgeModbusHub(connection, follower_address, write_debounce)
+        for follower_address in follower_addresses
+    ]
     coordinator = SolaredgeModbusCoordinator(
         hass,
         entry,
@@ -126,13 +242,40 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
         read_battery2,
         read_battery3,
         max_export_control_site_limit,
+        scan_interval_medium,
+        scan_interval_slow,
+        followers,
+        force_refresh_interval,
+        sleep_scan_interval,
+        idle_battery_scan_interval,
     )
-    await coordinator.async_config_entry_first_refresh()
+    try:
+        await coordinator.async_config_entry_first_refresh()
+    except ConfigEntryNotReady as error:
+        if not coordinator.static_info_cached:
+            await get_connection_pool(hass).release(connection)
+            raise
+        # The entities are unavailable until the units respond
+        _LOGGER.warning(
+            "Setting up %s from its stored device information: %s", name, error
+        )
+    except Exception:
+        await get_connection_pool(hass).release(connection)
+        raise
+
+    fast_coordinator = None
+    if fast_scan_interval and fast_keys:
+        fast_coordinator = SolaredgeFastCoordinator(
+            hass, entry, coordinator, fast_keys, fast_scan_interval
+        )
 
-    hass.data[DOMAIN][name] = {"hub": coordinator}
+    hass.data[DOMAIN][name] = {"hub": coordinator, "fast": fast_coordinator}
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    if fast_coordinator is not None:
+        entry.async_on_unload(fast_coordinator.async_start())
+
     return True
 
 
@@ -141,13 +284,20 @@ async def async_unload_entry(hass: HomeAssistant, entry):
     coordinator: SolaredgeModbusCoordinator = hass.data[DOMAIN][entry.data["name"]][
         "hub"
     ]
-    await coordinator.hub.close()
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         hass.data[DOMAIN].pop(entry.data["name"])
+        for hub in coordinator.hubs:
+            await hub.writer.async_close()
+        await get_connection_pool(hass).release(coordinator.hub.connection)
 
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored static information of a removed entry."""
+    await get_static_info_cache(hass).async_remove(entry.entry_id)
+
+
 async def async_remove_config_entry_device(
     hass: HomeAssistant, entry, device_entry
 ) -> bool:
@@ -173,14 +323,20 @@ async def async_migrate_entry(hass, config_entry):
         scan_interval = config_entry.data[CONF_SCAN_INTERVAL]
 
         # Update unique id to use serial number
-        hub = SolaredgeModbusHub(host, port, address, scan_interval)
-        if not await hub.check_and_reconnect():
-            _LOGGER.error("Failed to connect to hub")
-            return False
+        pool = get_connection_pool(hass)
+        hub = SolaredgeModbusHub(
+            pool.acquire(host, port, max(3, scan_interval - 1)), address
+        )
+        try:
+            if not await hub.check_and_reconnect():
+                _LOGGER.error("Failed to connect to hub")
+                return False
 
-        if not await hub.read_device_info():
-            _LOGGER.error("Failed to read device info")
-            return False
+            if not await hub.read_device_info():
+                _LOGGER.error("Failed to read device info")
+                return False
+        finally:
+            await pool.release(hub.connection)
 
         new_unique_id = hub.device_info["serial_number"]
         if existing_entity_id := hass.config_entries.async_entry_for_domain_unique_id(
@@ -219,773 +375,750 @@ async def async_migrate_entry(hass, config_entry):
     return True
 
 
-def validate(value, comparison, against):
-    """Validate value."""
-    ops = {
-        ">": operator.gt,
-        "<": operator.lt,
-        ">=": operator.ge,
-        "<=": operator.le,
-        "==": operator.eq,
-        "!=": operator.ne,
-    }
-    if not ops[comparison](value, against):
-        raise ValueError(f"Value {value} failed validation ({comparison}{against})")
-    return value
+# The meter energy counters and battery state change slowly and are split off
+# into blocks of their own, so they can be polled less often
+METER_ENERGY_OFFSET = 36
+BATTERY_STATE_OFFSET = 0x0A
+
+DEVICE_INFO_DECODER = BlockDecoder(DEVICE_INFO_REGISTERS)
+INVERTER_DECODER = BlockDecoder(INVERTER_REGISTERS)
+POWER_LIMIT_DECODER = BlockDecoder(POWER_LIMIT_REGISTERS)
+METER_DECODERS = {
+    meter_prefix: (
+        BlockDecoder(METER_REGISTERS, prefix=meter_prefix, end=METER_ENERGY_OFFSET),
+        BlockDecoder(METER_REGISTERS, prefix=meter_prefix, start=METER_ENERGY_OFFSET),
+    )
+    for meter_prefix in ("m1_", "m2_", "m3_")
+}
+STORAGE_DECODER = BlockDecoder(STORAGE_REGISTERS, wordorder=Endian.LITTLE)
+EXPORT_CONTROL_DECODER = BlockDecoder(EXPORT_CONTROL_REGISTERS, wordorder=Endian.LITTLE)
+BATTERY_INFO_DECODER = BlockDecoder(BATTERY_INFO_REGISTERS, wordorder=Endian.LITTLE)
+BATTERY_DECODERS = {
+    battery_prefix: (
+        BlockDecoder(
+            BATTERY_REGISTERS,
+            wordorder=Endian.LITTLE,
+            prefix=battery_prefix,
+            end=BATTERY_STATE_OFFSET,
+        ),
+        BlockDecoder(
+            BATTERY_REGISTERS,
+            wordorder=Endian.LITTLE,
+            prefix=battery_prefix,
+            start=BATTERY_STATE_OFFSET,
+        ),
+    )
+    for battery_prefix in ("battery1_", "battery2_", "battery3_")
+}
+
+INVERTER_BLOCK = RegisterBlock("inverter", 40071, INVERTER_DECODER.count)
+# Rejected by the inverter when advanced power control is disabled
+POWER_LIMIT_BLOCK = RegisterBlock(
+    "power_limit",
+    0xF001,
+    POWER_LIMIT_DECODER.count,
+    mergeable=False,
+    tier=POLL_TIER_SLOW,
+)
+
+
+def meter_model_blocks(meter_prefix: str, address: int) -> tuple[RegisterBlock, ...]:
+    """Return the blocks of a meter model with its data at address."""
+    return (
+        RegisterBlock(
+            meter_prefix.rstrip("_"), address, METER_DECODERS[meter_prefix][0].count
+        ),
+        RegisterBlock(
+            meter_prefix + "energy",
+            address + METER_ENERGY_OFFSET,
+            METER_DECODERS[meter_prefix][1].count,
+            tier=POLL_TIER_SLOW,
+        ),
+    )
+
+
+# Addresses of the meters when the SunSpec model chain can not be discovered
+METER_BLOCKS = {
+    meter_prefix: meter_model_blocks(meter_prefix, address)
+    for meter_prefix, address in (("m1_", 40190), ("m2_", 40364), ("m3_", 40539))
+}
+# Storage control includes the export control block
+STORAGE_BLOCK = RegisterBlock(
+    "storage", 0xE000, STORAGE_DECODER.count, mergeable=False, tier=POLL_TIER_SLOW
+)
+EXPORT_CONTROL_BLOCK = RegisterBlock(
+    "export_control",
+    0xE000,
+    EXPORT_CONTROL_DECODER.count,
+    mergeable=False,
+    tier=POLL_TIER_SLOW,
+)
+BATTERY_BLOCKS = {
+    battery_prefix: (
+        RegisterBlock(battery_prefix + "info", address, BATTERY_INFO_DECODER.count),
+        RegisterBlock(
+            battery_prefix.rstrip("_"),
+            address + 0x6C,
+            BATTERY_DECODERS[battery_prefix][0].count,
+        ),
+        RegisterBlock(
+            battery_prefix + "state",
+            address + 0x6C + BATTERY_STATE_OFFSET,
+            BATTERY_DECODERS[battery_prefix][1].count,
+            tier=POLL_TIER_MEDIUM,
+        ),
+    )
+    for battery_prefix, address in (
+        ("battery1_", 0xE100),
+        ("battery2_", 0xE200),
+        ("battery3_", 0xE400),
+    )
+}
+
+# The keys of the values decoded from each block, which become unavailable
+# when the block fails
+BLOCK_KEYS = {
+    INVERTER_BLOCK.key: INVERTER_DECODER.keys,
+    POWER_LIMIT_BLOCK.key: POWER_LIMIT_DECODER.keys,
+    STORAGE_BLOCK.key: STORAGE_DECODER.keys,
+    EXPORT_CONTROL_BLOCK.key: EXPORT_CONTROL_DECODER.keys,
+}
+# Of these blocks only the values enabled entities depend on are read
+SUBSET_DECODERS = {INVERTER_BLOCK.key: INVERTER_DECODER}
+for meter_prefix, meter_blocks in METER_BLOCKS.items():
+    for meter_block, meter_decoder in zip(meter_blocks, METER_DECODERS[meter_prefix]):
+        BLOCK_KEYS[meter_block.key] = meter_decoder.keys
+        SUBSET_DECODERS[meter_block.key] = meter_decoder
+for battery_prefix, (info_block, *battery_blocks) in BATTERY_BLOCKS.items():
+    BLOCK_KEYS[info_block.key] = ()
+    for battery_block, battery_decoder in zip(
+        battery_blocks, BATTERY_DECODERS[battery_prefix]
+    ):
+        BLOCK_KEYS[battery_block.key] = battery_decoder.keys
+
+# All values of a unit, the battery information is kept as one value
+DATA_LAYOUT = DataLayout(
+    [
+        *(key for keys in BLOCK_KEYS.values() for key in keys),
+        *(battery_prefix + "attrs" for battery_prefix in BATTERY_BLOCKS),
+    ]
+)
+DECODER_FIELDS = {
+    decoder: DATA_LAYOUT.indexes(decoder.keys)
+    for decoder in (
+        INVERTER_DECODER,
+        POWER_LIMIT_DECODER,
+        STORAGE_DECODER,
+        EXPORT_CONTROL_DECODER,
+        *(decoder for decoders in METER_DECODERS.values() for decoder in decoders),
+    )
+}
+
+
+def battery_status_probe(
+    battery_prefix: str, state_block: RegisterBlock
+) -> tuple[RegisterBlock, BlockDecoder]:
+    """Return the part of the battery state block holding the status."""
+    ((offset, decoder),) = BATTERY_DECODERS[battery_prefix][1].subset(
+        [battery_prefix + "status"], 0
+    )
+    return (
+        RegisterBlock(
+            battery_prefix + "status", state_block.address + offset, decoder.count
+        ),
+        decoder,
+    )
+
+
+# The parts read every poll while a poll rule holds back the block of their
+# key, when the probe keys of the rule are not part of the block itself
+PROBE_BLOCKS = {
+    battery_block.key: battery_status_probe(battery_prefix, state_block)
+    for battery_prefix, (_, battery_block, state_block) in BATTERY_BLOCKS.items()
+}
+# Added after the layout, the probed values are part of it already
+for probe_block, probe_decoder in PROBE_BLOCKS.values():
+    BLOCK_KEYS[probe_block.key] = probe_decoder.keys
+
+
+def decoder_fields(decoder: BlockDecoder) -> list[int]:
+    """Return the field indexes of the values of a decoder."""
+    if decoder not in DECODER_FIELDS:
+        DECODER_FIELDS[decoder] = DATA_LAYOUT.indexes(decoder.keys)
+    return DECODER_FIELDS[decoder]
+
+
+# Blocks with writable registers, written registers are read back with the
+# decoder of their block
+WRITABLE_BLOCKS = (
+    (STORAGE_BLOCK, STORAGE_DECODER),
+    (POWER_LIMIT_BLOCK, POWER_LIMIT_DECODER),
+)
+
+
+@cache
+def written_block(
+    address: int, count: int
+) -> tuple[RegisterBlock, BlockDecoder] | None:
+    """Return the block of written registers with its decoder, None if unknown."""
+    for block, decoder in WRITABLE_BLOCKS:
+        offset = address - block.address
+        if 0 <= offset and offset + count <= block.count:
+            return (
+                RegisterBlock(f"{block.key}_{offset}", address, count),
+                BlockDecoder(
+                    decoder.fields,
+                    decoder.wordorder,
+                    decoder.prefix,
+                    start=offset,
+                    end=offset + count,
+                ),
+            )
+    return None
 
 
 class SolaredgeModbusHub:
-    """Thread safe wrapper class for pymodbus."""
+    """Reads and decodes the registers of one unit on a shared connection."""
 
     def __init__(
-        self,
-        host,
-        port,
-        address,
-        scan_interval,
+        self, connection: SolaredgeModbusConnection, address, write_debounce: float = 0
     ) -> None:
-        """Initialize the Modbus hub."""
-        self._client = None
-        self._host = host
-        self._port = port
-        self._timeout = max(3, (scan_interval - 1))
-        self._lock = asyncio.Lock()
-        self._address = address
+        """Initialize the Modbus hub.
 
-        self.modbus_data = {}
-        self.device_info = {}
+        Writes wait write_debounce seconds for further writes to merge with.
+        """
+        self.connection = connection
+        self._address = address
+        self._read_plans: dict[tuple[RegisterBlock, ...], list[ReadRequest]] = {}
+        self._unreadable: list[tuple[int, int]] = []
+
+        self.read_plan: list[ReadRequest] = []
+        self.block_available: dict[str, bool] = {}
+        # The last transport error of the unit in the poll cycle
+        self.transport_error: Exception | None = None
+        # Retries left to the requests of the cycle of the coordinator
+        self.retries: RetryBudget | None = None
+        self._unavailable_keys: set[str] = set()
+        self.battery_status: dict[str, int] = {}
+        self.modbus_data = Snapshot(DATA_LAYOUT)
+        self.writer = RegisterWriter(self, write_debounce)
+        self.device_info: dict[str, Any] = {}
+        self.metrics = UnitMetrics()
+        self.models: list[SunSpecModel] | None = None
+        # Time the device and battery information was read, and whether it
+        # changed since it was stored
+        self.static_info_updated = 0.0
+        self.static_info_changed = False
+        self.inverter_block = INVERTER_BLOCK
+        self.meter_blocks = METER_BLOCKS
+        # Keys of the values enabled entities depend on, None to read all
+        self.enabled_keys: frozenset[str] | None = None
+        # Keys still read of the blocks a poll rule holds back, by block key
+        self.probe_keys: dict[str, frozenset[str]] = {}
+        self._block_parts: dict[
+            tuple[RegisterBlock, frozenset[str]],
+            tuple[tuple[RegisterBlock, BlockDecoder], ...],
+        ] = {}
+        self._part_keys: dict[str, tuple[str, ...]] = {}
 
     def get_unit(self) -> int:
         """Get the configured unit."""
         return cast(int, self._address)
 
     async def close(self):
-        """Disconnect client."""
-        if self._client is None:
-            return
-
-        async with self._lock:
-            self._client.close()
-            self._client = None
+        """Disconnect the connection, e.g. after a transport error."""
+        await self.connection.close()
 
     async def check_and_reconnect(self):
-        if self._client is None:
-            self._client = AsyncModbusTcpClient(
-                host=self._host, port=self._port, timeout=self._timeout
-            )
-        if not self._client.connected:
-            _LOGGER.info("Modbus client is not connected, trying to reconnect")
-            return await self.connect()
+        return await self.connection.check_and_reconnect()
+
+    async def read_holding_registers(
+        self, unit, address, count, priority: int = PRIORITY_POLL, retry: bool = True
+    ):
+        """Read holding registers, retrying within the budget of the cycle."""
+        return await self.connection.read_holding_registers(
+            unit, address, count, priority, self.retries if retry else None
+        )
 
-        return self._client.connected
+    def plan_reads(self, blocks) -> list[ReadRequest]:
+        """Return the read plan for the blocks, planning once per set of blocks."""
+        blocks = tuple(blocks)
+        if blocks not in self._read_plans:
+            self._read_plans[blocks] = plan_reads(blocks, unreadable=self._unreadable)
+            _LOGGER.debug("Read plan: %s", describe_plan(self._read_plans[blocks]))
+        self.read_plan = self._read_plans[blocks]
+        return self.read_plan
+
+    async def read_blocks(self, blocks):
+        """Read register blocks using as few requests as possible.
+
+        The requests are sent concurrently, which only pipelines them when
+        the pipelined client is used. Returns the registers of each block by
+        key, or None for blocks which could not be read.
+        """
+        registers = {}
+        for result in await asyncio.gather(
+            *(self._read_request(request) for request in self.plan_reads(blocks))
+        ):
+            registers.update(result)
+        return registers
+
+    async def _read(
+        self, key: str, address: int, count: int, priority: int = PRIORITY_POLL
+    ):
+        """Read registers, recording the metrics of the requests reading key."""
+        metrics = self.metrics.request(key)
+        metrics.requests += 1
+        start = time.perf_counter()
+        try:
+            response = await self.read_holding_registers(
+                unit=self._address, address=address, count=count, priority=priority
+            )
+        except (ModbusIOException, TimeoutError):
+            metrics.timeouts += 1
+            raise
+        except TRANSPORT_ERRORS:
+            metrics.errors += 1
+            raise
+        finally:
+            metrics.latency.add(time.perf_counter() - start)
+        if response.isError():
+            metrics.errors += 1
+        else:
+            metrics.registers += count
+            self.metrics.registers += count
+        return response
 
-    async def connect(self):
-        """Connect client."""
-        async with self._lock:
-            result = await self._client.connect()
+    async def _read_request(self, request: ReadRequest, priority: int = PRIORITY_POLL):
+        """Execute a planned read request and split its response over the blocks.
 
-        if result:
-            _LOGGER.info(
-                "Successfully connected to %s:%s",
-                self._client.comm_params.host,
-                self._client.comm_params.port,
+        A transport error fails the blocks of the request only, it is kept in
+        transport_error to close the connection after the poll cycle.
+        """
+        try:
+            return await self._execute_request(request, priority)
+        except TRANSPORT_ERRORS as error:
+            _LOGGER.debug(
+                "Failed to read %s of unit %s: %s",
+                "+".join(block.key for block in request.blocks),
+                self._address,
+                error,
             )
-        else:
-            _LOGGER.warning(
-                "Not able to connect to %s:%s",
-                self._client.comm_params.host,
-                self._client.comm_params.port,
+            self.transport_error = error
+            return dict.fromkeys((block.key for block in request.blocks), None)
+
+    async def _execute_request(self, request: ReadRequest, priority: int):
+        """Read the blocks of a request, separately when the request fails."""
+        response = await self._read(
+            "+".join(block.key for block in request.blocks),
+            request.address,
+            request.count,
+            priority,
+        )
+        if not response.isError():
+            # The pipelined client keeps the register bytes of the response
+            register_bytes = getattr(response, "register_bytes", None)
+            return request.split(
+                response.registers if register_bytes is None else register_bytes
             )
-        return result
 
-    async def read_holding_registers(self, unit, address, count):
-        """Read holding registers."""
-        async with self._lock:
-            return await self._client.read_holding_registers(
-                address=address, count=count, device_id=unit
+        if len(request.blocks) == 1:
+            return {request.blocks[0].key: None}
+
+        # Fall back to reading the blocks separately. When they can all be
+        # read, the gaps in between are not readable and are avoided from
+        # now on.
+        registers = {}
+        for block in request.blocks:
+            response = await self._read(block.key, block.address, block.count, priority)
+            registers[block.key] = None if response.isError() else response.registers
+        if all(registers[block.key] is not None for block in request.blocks):
+            _LOGGER.debug(
+                "Registers %s can not be read, planning around them", request.gaps
             )
+            self._unreadable.extend(request.gaps)
+            self._read_plans.clear()
+
+        return registers
 
     async def write_registers(self, unit, address, payload):
         """Write registers."""
-        try:
-            async with self._lock:
-                return await self._client.write_registers(
-                    address=address, values=payload, device_id=unit
-                )
-        except ModbusException as err:
-            raise HomeAssistantError(err) from err
+        return await self.connection.write_registers(unit, address, payload)
 
     async def write_register(self, unit, address, payload):
         """Write register."""
-        try:
-            async with self._lock:
-                return await self._client.write_register(
-                    address=address, value=payload, device_id=unit
-                )
-        except ModbusException as err:
-            raise HomeAssistantError(err) from err
-
-    def calculate_value(self, value, sf):
-        """Calculate a value using scaling factor."""
-        return round(value * 10**sf, max(0, -sf))
+        return await self.connection.write_register(unit, address, payload)
+
+    async def read_back(self, written: list[tuple[int, list[int]]]) -> dict[str, Any]:
+        """Read written registers back, returning the values the unit reports.
+
+        The registers are read ahead of the queued poll requests. Values which
+        differ from the written ones, e.g. because the inverter clamped them,
+        are logged. The written values are returned for the
+        registers which can not be read back.
+
+        :param written: The start address and values of the written registers
+        """
+        parts = []
+        for address, registers in written:
+            if (part := written_block(address, len(registers))) is not None:
+                parts.append((*part, registers))
+        if not parts:
+            return {}
+
+        read = {}
+        for request in plan_reads(
+            [block for block, _, _ in parts], unreadable=self._unreadable
+        ):
+            read.update(await self._read_request(request, PRIORITY_CONTROL))
+
+        values = {}
+        for block, decoder, registers in parts:
+            try:
+                requested = decoder.decode(registers)
+                if read.get(block.key) is None:
+                    values.update(requested)
+                    continue
+                confirmed = decoder.decode(read[block.key])
+            except ValueError as error:
+                _LOGGER.debug("Failed to decode %s: %s", block.key, error)
+                continue
+            for key, value in confirmed.items():
+                if value != requested[key]:
+                    _LOGGER.warning(
+                        "Unit %s did not accept %s of %s, it reports %s",
+                        self._address,
+                        key,
+                        requested[key],
+                        value,
+                    )
+            values.update(confirmed)
+        return values
+
+    def set_block_available(self, block: RegisterBlock, available: bool) -> None:
+        """Set the availability of a block and the values decoded from it."""
+        if self.block_available.get(block.key, True) != available:
+            _LOGGER.info(
+                "Register block %s of unit %s is %s",
+                block.key,
+                self._address,
+                "available again" if available else "unavailable",
+            )
+        self.block_available[block.key] = available
+        keys = self._part_keys.get(block.key, BLOCK_KEYS.get(block.key, ()))
+        if available:
+            self._unavailable_keys.difference_update(keys)
+        else:
+            self._unavailable_keys.update(keys)
 
-    async def read_device_info(self):
-        data = await self.read_holding_registers(
-            unit=self._address, address=40004, count=64
-        )
-        if data.isError():
-            return False
+    def key_available(self, key: str) -> bool:
+        """Return true if the block of the value of key was read successfully."""
+        return key not in self._unavailable_keys
 
-        decoder = BinaryPayloadDecoder.fromRegisters(
-            data.registers, byteorder=Endian.BIG
+    def update_block(self, decoder: BlockDecoder, registers) -> None:
+        """Decode a block straight into the fields of its values."""
+        self.modbus_data.update_fields(
+            decoder_fields(decoder), decoder.decode_values(registers)
         )
 
-        manufacturer = decoder.decode_string(size=32)
-        model = decoder.decode_string(size=32)
-        decoder.skip_bytes(16)
-        version = decoder.decode_string(size=16)
-        serial_number = decoder.decode_string(size=32)
-
-        self.device_info = {
-            "manufacturer": manufacturer,
-            "model": model,
-            "version": version,
-            "serial_number": serial_number,
-        }
-
-        return True
-
-    async def read_modbus_data_meter1(self):
-        """Read meter 1 modbus data."""
-        return await self.read_modbus_data_meter("m1_", 40190)
-
-    async def read_modbus_data_meter2(self):
-        """Read meter 2 modbus data."""
-        return await self.read_modbus_data_meter("m2_", 40364)
-
-    async def read_modbus_data_meter3(self):
-        """Read meter 3 modbus data."""
-        return await self.read_modbus_data_meter("m3_", 40539)
-
-    async def read_modbus_data_meter(self, meter_prefix, start_address):
-        """Start reading meter  data."""
-        meter_data = await self.read_holding_registers(
-            unit=self._address, address=start_address, count=103
-        )
-        if meter_data.isError():
+    def block_parts(
+        self, block: RegisterBlock
+    ) -> tuple[tuple[RegisterBlock, BlockDecoder], ...]:
+        """Return the parts of a block to read with their decoders.
+
+        Only the registers of the enabled keys are read, or of the probe keys
+        while a poll rule holds the block back. Unused runs of more than
+        DEFAULT_MAX_READ_GAP registers split the block. The parts are planned
+        once per set of keys.
+        """
+        decoder = SUBSET_DECODERS[block.key]
+        if block.key in self.probe_keys:
+            keys = self.probe_keys[block.key]
+        elif self.enabled_keys is None:
+            keys = frozenset(decoder.keys)
+        else:
+            keys = frozenset(key for key in decoder.keys if key in self.enabled_keys)
+        if (block, keys) not in self._block_parts:
+            if len(keys) == len(decoder.keys):
+                parts: tuple[tuple[RegisterBlock, BlockDecoder], ...] = (
+                    (block, decoder),
+                )
+            else:
+                subsets = decoder.subset(keys, DEFAULT_MAX_READ_GAP)
+                parts = tuple(
+                    (
+                        replace(
+                            block,
+                            key=(
+                                block.key
+                                if len(subsets) == 1
+                                else f"{block.key}_{part}"
+                            ),
+                            address=block.address + offset,
+                            count=subset.count,
+                        ),
+                        subset,
+                    )
+                    for part, (offset, subset) in enumerate(subsets, 1)
+                )
+                _LOGGER.debug(
+                    "Reading %s of %s values of %s on unit %s in %s registers",
+                    len(keys),
+                    len(decoder.keys),
+                    block.key,
+                    self._address,
+                    sum(part.count for part, _ in parts),
+                )
+            self._block_parts[block, keys] = parts
+        parts = self._block_parts[block, keys]
+        for part, part_decoder in parts:
+            self._part_keys[part.key] = part_decoder.keys
+        return parts
+
+    def part_decoders(self, block: RegisterBlock, decode):
+        """Return the parts of a block with the functions decoding them.
+
+        The block is decoded by decode when it is read as a whole.
+        """
+        parts = self.block_parts(block)
+        if len(parts) == 1 and parts[0][0] is block:
+            return [(block, decode)]
+        return [(part, partial(self.decode_part, decoder)) for part, decoder in parts]
+
+    def decode_part(self, decoder: BlockDecoder, registers) -> bool:
+        """Decode a part of a block."""
+        if registers is None:
             return False
 
-        decoder = BinaryPayloadDecoder.fromRegisters(
-            meter_data.registers, byteorder=Endian.BIG
-        )
-        accurrent = decoder.decode_16bit_int()
-        accurrenta = decoder.decode_16bit_int()
-        accurrentb = decoder.decode_16bit_int()
-        accurrentc = decoder.decode_16bit_int()
-        accurrentsf = decoder.decode_16bit_int()
-
-        accurrent = self.calculate_value(accurrent, accurrentsf)
-        accurrenta = self.calculate_value(accurrenta, accurrentsf)
-        accurrentb = self.calculate_value(accurrentb, accurrentsf)
-        accurrentc = self.calculate_value(accurrentc, accurrentsf)
-
-        self.modbus_data[meter_prefix + "accurrent"] = accurrent
-        self.modbus_data[meter_prefix + "accurrenta"] = accurrenta
-        self.modbus_data[meter_prefix + "accurrentb"] = accurrentb
-        self.modbus_data[meter_prefix + "accurrentc"] = accurrentc
-
-        acvoltageln = decoder.decode_16bit_int()
-        acvoltagean = decoder.decode_16bit_int()
-        acvoltagebn = decoder.decode_16bit_int()
-        acvoltagecn = decoder.decode_16bit_int()
-        acvoltagell = decoder.decode_16bit_int()
-        acvoltageab = decoder.decode_16bit_int()
-        acvoltagebc = decoder.decode_16bit_int()
-        acvoltageca = decoder.decode_16bit_int()
-        acvoltagesf = decoder.decode_16bit_int()
-
-        acvoltageln = self.calculate_value(acvoltageln, acvoltagesf)
-        acvoltagean = self.calculate_value(acvoltagean, acvoltagesf)
-        acvoltagebn = self.calculate_value(acvoltagebn, acvoltagesf)
-        acvoltagecn = self.calculate_value(acvoltagecn, acvoltagesf)
-        acvoltagell = self.calculate_value(acvoltagell, acvoltagesf)
-        acvoltageab = self.calculate_value(acvoltageab, acvoltagesf)
-        acvoltagebc = self.calculate_value(acvoltagebc, acvoltagesf)
-        acvoltageca = self.calculate_value(acvoltageca, acvoltagesf)
-
-        self.modbus_data[meter_prefix + "acvoltageln"] = acvoltageln
-        self.modbus_data[meter_prefix + "acvoltagean"] = acvoltagean
-        self.modbus_data[meter_prefix + "acvoltagebn"] = acvoltagebn
-        self.modbus_data[meter_prefix + "acvoltagecn"] = acvoltagecn
-        self.modbus_data[meter_prefix + "acvoltagell"] = acvoltagell
-        self.modbus_data[meter_prefix + "acvoltageab"] = acvoltageab
-        self.modbus_data[meter_prefix + "acvoltagebc"] = acvoltagebc
-        self.modbus_data[meter_prefix + "acvoltageca"] = acvoltageca
-
-        acfreq = decoder.decode_16bit_int()
-        acfreqsf = decoder.decode_16bit_int()
-
-        acfreq = self.calculate_value(acfreq, acfreqsf)
-
-        self.modbus_data[meter_prefix + "acfreq"] = acfreq
-
-        acpower = decoder.decode_16bit_int()
-        acpowera = decoder.decode_16bit_int()
-        acpowerb = decoder.decode_16bit_int()
-        acpowerc = decoder.decode_16bit_int()
-        acpowersf = decoder.decode_16bit_int()
-
-        acpower = self.calculate_value(acpower, acpowersf)
-        acpowera = self.calculate_value(acpowera, acpowersf)
-        acpowerb = self.calculate_value(acpowerb, acpowersf)
-        acpowerc = self.calculate_value(acpowerc, acpowersf)
-
-        self.modbus_data[meter_prefix + "acpower"] = acpower
-        self.modbus_data[meter_prefix + "acpowera"] = acpowera
-        self.modbus_data[meter_prefix + "acpowerb"] = acpowerb
-        self.modbus_data[meter_prefix + "acpowerc"] = acpowerc
-
-        acva = decoder.decode_16bit_int()
-        acvaa = decoder.decode_16bit_int()
-        acvab = decoder.decode_16bit_int()
-        acvac = decoder.decode_16bit_int()
-        acvasf = decoder.decode_16bit_int()
-
-        acva = self.calculate_value(acva, acvasf)
-        acvaa = self.calculate_value(acvaa, acvasf)
-        acvab = self.calculate_value(acvab, acvasf)
-        acvac = self.calculate_value(acvac, acvasf)
-
-        self.modbus_data[meter_prefix + "acva"] = acva
-        self.modbus_data[meter_prefix + "acvaa"] = acvaa
-        self.modbus_data[meter_prefix + "acvab"] = acvab
-        self.modbus_data[meter_prefix + "acvac"] = acvac
-
-        acvar = decoder.decode_16bit_int()
-        acvara = decoder.decode_16bit_int()
-        acvarb = decoder.decode_16bit_int()
-        acvarc = decoder.decode_16bit_int()
-        acvarsf = decoder.decode_16bit_int()
-
-        acvar = self.calculate_value(acvar, acvarsf)
-        acvara = self.calculate_value(acvara, acvarsf)
-        acvarb = self.calculate_value(acvarb, acvarsf)
-        acvarc = self.calculate_value(acvarc, acvarsf)
-
-        self.modbus_data[meter_prefix + "acvar"] = acvar
-        self.modbus_data[meter_prefix + "acvara"] = acvara
-        self.modbus_data[meter_prefix + "acvarb"] = acvarb
-        self.modbus_data[meter_prefix + "acvarc"] = acvarc
-
-        acpf = decoder.decode_16bit_int()
-        acpfa = decoder.decode_16bit_int()
-        acpfb = decoder.decode_16bit_int()
-        acpfc = decoder.decode_16bit_int()
-        acpfsf = decoder.decode_16bit_int()
-
-        acpf = self.calculate_value(acpf, acpfsf)
-        acpfa = self.calculate_value(acpfa, acpfsf)
-        acpfb = self.calculate_value(acpfb, acpfsf)
-        acpfc = self.calculate_value(acpfc, acpfsf)
-
-        self.modbus_data[meter_prefix + "acpf"] = acpf
-        self.modbus_data[meter_prefix + "acpfa"] = acpfa
-        self.modbus_data[meter_prefix + "acpfb"] = acpfb
-        self.modbus_data[meter_prefix + "acpfc"] = acpfc
-
-        exported = decoder.decode_32bit_uint()
-        exporteda = decoder.decode_32bit_uint()
-        exportedb = decoder.decode_32bit_uint()
-        exportedc = decoder.decode_32bit_uint()
-        imported = decoder.decode_32bit_uint()
-        importeda = decoder.decode_32bit_uint()
-        importedb = decoder.decode_32bit_uint()
-        importedc = decoder.decode_32bit_uint()
-        energywsf = decoder.decode_16bit_int()
-
-        exported = validate(self.calculate_value(exported, energywsf), ">", 0)
-        exporteda = self.calculate_value(exporteda, energywsf)
-        exportedb = self.calculate_value(exportedb, energywsf)
-        exportedc = self.calculate_value(exportedc, energywsf)
-        imported = validate(self.calculate_value(imported, energywsf), ">", 0)
-        importeda = self.calculate_value(importeda, energywsf)
-        importedb = self.calculate_value(importedb, energywsf)
-        importedc = self.calculate_value(importedc, energywsf)
-
-        self.modbus_data[meter_prefix + "exported"] = round(exported * 0.001, 3)
-        self.modbus_data[meter_prefix + "exporteda"] = round(exporteda * 0.001, 3)
-        self.modbus_data[meter_prefix + "exportedb"] = round(exportedb * 0.001, 3)
-        self.modbus_data[meter_prefix + "exportedc"] = round(exportedc * 0.001, 3)
-        self.modbus_data[meter_prefix + "imported"] = round(imported * 0.001, 3)
-        self.modbus_data[meter_prefix + "importeda"] = round(importeda * 0.001, 3)
-        self.modbus_data[meter_prefix + "importedb"] = round(importedb * 0.001, 3)
-        self.modbus_data[meter_prefix + "importedc"] = round(importedc * 0.001, 3)
-
-        exportedva = decoder.decode_32bit_uint()
-        exportedvaa = decoder.decode_32bit_uint()
-        exportedvab = decoder.decode_32bit_uint()
-        exportedvac = decoder.decode_32bit_uint()
-        importedva = decoder.decode_32bit_uint()
-        importedvaa = decoder.decode_32bit_uint()
-        importedvab = decoder.decode_32bit_uint()
-        importedvac = decoder.decode_32bit_uint()
-        energyvasf = decoder.decode_16bit_int()
-
-        exportedva = self.calculate_value(exportedva, energyvasf)
-        exportedvaa = self.calculate_value(exportedvaa, energyvasf)
-        exportedvab = self.calculate_value(exportedvab, energyvasf)
-        exportedvac = self.calculate_value(exportedvac, energyvasf)
-        importedva = self.calculate_value(importedva, energyvasf)
-        importedvaa = self.calculate_value(importedvaa, energyvasf)
-        importedvab = self.calculate_value(importedvab, energyvasf)
-        importedvac = self.calculate_value(importedvac, energyvasf)
-
-        self.modbus_data[meter_prefix + "exportedva"] = exportedva
-        self.modbus_data[meter_prefix + "exportedvaa"] = exportedvaa
-        self.modbus_data[meter_prefix + "exportedvab"] = exportedvab
-        self.modbus_data[meter_prefix + "exportedvac"] = exportedvac
-        self.modbus_data[meter_prefix + "importedva"] = importedva
-        self.modbus_data[meter_prefix + "importedvaa"] = importedvaa
-        self.modbus_data[meter_prefix + "importedvab"] = importedvab
-        self.modbus_data[meter_prefix + "importedvac"] = importedvac
-
-        importvarhq1 = decoder.decode_32bit_uint()
-        importvarhq1a = decoder.decode_32bit_uint()
-        importvarhq1b = decoder.decode_32bit_uint()
-        importvarhq1c = decoder.decode_32bit_uint()
-        importvarhq2 = decoder.decode_32bit_uint()
-        importvarhq2a = decoder.decode_32bit_uint()
-        importvarhq2b = decoder.decode_32bit_uint()
-        importvarhq2c = decoder.decode_32bit_uint()
-        importvarhq3 = decoder.decode_32bit_uint()
-        importvarhq3a = decoder.decode_32bit_uint()
-        importvarhq3b = decoder.decode_32bit_uint()
-        importvarhq3c = decoder.decode_32bit_uint()
-        importvarhq4 = decoder.decode_32bit_uint()
-        importvarhq4a = decoder.decode_32bit_uint()
-        importvarhq4b = decoder.decode_32bit_uint()
-        importvarhq4c = decoder.decode_32bit_uint()
-        energyvarsf = decoder.decode_16bit_int()
-
-        importvarhq1 = self.calculate_value(importvarhq1, energyvarsf)
-        importvarhq1a = self.calculate_value(importvarhq1a, energyvarsf)
-        importvarhq1b = self.calculate_value(importvarhq1b, energyvarsf)
-        importvarhq1c = self.calculate_value(importvarhq1c, energyvarsf)
-        importvarhq2 = self.calculate_value(importvarhq2, energyvarsf)
-        importvarhq2a = self.calculate_value(importvarhq2a, energyvarsf)
-        importvarhq2b = self.calculate_value(importvarhq2b, energyvarsf)
-        importvarhq2c = self.calculate_value(importvarhq2c, energyvarsf)
-        importvarhq3 = self.calculate_value(importvarhq3, energyvarsf)
-        importvarhq3a = self.calculate_value(importvarhq3a, energyvarsf)
-        importvarhq3b = self.calculate_value(importvarhq3b, energyvarsf)
-        importvarhq3c = self.calculate_value(importvarhq3c, energyvarsf)
-        importvarhq4 = self.calculate_value(importvarhq4, energyvarsf)
-        importvarhq4a = self.calculate_value(importvarhq4a, energyvarsf)
-        importvarhq4b = self.calculate_value(importvarhq4b, energyvarsf)
-        importvarhq4c = self.calculate_value(importvarhq4c, energyvarsf)
-
-        self.modbus_data[meter_prefix + "importvarhq1"] = importvarhq1
-        self.modbus_data[meter_prefix + "importvarhq1a"] = importvarhq1a
-        self.modbus_data[meter_prefix + "importvarhq1b"] = importvarhq1b
-        self.modbus_data[meter_prefix + "importvarhq1c"] = importvarhq1c
-        self.modbus_data[meter_prefix + "importvarhq2"] = importvarhq2
-        self.modbus_data[meter_prefix + "importvarhq2a"] = importvarhq2a
-        self.modbus_data[meter_prefix + "importvarhq2b"] = importvarhq2b
-        self.modbus_data[meter_prefix + "importvarhq2c"] = importvarhq2c
-        self.modbus_data[meter_prefix + "importvarhq3"] = importvarhq3
-        self.modbus_data[meter_prefix + "importvarhq3a"] = importvarhq3a
-        self.modbus_data[meter_prefix + "importvarhq3b"] = importvarhq3b
-        self.modbus_data[meter_prefix + "importvarhq3c"] = importvarhq3c
-        self.modbus_data[meter_prefix + "importvarhq4"] = importvarhq4
-        self.modbus_data[meter_prefix + "importvarhq4a"] = importvarhq4a
-        self.modbus_data[meter_prefix + "importvarhq4b"] = importvarhq4b
-        self.modbus_data[meter_prefix + "importvarhq4c"] = importvarhq4c
+        self.update_block(decoder, registers)
 
         return True
 
-    async def read_modbus_data_inverter(self):
-        """Read inverter data."""
-        inverter_data = await self.read_holding_registers(
-            unit=self._address, address=40071, count=38
+    async def read_device_info(self):
+        data = await self.read_holding_registers(
+            unit=self._address,
+            address=40004,
+            count=DEVICE_INFO_DECODER.count,
+            priority=PRIORITY_BACKGROUND,
         )
-        if inverter_data.isError():
+        if data.isError():
             return False
 
-        decoder = BinaryPayloadDecoder.fromRegisters(
-            inverter_data.registers, byteorder=Endian.BIG
-        )
-        accurrent = decoder.decode_16bit_uint()
-        accurrenta = decoder.decode_16bit_uint()
-        accurrentb = decoder.decode_16bit_uint()
-        accurrentc = decoder.decode_16bit_uint()
-        accurrentsf = decoder.decode_16bit_int()
-
-        accurrent = self.calculate_value(accurrent, accurrentsf)
-        accurrenta = self.calculate_value(accurrenta, accurrentsf)
-        accurrentb = self.calculate_value(accurrentb, accurrentsf)
-        accurrentc = self.calculate_value(accurrentc, accurrentsf)
-
-        self.modbus_data["accurrent"] = accurrent
-        self.modbus_data["accurrenta"] = accurrenta
-        self.modbus_data["accurrentb"] = accurrentb
-        self.modbus_data["accurrentc"] = accurrentc
-
-        acvoltageab = decoder.decode_16bit_uint()
-        acvoltagebc = decoder.decode_16bit_uint()
-        acvoltageca = decoder.decode_16bit_uint()
-        acvoltagean = decoder.decode_16bit_uint()
-        acvoltagebn = decoder.decode_16bit_uint()
-        acvoltagecn = decoder.decode_16bit_uint()
-        acvoltagesf = decoder.decode_16bit_int()
-
-        acvoltageab = self.calculate_value(acvoltageab, acvoltagesf)
-        acvoltagebc = self.calculate_value(acvoltagebc, acvoltagesf)
-        acvoltageca = self.calculate_value(acvoltageca, acvoltagesf)
-        acvoltagean = self.calculate_value(acvoltagean, acvoltagesf)
-        acvoltagebn = self.calculate_value(acvoltagebn, acvoltagesf)
-        acvoltagecn = self.calculate_value(acvoltagecn, acvoltagesf)
-
-        self.modbus_data["acvoltageab"] = acvoltageab
-        self.modbus_data["acvoltagebc"] = acvoltagebc
-        self.modbus_data["acvoltageca"] = acvoltageca
-        self.modbus_data["acvoltagean"] = acvoltagean
-        self.modbus_data["acvoltagebn"] = acvoltagebn
-        self.modbus_data["acvoltagecn"] = acvoltagecn
-
-        acpower = decoder.decode_16bit_int()
-        acpowersf = decoder.decode_16bit_int()
-        acpower = self.calculate_value(acpower, acpowersf)
-
-        self.modbus_data["acpower"] = acpower
-
-        acfreq = decoder.decode_16bit_uint()
-        acfreqsf = decoder.decode_16bit_int()
-        acfreq = self.calculate_value(acfreq, acfreqsf)
-
-        self.modbus_data["acfreq"] = acfreq
-
-        acva = decoder.decode_16bit_int()
-        acvasf = decoder.decode_16bit_int()
-        acva = self.calculate_value(acva, acvasf)
-
-        self.modbus_data["acva"] = acva
-
-        acvar = decoder.decode_16bit_int()
-        acvarsf = decoder.decode_16bit_int()
-        acvar = self.calculate_value(acvar, acvarsf)
-
-        self.modbus_data["acvar"] = acvar
-
-        acpf = decoder.decode_16bit_int()
-        acpfsf = decoder.decode_16bit_int()
-        acpf = self.calculate_value(acpf, acpfsf)
-
-        self.modbus_data["acpf"] = acpf
-
-        acenergy = decoder.decode_32bit_uint()
-        acenergysf = decoder.decode_16bit_uint()
-        acenergy = validate(self.calculate_value(acenergy, acenergysf), ">", 0)
-
-        self.modbus_data["acenergy"] = round(acenergy * 0.001, 3)
-
-        dccurrent = decoder.decode_16bit_uint()
-        dccurrentsf = decoder.decode_16bit_int()
-        dccurrent = self.calculate_value(dccurrent, dccurrentsf)
-
-        self.modbus_data["dccurrent"] = dccurrent
-
-        dcvoltage = decoder.decode_16bit_uint()
-        dcvoltagesf = decoder.decode_16bit_int()
-        dcvoltage = self.calculate_value(dcvoltage, dcvoltagesf)
-
-        self.modbus_data["dcvoltage"] = dcvoltage
-
-        dcpower = decoder.decode_16bit_int()
-        dcpowersf = decoder.decode_16bit_int()
-        dcpower = self.calculate_value(dcpower, dcpowersf)
-
-        self.modbus_data["dcpower"] = dcpower
-
-        # skip register
-        decoder.skip_bytes(2)
-
-        tempsink = decoder.decode_16bit_int()
-
-        # skip 2 registers
-        decoder.skip_bytes(4)
-
-        tempsf = decoder.decode_16bit_int()
-        tempsink = self.calculate_value(tempsink, tempsf)
-
-        self.modbus_data["tempsink"] = tempsink
-
-        status = decoder.decode_16bit_int()
-        self.modbus_data["status"] = status
-        statusvendor = decoder.decode_16bit_int()
-        self.modbus_data["statusvendor"] = statusvendor
+        self.device_info = DEVICE_INFO_DECODER.decode(data.registers)
+        self.static_info_changed = True
 
         return True
 
-    async def read_modbus_power_limit(self):
-        """Read the active power limit value (%)."""
+    def static_info(self) -> dict[str, Any]:
+        """Return the device and battery information to store."""
+        return {
+            "updated": self.static_info_updated,
+            "device_info": self.device_info,
+            "battery_info": {
+                battery_prefix: self.modbus_data[battery_prefix + "attrs"]
+                for battery_prefix in BATTERY_BLOCKS
+                if battery_prefix + "attrs" in self.modbus_data
+            },
+        }
 
-        inverter_data = await self.read_holding_registers(
-            unit=self._address, address=0xF001, count=1
+    def load_static_info(self, info: dict[str, Any] | None) -> bool:
+        """Use stored device and battery information, False if there is none."""
+        if not info:
+            return False
+        self.device_info = info["device_info"]
+        self.static_info_updated = info["updated"]
+        self.modbus_data.update_values(
+            {
+                battery_prefix + "attrs": attrs
+                for battery_prefix, attrs in info["battery_info"].items()
+            }
         )
-        if inverter_data.isError():
-            _LOGGER.debug("Could not read Active Power Limit")
-            # Don't stop reading other data, could just be advanced power management not enabled
-            return True
+        return True
 
-        decoder = BinaryPayloadDecoder.fromRegisters(
-            inverter_data.registers, byteorder=Endian.BIG, wordorder=Endian.LITTLE
-        )
-        # 0xF001 - 1 - Active Power Limit
-        self.modbus_data["nominal_active_power_limit"] = decoder.decode_16bit_uint()
+    async def refresh_static_info(self) -> bool:
+        """Read the device and battery information again once it expired.
 
+        Returns True when the firmware version changed.
+        """
+        now = time.time()
+        if now - self.static_info_updated < STATIC_INFO_TTL:
+            return False
+        version = self.device_info.get("version")
+        if not await self.read_device_info():
+            return False
+        self.static_info_updated = now
+        for battery_prefix, (info_block, *_) in BATTERY_BLOCKS.items():
+            if battery_prefix + "attrs" in self.modbus_data:
+                response = await self._read(
+                    info_block.key,
+                    info_block.address,
+                    info_block.count,
+                    PRIORITY_BACKGROUND,
+                )
+                if not response.isError():
+                    self.decode_modbus_data_battery_info(
+                        battery_prefix, response.registers
+                    )
+        return self.device_info["version"] != version
+
+    async def load_models(self, cache: SunSpecModelCache | None) -> bool:
+        """Use the stored SunSpec models of the device, False if there are none."""
+        if cache is None or (models := await cache.async_get(self.device_info)) is None:
+            return False
+        self.set_models(models)
         return True
 
-    async def read_modbus_data_storage(self, has_battery, has_meter):
-        """Read storage data."""
-        if has_battery:
-            count = 0x12  # Read storage block as well
-        elif has_meter:
-            count = 4  # Just read export control block
-        else:
-            return True  # Nothing to read here
+    async def discover_models(self, cache: SunSpecModelCache | None = None) -> None:
+        """Locate the inverter and meter models in the SunSpec model chain.
 
-        storage_data = await self.read_holding_registers(
-            unit=self._address, address=0xE000, count=count
-        )
-        if not storage_data.isError():
-            decoder = BinaryPayloadDecoder.fromRegisters(
-                storage_data.registers, byteorder=Endian.BIG, wordorder=Endian.LITTLE
+        The discovered models are stored in the cache. When the chain can not
+        be read the default addresses are used.
+        """
+        try:
+            models = await discover_models(
+                partial(self._read, "sunspec", priority=PRIORITY_BACKGROUND)
             )
-
-            # 0xE000 - 1 - Export control mode
-            export_control_mode = decoder.decode_16bit_uint() & 7
-            if export_control_mode in EXPORT_CONTROL_MODE:
-                self.modbus_data["export_control_mode"] = EXPORT_CONTROL_MODE[
-                    export_control_mode
-                ]
-            else:
-                self.modbus_data["export_control_mode"] = export_control_mode
-
-            # 0xE001 - 1 - Export control limit mode
-            export_control_limit_mode = decoder.decode_16bit_uint() & 1
-            if export_control_limit_mode in EXPORT_CONTROL_MODE:
-                self.modbus_data["export_control_limit_mode"] = (
-                    EXPORT_CONTROL_LIMIT_MODE[export_control_limit_mode]
-                )
-            else:
-                self.modbus_data["export_control_limit_mode"] = (
-                    export_control_limit_mode
-                )
-
-            # 0xE002 - 2 - Export control site limit
-            self.modbus_data["export_control_site_limit"] = round(
-                decoder.decode_32bit_float(), 3
+        except TRANSPORT_ERRORS as error:
+            _LOGGER.debug(
+                "Failed to read the SunSpec model chain of unit %s, using default"
+                " addresses: %s",
+                self._address,
+                error,
             )
-
-            if not has_battery:
-                # Done with the export control block
-                return True
-
-            # 0xE004 - 1 - storage control mode
-            storage_control_mode = decoder.decode_16bit_uint()
-            if storage_control_mode in STORAGE_CONTROL_MODE:
-                self.modbus_data["storage_contol_mode"] = STORAGE_CONTROL_MODE[
-                    storage_control_mode
-                ]
-            else:
-                self.modbus_data["storage_contol_mode"] = storage_control_mode
-
-            # 0xE005 - 1 - storage ac charge policy
-            storage_ac_charge_policy = decoder.decode_16bit_uint()
-            if storage_ac_charge_policy in STORAGE_AC_CHARGE_POLICY:
-                self.modbus_data["storage_ac_charge_policy"] = STORAGE_AC_CHARGE_POLICY[
-                    storage_ac_charge_policy
-                ]
-            else:
-                self.modbus_data["storage_ac_charge_policy"] = storage_ac_charge_policy
-
-            # 0xE006 - 2 - storage AC charge limit (kWh or %)
-            self.modbus_data["storage_ac_charge_limit"] = round(
-                decoder.decode_32bit_float(), 3
+            return
+        if models is None:
+            _LOGGER.info(
+                "No SunSpec model chain found on unit %s, using default addresses",
+                self._address,
             )
-
-            # 0xE008 - 2 - storage backup reserved capacity (%)
-            self.modbus_data["storage_backup_reserved"] = round(
-                decoder.decode_32bit_float(), 3
+            return
+        if cache is not None:
+            await cache.async_set(self.device_info, models)
+        self.set_models(models)
+
+    def set_models(self, models: list[SunSpecModel]) -> None:
+        """Read the inverter and meters at the addresses of their models."""
+        self.models = models
+        if inverters := find_models(models, INVERTER_MODELS):
+            self.inverter_block = replace(
+                INVERTER_BLOCK, address=inverters[0].data_address
             )
+        meters = [
+            model
+            for model in find_models(models, METER_MODELS)
+            if model.length >= METER_ENERGY_OFFSET + METER_DECODERS["m1_"][1].count
+        ]
+        self.meter_blocks = {
+            meter_prefix: meter_model_blocks(meter_prefix, model.data_address)
+            for meter_prefix, model in zip(METER_BLOCKS, meters)
+        }
+        _LOGGER.debug(
+            "SunSpec models of unit %s: %s",
+            self._address,
+            ", ".join(f"{model.model_id}@{model.address}" for model in models),
+        )
 
-            # 0xE00A - 1 - storage charge / discharge default mode
-            storage_default_mode = decoder.decode_16bit_uint()
-            if storage_default_mode in STORAGE_CHARGE_DISCHARGE_MODE:
-                self.modbus_data["storage_default_mode"] = (
-                    STORAGE_CHARGE_DISCHARGE_MODE[storage_default_mode]
-                )
-            else:
-                self.modbus_data["storage_default_mode"] = storage_default_mode
+    def decode_modbus_data_meter(self, meter_prefix, registers):
+        """Decode meter data."""
+        if registers is None:
+            return False
 
-            # 0xE00B - 2- storage remote command timeout (seconds)
-            self.modbus_data["storage_remote_command_timeout"] = (
-                decoder.decode_32bit_uint()
-            )
+        self.update_block(METER_DECODERS[meter_prefix][0], registers)
 
-            # 0xE00D - 1 - storage remote command mode
-            storage_remote_command_mode = decoder.decode_16bit_uint()
-            if storage_remote_command_mode in STORAGE_CHARGE_DISCHARGE_MODE:
-                self.modbus_data["storage_remote_command_mode"] = (
-                    STORAGE_CHARGE_DISCHARGE_MODE[storage_remote_command_mode]
-                )
-            else:
-                self.modbus_data["storage_remote_command_mode"] = (
-                    storage_remote_command_mode
-                )
+        return True
 
-            # 0xE00E - 2- storate remote charge limit
-            self.modbus_data["storage_remote_charge_limit"] = round(
-                decoder.decode_32bit_float(), 3
-            )
+    def decode_modbus_data_meter_energy(self, meter_prefix, registers):
+        """Decode meter energy counters."""
+        if registers is None:
+            return False
 
-            # 0xE010 - 2- storate remote discharge limit
-            self.modbus_data["storage_remote_discharge_limit"] = round(
-                decoder.decode_32bit_float(), 3
-            )
+        self.update_block(METER_DECODERS[meter_prefix][1], registers)
 
         return True
 
-    async def read_modbus_data_battery1(self):
-        """Read battery 1."""
-        return await self.read_modbus_data_battery("battery1_", 0xE100)
+    def decode_modbus_data_inverter(self, registers):
+        """Decode inverter data."""
+        if registers is None:
+            return False
 
-    async def read_modbus_data_battery2(self):
-        """Read battery 2."""
-        return await self.read_modbus_data_battery("battery2_", 0xE200)
+        self.update_block(INVERTER_DECODER, registers)
 
-    async def read_modbus_data_battery3(self):
-        """Read battery 3."""
-        return await self.read_modbus_data_battery("battery3_", 0xE400)
+        return True
 
-    async def read_modbus_data_battery(self, battery_prefix, start_address):
-        """Read battery data."""
-        if battery_prefix + "attrs" not in self.modbus_data:
-            battery_data = await self.read_holding_registers(
-                unit=self._address, address=start_address, count=0x4C
-            )
-            if not battery_data.isError():
-                decoder = BinaryPayloadDecoder.fromRegisters(
-                    battery_data.registers,
-                    byteorder=Endian.BIG,
-                    wordorder=Endian.LITTLE,
-                )
+    def decode_modbus_power_limit(self, registers):
+        """Decode the active power limit value (%)."""
+        if registers is None:
+            # Could just be advanced power management not enabled
+            _LOGGER.debug("Could not read Active Power Limit")
+            return False
 
-                battery_info = {}
-                # 0x00 - 16 - manufacturer
-                battery_info["manufacturer"] = decoder.decode_string(32)
+        self.update_block(POWER_LIMIT_DECODER, registers)
 
-                # 0x10 - 16 - model
-                battery_info["model"] = decoder.decode_string(32)
+        return True
 
-                # 0x20 - 16 - firmware version
-                battery_info["firmware_version"] = decoder.decode_string(32)
+    def decode_modbus_data_storage(self, registers, has_battery):
+        """Decode storage data."""
+        if registers is None:
+            return False
 
-                # 0x30 - 16 - serial number
-                battery_info["serial_number"] = decoder.decode_string(32)
+        decoder = STORAGE_DECODER if has_battery else EXPORT_CONTROL_DECODER
+        self.update_block(decoder, registers)
 
-                # 0x40 - 1 - device ID
-                battery_info["device_id"] = decoder.decode_16bit_uint()
+        return True
 
-                # 0x41 - 1 - reserved
-                decoder.decode_16bit_uint()
+    def decode_modbus_data_battery_info(self, battery_prefix, registers):
+        """Decode static battery information."""
+        if registers is None:
+            # Battery information is retried on the next poll
+            return True
 
-                # 0x42 - 2 - rated energy
-                battery_info["rated_energy"] = decoder.decode_32bit_float()
+        self.modbus_data.update_values(
+            {battery_prefix + "attrs": BATTERY_INFO_DECODER.decode(registers)}
+        )
+        self.static_info_changed = True
 
-                # 0x44 - 2 - max charge continuous power
-                battery_info["max_power_continuous_charge"] = (
-                    decoder.decode_32bit_float()
-                )
+        return True
 
-                # 0x46 - 2 - max discharge continuous power
-                battery_info["max_power_continuous_discharge"] = (
-                    decoder.decode_32bit_float()
-                )
+    def decode_modbus_data_battery(self, battery_prefix, registers):
+        """Decode battery data."""
+        if registers is None:
+            return False
 
-                # 0x48 - 2 - max charge peak power
-                battery_info["max_power_peak_charge"] = decoder.decode_32bit_float()
+        battery_data = BATTERY_DECODERS[battery_prefix][0].decode(registers)
+        self.mask_battery_data(battery_prefix, battery_data)
 
-                # 0x4A - 2 - max discharge peak power
-                battery_info["max_power_peak_discharge"] = decoder.decode_32bit_float()
+        self.modbus_data.update_values(battery_data)
 
-                self.modbus_data[battery_prefix + "attrs"] = battery_info
+        return True
 
-        storage_data = await self.read_holding_registers(
-            unit=self._address, address=start_address + 0x6C, count=28
-        )
-        if storage_data.isError():
+    def mask_battery_data(self, battery_prefix, battery_data) -> None:
+        """Zero the battery values which are bogus in the current status."""
+        # voltage and current are bogus in certain statuses
+        if self.battery_status.get(battery_prefix) not in [3, 4, 6]:
+            for key in ("voltage", "current", "power"):
+                if battery_prefix + key in battery_data:
+                    battery_data[battery_prefix + key] = 0
+
+    def decode_modbus_data_battery_state(
+        self, battery_prefix, registers, decoder: BlockDecoder | None = None
+    ):
+        """Decode battery energy counters, capacity, charge and status.
+
+        The status probe passes the decoder of the status alone.
+        """
+        if registers is None:
             return False
 
-        decoder = BinaryPayloadDecoder.fromRegisters(
-            storage_data.registers, byteorder=Endian.BIG, wordorder=Endian.LITTLE
-        )
-
-        # 0x6C - 2 - avg temp C
-        tempavg = decoder.decode_32bit_float()
-        # 0x6E - 2 - max temp C
-        tempmax = decoder.decode_32bit_float()
-        # 0x70 - 2 - inst voltage V
-        batteryvoltage = decoder.decode_32bit_float()
-        # 0x72 - 2 - inst current A
-        batterycurrent = decoder.decode_32bit_float()
-        # 0x74 - 2 - inst power W
-        batterypower = decoder.decode_32bit_float()
-        # 0x76 - 4 - cumulative discharged (Wh)
-        cumulative_discharged = decoder.decode_64bit_uint()
-        # 0x7a - 4 - cumulative charged (Wh)
-        cumulative_charged = decoder.decode_64bit_uint()
-        # 0x7E - 2 - current max size Wh
-        battery_max = decoder.decode_32bit_float()
-        # 0x80 - 2 - available size Wh
-        battery_availbable = decoder.decode_32bit_float()
-        # 0x82 - 2 - SoH %
-        battery_SoH = decoder.decode_32bit_float()
-        # 0x84 - 2 - SoC %
-        battery_SoC = validate(decoder.decode_32bit_float(), ">=", 0.0)
-        battery_SoC = validate(battery_SoC, "<", 101)
-
-        self.modbus_data[battery_prefix + "temp_avg"] = round(tempavg, 1)
-        self.modbus_data[battery_prefix + "temp_max"] = round(tempmax, 1)
-        self.modbus_data[battery_prefix + "voltage"] = round(batteryvoltage, 3)
-        self.modbus_data[battery_prefix + "current"] = round(batterycurrent, 3)
-        self.modbus_data[battery_prefix + "power"] = round(batterypower, 3)
-        self.modbus_data[battery_prefix + "energy_discharged"] = round(
-            cumulative_discharged / 1000, 3
-        )
-        self.modbus_data[battery_prefix + "energy_charged"] = round(
-            cumulative_charged / 1000, 3
-        )
-        self.modbus_data[battery_prefix + "size_max"] = round(battery_max, 3)
-        self.modbus_data[battery_prefix + "size_available"] = round(
-            battery_availbable, 3
+        battery_data = (decoder or BATTERY_DECODERS[battery_prefix][1]).decode(
+            registers
         )
-        self.modbus_data[battery_prefix + "state_of_health"] = round(battery_SoH, 0)
-        self.modbus_data[battery_prefix + "state_of_charge"] = round(battery_SoC, 0)
-        battery_status = decoder.decode_32bit_uint()
-
-        # voltage and current are bogus in certain statuses
-        if battery_status not in [3, 4, 6]:
-            self.modbus_data[battery_prefix + "voltage"] = 0
-            self.modbus_data[battery_prefix + "current"] = 0
-            self.modbus_data[battery_prefix + "power"] = 0
+        battery_status = battery_data[battery_prefix + "status"]
+        self.battery_status[battery_prefix] = battery_status
 
         if battery_status in BATTERY_STATUSSES:
-            self.modbus_data[battery_prefix + "status"] = BATTERY_STATUSSES[
-                battery_status
-            ]
-        else:
-            self.modbus_data[battery_prefix + "status"] = battery_status
+            battery_data[battery_prefix + "status"] = BATTERY_STATUSSES[battery_status]
+
+        self.modbus_data.update_values(battery_data)
 
         return True
 
@@ -1008,8 +1141,18 @@ class SolaredgeModbusCoordinator(DataUpdateCoordinator):
         read_battery2=False,
         read_battery3=False,
         max_export_control_site_limit=False,
+        scan_interval_medium=None,
+        scan_interval_slow=None,
+        followers=(),
+        force_refresh_interval=DEFAULT_FORCE_REFRESH_INTERVAL,
+        sleep_scan_interval=DEFAULT_SLEEP_SCAN_INTERVAL,
+        idle_battery_scan_interval=DEFAULT_IDLE_BATTERY_SCAN_INTERVAL,
     ) -> None:
-        """Initialize the Modbus hub."""
+        """Initialize the Modbus hub.
+
+        The hub is the leader unit, which the meters and batteries are
+        connected to. Of the follower units only the inverter is read.
+        """
         super().__init__(
             hass,
             _LOGGER,
@@ -1018,6 +1161,7 @@ class SolaredgeModbusCoordinator(DataUpdateCoordinator):
             update_interval=timedelta(seconds=scan_interval),
         )
         self.hub = hub
+        self.followers = list(followers)
         self.power_control_enabled = power_control
         self.read_meter1 = read_meter1
         self.read_meter2 = read_meter2
@@ -1026,6 +1170,24 @@ class SolaredgeModbusCoordinator(DataUpdateCoordinator):
         self.read_battery2 = read_battery2
         self.read_battery3 = read_battery3
         self.max_export_control_site_limit = max_export_control_site_limit
+        self.poll_intervals = {
+            POLL_TIER_FAST: scan_interval,
+            POLL_TIER_MEDIUM: scan_interval_medium or scan_interval,
+            POLL_TIER_SLOW: scan_interval_slow or scan_interval,
+        }
+        self._next_poll = dict.fromkeys(self.poll_intervals, 0.0)
+        self.poll_rules = poll_rules(sleep_scan_interval, idle_battery_scan_interval)
+        # Monotonic time the blocks held back by a poll rule are due again, by
+        # unit and block key
+        self._held_back: dict[tuple[int, str], float] = {}
+        self.force_refresh_interval = force_refresh_interval
+        self._next_refresh = 0.0
+        self.refresh_all = False
+        self.metrics = CycleMetrics(scan_interval)
+        self.statistics = poll_statistics(self.metrics, hub.connection.metrics)
+        self.static_info_cached = False
+        for unit in self.hubs:
+            unit.writer.on_written = partial(self.publish_values, unit)
 
     @property
     def modbus_data(self):
@@ -1035,47 +1197,413 @@ class SolaredgeModbusCoordinator(DataUpdateCoordinator):
     def device_info(self):
         return self.hub.device_info
 
+    @property
+    def hubs(self) -> list[SolaredgeModbusHub]:
+        """Return the hubs of all units, the leader first."""
+        return [self.hub, *self.followers]
+
+    def start_cycle(self) -> None:
+        """Give the requests of all units a fresh retry budget for a cycle.
+
+        The budget belongs to the cycle of this coordinator, other entries on
+        the same connection have budgets of their own.
+        """
+        retries = RetryBudget()
+        for hub in self.hubs:
+            hub.retries = retries
+
     async def _async_setup(self):
-        """Initialize device information."""
-        if not await self.hub.check_and_reconnect():
+        """Initialize device information.
+
+        The device information and SunSpec models are taken from the storage
+        when available, only the missing ones are read from the units.
+        """
+        self.start_cycle()
+        model_cache = None
+        stored = {}
+        if self.hass is not None:
+            model_cache = get_model_cache(self.hass)
+            if self.config_entry is not None:
+                stored = await get_static_info_cache(self.hass).async_get(
+                    self.config_entry.entry_id
+                )
+
+        missing = [
+            hub
+            for hub in self.hubs
+            if not hub.load_static_info(stored.get(str(hub.get_unit())))
+        ]
+        self.static_info_cached = not missing
+        if missing and not await self.hub.check_and_reconnect():
             raise UpdateFailed("Unable to connect")
-        if not await self.hub.read_device_info():
-            raise UpdateFailed("Unable to read serial number")
+        for hub in missing:
+            if not await hub.read_device_info():
+                raise UpdateFailed(
+                    f"Unable to read serial number of unit {hub.get_unit()}"
+                )
+            hub.static_info_updated = time.time()
+
+        for hub in self.hubs:
+            # Without a connection the unit is read at the default addresses
+            if (
+                not await hub.load_models(model_cache)
+                and await self.hub.check_and_reconnect()
+            ):
+                await hub.discover_models(model_cache)
+        if self.hub.models is not None:
+            # Meters are read as found in the model chain instead of as
+            # configured
+            for meter, meter_prefix in enumerate(METER_BLOCKS, 1):
+                found = meter_prefix in self.hub.meter_blocks
+                if found != getattr(self, f"read_meter{meter}"):
+                    _LOGGER.info(
+                        "Meter %s is %s the SunSpec model chain, %s reading it",
+                        meter,
+                        "in" if found else "not in",
+                        "enabling" if found else "disabling",
+                    )
+                    setattr(self, f"read_meter{meter}", found)
 
     async def _async_update_data(self) -> dict:
         """Time to update."""
+        start = time.perf_counter()
+        registers = self.registers_read
+        success = False
+        try:
+            data = await self._update_data()
+            success = True
+        finally:
+            self.metrics.add_cycle(
+                time.perf_counter() - start, self.registers_read - registers, success
+            )
+            self.statistics = poll_statistics(self.metrics, self.hub.connection.metrics)
+        return data
+
+    async def _update_data(self) -> dict:
+        """Read the data of all units."""
+        self.start_cycle()
         if not await self.hub.check_and_reconnect():
             raise UpdateFailed("Unable to connect")
 
         try:
             update_succeeded = await self.read_modbus_data()
-        except Exception as error:
+            if update_succeeded:
+                await self.refresh_static_info()
+        except TRANSPORT_ERRORS as error:
             await self.hub.close()
             raise UpdateFailed(error) from error
+        finally:
+            await self.async_save_static_info()
+
+        # The blocks read before a transport error are published, the next
+        # cycle starts on a fresh connection
+        transport_errors = [
+            hub.transport_error for hub in self.hubs if hub.transport_error is not None
+        ]
+        if transport_errors:
+            await self.hub.close()
 
         if not update_succeeded:
+            if transport_errors:
+                raise UpdateFailed(transport_errors[0])
             raise UpdateFailed("Modbus update failed")
 
         return self.modbus_data
 
-    async def read_modbus_data(self):
-        """Read all modbus data."""
-        return (
-            await self.hub.read_modbus_data_inverter()
-            and (
-                not self.power_control_enabled
-                or await self.hub.read_modbus_power_limit()
+    async def refresh_static_info(self) -> None:
+        """Read the expired static information of the units again.
+
+        The entry is reloaded after a firmware update, which may change the
+        SunSpec models.
+        """
+        for hub in self.hubs:
+            if await hub.refresh_static_info() and self.config_entry is not None:
+                _LOGGER.info(
+                    "Firmware of unit %s changed to %s, reloading",
+                    hub.get_unit(),
+                    hub.device_info["version"],
+                )
+                self.hass.config_entries.async_schedule_reload(
+                    self.config_entry.entry_id
+                )
+
+    async def async_save_static_info(self) -> None:
+        """Store the static information of the units when it changed."""
+        if not any(hub.static_info_changed for hub in self.hubs):
+            return
+        for hub in self.hubs:
+            hub.static_info_changed = False
+        if self.hass is None or self.config_entry is None:
+            return
+        await get_static_info_cache(self.hass).async_set(
+            self.config_entry.entry_id,
+            {str(hub.get_unit()): hub.static_info() for hub in self.hubs},
+        )
+
+    @callback
+    def publish_values(self, hub: SolaredgeModbusHub, values: dict[str, Any]) -> None:
+        """Publish values of a unit to the entities, e.g. after writing them.
+
+        The changed values are added to the changes of the poll, which are
+        only cleared when the next poll starts, so a poll whose listeners are
+        not yet updated keeps its changes.
+        """
+        hub.modbus_data.update_values(values)
+        self.async_update_listeners()
+
+    @property
+    def registers_read(self) -> int:
+        """Return the number of registers read from all units."""
+        return sum(hub.metrics.registers for hub in self.hubs)
+
+    def register_blocks(self, hub: SolaredgeModbusHub) -> list[RegisterBlock]:
+        """Return all register blocks to read from the unit of hub."""
+        blocks = [hub.inverter_block]
+        if self.power_control_enabled:
+            blocks.append(POWER_LIMIT_BLOCK)
+        if hub is not self.hub:
+            return blocks
+
+        for read_meter, meter_prefix in (
+            (self.read_meter1, "m1_"),
+            (self.read_meter2, "m2_"),
+            (self.read_meter3, "m3_"),
+        ):
+            if read_meter and meter_prefix in hub.meter_blocks:
+                blocks.extend(hub.meter_blocks[meter_prefix])
+
+        if self.has_battery:
+            blocks.append(STORAGE_BLOCK)
+        elif self.has_meter:
+            blocks.append(EXPORT_CONTROL_BLOCK)
+
+        for read_battery, battery_prefix in (
+            (self.read_battery1, "battery1_"),
+            (self.read_battery2, "battery2_"),
+            (self.read_battery3, "battery3_"),
+        ):
+            if read_battery:
+                info_block, battery_block, state_block = BATTERY_BLOCKS[battery_prefix]
+                if battery_prefix + "attrs" not in hub.modbus_data:
+                    blocks.append(info_block)
+                blocks.extend((battery_block, state_block))
+
+        return blocks
+
+    def poll_blocks(self, hub: SolaredgeModbusHub, now: float) -> list[RegisterBlock]:
+        """Return the register blocks to read, split into the parts in use.
+
+        Of the blocks a poll rule holds back only the probe keys are read,
+        from the block itself or from its probe block.
+        """
+        hub.enabled_keys = self.enabled_keys(hub)
+        held_back = self.held_back_blocks(hub, now)
+        hub.probe_keys = {
+            key: keys
+            for key, keys in held_back.items()
+            if keys and key in SUBSET_DECODERS
+        }
+        blocks = []
+        for block in self.register_blocks(hub):
+            if block.key in held_back and block.key not in hub.probe_keys:
+                if block.key in PROBE_BLOCKS:
+                    blocks.append(PROBE_BLOCKS[block.key][0])
+                continue
+            if block.key in SUBSET_DECODERS:
+                blocks.extend(part for part, _ in hub.block_parts(block))
+            else:
+                blocks.append(block)
+        return blocks
+
+    def enabled_keys(self, hub: SolaredgeModbusHub) -> frozenset[str] | None:
+        """Return the keys of the values the enabled entities of a unit use.
+
+        Disabled entities are not added to Home Assistant and never listen to
+        the coordinator, so the plan follows the entity registry. Returns
+        None to read all values until entities listen, e.g. on the first
+        refresh.
+        """
+        contexts = list(self.async_contexts())
+        if not contexts:
+            return None
+        unit = hub.get_unit()
+        return frozenset(
+            key
+            for context_unit, keys in contexts
+            if context_unit == unit
+            for key in keys
+        ).union(*(rule.probe for rule in self.poll_rules))
+
+    def held_back_blocks(
+        self, hub: SolaredgeModbusHub, now: float
+    ) -> dict[str, frozenset[str]]:
+        """Return the blocks of a unit held back by a poll rule with their probe keys."""
+        unit = hub.get_unit()
+        return {
+            rule.block: rule.probe
+            for rule in self.poll_rules
+            if self._held_back.get((unit, rule.block), 0.0) > now
+        }
+
+    def apply_poll_rules(self, hub: SolaredgeModbusHub, now: float) -> None:
+        """Hold back or release the blocks of a unit after its state was read."""
+        unit = hub.get_unit()
+        for rule in self.poll_rules:
+            key = (unit, rule.block)
+            if not rule.applies(hub):
+                if self._held_back.pop(key, None) is not None:
+                    _LOGGER.debug(
+                        "Reading %s of unit %s at the normal rate", rule.block, unit
+                    )
+                continue
+            if self._held_back.get(key, 0.0) <= now:
+                if key not in self._held_back:
+                    _LOGGER.debug(
+                        "Reading %s of unit %s every %s s",
+                        rule.block,
+                        unit,
+                        rule.interval,
+                    )
+                # Read in this poll, allow for timer jitter as for the tiers
+                self._held_back[key] = (
+                    now + rule.interval - self.update_interval.total_seconds() / 2
+                )
+
+    def due_tiers(self, now: float) -> set[str]:
+        """Return the poll tiers which are due at monotonic time now."""
+        return {tier for tier, next_poll in self._next_poll.items() if now >= next_poll}
+
+    def block_decoders(self, hub: SolaredgeModbusHub):
+        """Return the blocks with the function decoding them, in decoding order."""
+        decoders = [
+            *hub.part_decoders(hub.inverter_block, hub.decode_modbus_data_inverter),
+            (POWER_LIMIT_BLOCK, hub.decode_modbus_power_limit),
+        ]
+        for meter_prefix, (meter_block, energy_block) in hub.meter_blocks.items():
+            decoders.extend(
+                hub.part_decoders(
+                    meter_block, partial(hub.decode_modbus_data_meter, meter_prefix)
+                )
+            )
+            decoders.extend(
+                hub.part_decoders(
+                    energy_block,
+                    partial(hub.decode_modbus_data_meter_energy, meter_prefix),
+                )
             )
-            and (not self.read_meter1 or await self.hub.read_modbus_data_meter1())
-            and (not self.read_meter2 or await self.hub.read_modbus_data_meter2())
-            and (not self.read_meter3 or await self.hub.read_modbus_data_meter3())
-            and await self.hub.read_modbus_data_storage(
-                self.has_battery, self.has_meter
+        for block in (STORAGE_BLOCK, EXPORT_CONTROL_BLOCK):
+            decoders.append(
+                (
+                    block,
+                    partial(
+                        hub.decode_modbus_data_storage, has_battery=self.has_battery
+                    ),
+                )
             )
-            and (not self.read_battery1 or await self.hub.read_modbus_data_battery1())
-            and (not self.read_battery2 or await self.hub.read_modbus_data_battery2())
-            and (not self.read_battery3 or await self.hub.read_modbus_data_battery3())
+        for battery_prefix, blocks in BATTERY_BLOCKS.items():
+            info_block, battery_block, state_block = blocks
+            decoders.append(
+                (
+                    info_block,
+                    partial(hub.decode_modbus_data_battery_info, battery_prefix),
+                )
+            )
+            # The battery status is needed to decode the battery data
+            decoders.append(
+                (
+                    state_block,
+                    partial(hub.decode_modbus_data_battery_state, battery_prefix),
+                )
+            )
+            probe_block, probe_decoder = PROBE_BLOCKS[battery_block.key]
+            decoders.append(
+                (
+                    probe_block,
+                    partial(
+                        hub.decode_modbus_data_battery_state,
+                        battery_prefix,
+                        decoder=probe_decoder,
+                    ),
+                )
+            )
+            decoders.append(
+                (battery_block, partial(hub.decode_modbus_data_battery, battery_prefix))
+            )
+        return decoders
+
+    async def read_modbus_data(self):
+        """Read the modbus data of all poll tiers which are due from all units.
+
+        Every block of every unit succeeds or fails on its own, failed blocks
+        are retried on the next poll. Returns False when no block could be
+        decoded.
+        """
+        now = time.monotonic()
+        tiers = self.due_tiers(now)
+        hubs = self.hubs
+        for hub in hubs:
+            hub.modbus_data.changed.clear()
+            hub.transport_error = None
+        # Entities only write their state when their value changed, unless
+        # all states are refreshed periodically
+        self.refresh_all = bool(self.force_refresh_interval) and now >= (
+            self._next_refresh
+        )
+        if self.refresh_all:
+            self._next_refresh = now + self.force_refresh_interval
+        hub_blocks = [
+            [
+                block
+                for block in self.poll_blocks(hub, now)
+                if block.tier in tiers or not hub.block_available.get(block.key, True)
+            ]
+            for hub in hubs
+        ]
+        # A unit failing as a whole does not fail the other units
+        results = await asyncio.gather(
+            *(hub.read_blocks(blocks) for hub, blocks in zip(hubs, hub_blocks)),
+            return_exceptions=True,
         )
+        for index, (hub, blocks, result) in enumerate(zip(hubs, hub_blocks, results)):
+            if not isinstance(result, BaseException):
+                continue
+            if not isinstance(result, ModbusException):
+                raise result
+            _LOGGER.debug("Failed to read unit %s: %s", hub.get_unit(), result)
+            hub.transport_error = result
+            results[index] = dict.fromkeys((block.key for block in blocks), None)
+
+        decoded = False
+        for hub, registers in zip(hubs, results):
+            for block, decode in self.block_decoders(hub):
+                if block.key not in registers:
+                    continue
+                start = time.perf_counter()
+                try:
+                    available = decode(registers[block.key])
+                except ValueError as error:
+                    _LOGGER.debug(
+                        "Failed to decode %s of unit %s: %s",
+                        block.key,
+                        hub.get_unit(),
+                        error,
+                    )
+                    available = False
+                hub.metrics.decode_time(block.key).add(time.perf_counter() - start)
+                hub.set_block_available(block, available)
+                decoded = decoded or available
+            self.apply_poll_rules(hub, now)
+
+        # Allow for timer jitter, a tier is due again when less than half a
+        # scan interval of its poll interval is left
+        for tier in tiers:
+            self._next_poll[tier] = (
+                now
+                + self.poll_intervals[tier]
+                - self.update_interval.total_seconds() / 2
+            )
+
+        return decoded or not any(results)
 
     @property
     def has_meter(self):
@@ -1088,18 +1616,235 @@ class SolaredgeModbusCoordinator(DataUpdateCoordinator):
         return self.read_battery1 or self.read_battery2 or self.read_battery3
 
 
+class SolaredgeFastCoordinator(DataUpdateCoordinator):
+    """Reads a few values of the leader unit at a high rate.
+
+    The hot set, e.g. the site and inverter power for load following, is read
+    on the connection of the hub in as few requests as its registers allow.
+    Its reads go ahead of the queued poll requests and behind the control
+    writes, are not retried and leave reconnecting to the poll.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        coordinator: SolaredgeModbusCoordinator,
+        keys,
+        interval: float,
+    ) -> None:
+        """Initialize the fast coordinator.
+
+        :param coordinator: The coordinator of the hub to share the connection of
+        :param keys: The keys of the values to read
+        :param interval: Seconds between the reads, may be less than one
+        """
+        # The update interval of the coordinator is rounded to whole seconds,
+        # the reads are timed by async_start instead
+        super().__init__(
+            hass, _LOGGER, config_entry=entry, name=f"{coordinator.name} fast"
+        )
+        self.coordinator = coordinator
+        self.keys = frozenset(keys)
+        self.interval = interval
+        self.read_plan: list[ReadRequest] = []
+        self._parts: list[tuple[RegisterBlock, BlockDecoder, str | None]] | None = None
+        self._reading = False
+        self.skipped = 0
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Start reading at the interval, returns the function stopping it."""
+        return async_track_time_interval(
+            self.hass,
+            self._async_read,
+            timedelta(seconds=self.interval),
+            name=self.name,
+            cancel_on_shutdown=True,
+        )
+
+    async def _async_read(self, _now) -> None:
+        """Read the hot set unless the previous read is still running."""
+        if self._reading:
+            self.skipped += 1
+            return
+        self._reading = True
+        try:
+            await self.async_refresh()
+        finally:
+            self._reading = False
+
+    def read_parts(self) -> list[tuple[RegisterBlock, BlockDecoder, str | None]]:
+        """Return the parts of the polled blocks holding the keys.
+
+        Every part comes with its decoder and the prefix of its battery, as
+        the battery values depend on the status read by the poll.
+        """
+        hub = self.coordinator.hub
+        polled = {block.key for block in self.coordinator.register_blocks(hub)}
+        sources = [(hub.inverter_block, INVERTER_DECODER, None)]
+        for meter_prefix, (meter_block, _) in hub.meter_blocks.items():
+            sources.append((meter_block, METER_DECODERS[meter_prefix][0], None))
+        for battery_prefix, (_, battery_block, _) in BATTERY_BLOCKS.items():
+            sources.append(
+                (battery_block, BATTERY_DECODERS[battery_prefix][0], battery_prefix)
+            )
+
+        parts = []
+        found: set[str] = set()
+        for block, decoder, battery_prefix in sources:
+            keys = self.keys.intersection(decoder.keys)
+            if not keys or block.key not in polled:
+                continue
+            found.update(keys)
+            for part, (offset, subset) in enumerate(
+                decoder.subset(keys, DEFAULT_MAX_READ_GAP), 1
+            ):
+                parts.append(
+                    (
+                        RegisterBlock(
+                            f"{block.key}_fast_{part}",
+                            block.address + offset,
+                            subset.count,
+                        ),
+                        subset,
+                        battery_prefix,
+                    )
+                )
+        if missing := self.keys - found:
+            _LOGGER.warning(
+                "Unable to read %s of %s at the fast interval",
+                ", ".join(sorted(missing)),
+                self.coordinator.name,
+            )
+        return parts
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        """Read the hot set of the leader unit."""
+        hub = self.coordinator.hub
+        if not hub.connection.connected:
+            raise UpdateFailed("Waiting for the poll to connect")
+        if self._parts is None:
+            self._parts = self.read_parts()
+            self.read_plan = plan_reads([part for part, _, _ in self._parts])
+            _LOGGER.debug("Fast read plan: %s", describe_plan(self.read_plan))
+
+        try:
+            responses = await asyncio.gather(
+                *(
+                    hub.read_holding_registers(
+                        hub.get_unit(),
+                        request.address,
+                        request.count,
+                        PRIORITY_FAST,
+                        retry=False,
+                    )
+                    for request in self.read_plan
+                )
+            )
+        except TRANSPORT_ERRORS as error:
+            raise UpdateFailed(error) from error
+
+        registers = {}
+        for request, response in zip(self.read_plan, responses):
+            if response.isError():
+                raise UpdateFailed(f"Unable to read the fast values: {response}")
+            register_bytes = getattr(response, "register_bytes", None)
+            registers.update(
+                request.split(
+                    response.registers if register_bytes is None else register_bytes
+                )
+            )
+
+        values = {}
+        for part, decoder, battery_prefix in self._parts:
+            try:
+                part_values = decoder.decode(registers[part.key])
+            except ValueError as error:
+                raise UpdateFailed(f"Failed to decode {part.key}: {error}") from error
+            if battery_prefix is not None:
+                hub.mask_battery_data(battery_prefix, part_values)
+            values.update(part_values)
+        return {key: value for key, value in values.items() if key in self.keys}
+
+
 class SolarEdgeEntity(CoordinatorEntity):
     """Representation of a solaredge entity."""
 
-    def __init__(self, hub: SolaredgeModbusCoordinator) -> None:
-        """Init SolarEdgeEntity."""
-        super().__init__(hub)
+    def __init__(
+        self,
+        hub: SolaredgeModbusCoordinator,
+        unit: SolaredgeModbusHub | None = None,
+        coordinator: DataUpdateCoordinator | None = None,
+    ) -> None:
+        """Init SolarEdgeEntity.
+
+        Entities of follower units pass the hub of their unit. Entities updated
+        by another coordinator than the hub, e.g. the fast one, pass it.
+        """
+        super().__init__(coordinator or hub)
         self.hub = hub
+        self.unit = unit or hub.hub
+        self._published_available: bool | None = None
+        device_info = self.unit.device_info
         self._attr_device_info = DeviceInfo(
             name=hub.name,
-            identifiers={(DOMAIN, hub.device_info["serial_number"])},
-            manufacturer=hub.device_info["manufacturer"],
-            model=hub.device_info["model"],
-            serial_number=hub.device_info["serial_number"],
-            sw_version=hub.device_info["version"],
+            identifiers={(DOMAIN, device_info["serial_number"])},
+            manufacturer=device_info["manufacturer"],
+            model=device_info["model"],
+            serial_number=device_info["serial_number"],
+            sw_version=device_info["version"],
+        )
+        if self.unit is not hub.hub:
+            self._attr_device_info["name"] = f"{hub.name} {self.unit.get_unit()}"
+            self._attr_device_info["via_device"] = (
+                DOMAIN,
+                hub.device_info["serial_number"],
+            )
+
+    async def async_added_to_hass(self) -> None:
+        """Listen to the coordinator for the data keys of the unit.
+
+        The keys of the listening entities decide which registers are read.
+        """
+        self.coordinator_context = (self.unit.get_unit(), self.data_keys)
+        await super().async_added_to_hass()
+
+    @property
+    def unique_id_prefix(self) -> str:
+        """Return the prefix of the unique ids of the entities of the unit."""
+        if self.unit is self.hub.hub:
+            return self.hub.name
+        return f"{self.hub.name}_{self.unit.get_unit()}"
+
+    @property
+    def data_keys(self) -> tuple[str, ...]:
+        """Return the keys of the data the state of the entity depends on."""
+        return (self.entity_description.key,)
+
+    @cached_property
+    def data_fields(self) -> frozenset[int]:
+        """Return the field indexes of the data the state depends on."""
+        return frozenset(DATA_LAYOUT.indexes(self.data_keys))
+
+    def state_changed(self) -> bool:
+        """Return true if the state of the entity needs to be written."""
+        return (
+            self.hub.refresh_all
+            or self.available != self._published_available
+            or not self.unit.modbus_data.changed.isdisjoint(self.data_fields)
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only when it changed since the last update."""
+        if self.state_changed():
+            self._published_available = self.available
+            super()._handle_coordinator_update()
+
+    @property
+    def available(self) -> bool:
+        """Return if the register block of the entity is available."""
+        return super().available and self.unit.key_available(
+            self.entity_description.key
         )
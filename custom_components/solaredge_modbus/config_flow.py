@@ -10,8 +10,14 @@ from homeassistant.const import CONF_HOST, CONF_NAME, CONF_PORT, CONF_SCAN_INTER
 from homeassistant.core import HomeAssistant, callback
 
 from .const import (
+    CONF_FAST_KEYS,
+    CONF_FAST_SCAN_INTERVAL,
+    CONF_FOLLOWER_ADDRESSES,
+    CONF_FORCE_REFRESH_INTERVAL,
+    CONF_IDLE_BATTERY_SCAN_INTERVAL,
     CONF_MAX_EXPORT_CONTROL_SITE_LIMIT,
     CONF_MODBUS_ADDRESS,
+    CONF_PIPELINE_DEPTH,
     CONF_POWER_CONTROL,
     CONF_READ_BATTERY1,
     CONF_READ_BATTERY2,
@@ -19,9 +25,18 @@ from .const import (
     CONF_READ_METER1,
     CONF_READ_METER2,
     CONF_READ_METER3,
+    CONF_SCAN_INTERVAL_MEDIUM,
+    CONF_SCAN_INTERVAL_SLOW,
+    CONF_SLEEP_SCAN_INTERVAL,
+    CONF_WRITE_DEBOUNCE,
+    DEFAULT_FAST_KEYS,
+    DEFAULT_FAST_SCAN_INTERVAL,
+    DEFAULT_FORCE_REFRESH_INTERVAL,
+    DEFAULT_IDLE_BATTERY_SCAN_INTERVAL,
     DEFAULT_MAX_EXPORT_CONTROL_SITE_LIMIT,
     DEFAULT_MODBUS_ADDRESS,
     DEFAULT_NAME,
+    DEFAULT_PIPELINE_DEPTH,
     DEFAULT_PORT,
     DEFAULT_POWER_CONTROL,
     DEFAULT_READ_BATTERY1,
@@ -31,7 +46,12 @@ from .const import (
     DEFAULT_READ_METER2,
     DEFAULT_READ_METER3,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_SCAN_INTERVAL_MEDIUM,
+    DEFAULT_SCAN_INTERVAL_SLOW,
+    DEFAULT_SLEEP_SCAN_INTERVAL,
+    DEFAULT_WRITE_DEBOUNCE,
     DOMAIN,
+    MAX_PIPELINE_DEPTH,
 )
 
 DATA_SCHEMA = vol.Schema(
@@ -48,6 +68,28 @@ DATA_SCHEMA = vol.Schema(
         vol.Optional(CONF_READ_BATTERY2, default=DEFAULT_READ_BATTERY2): bool,
         vol.Optional(CONF_READ_BATTERY3, default=DEFAULT_READ_BATTERY3): bool,
         vol.Optional(CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL): int,
+        vol.Optional(
+            CONF_SCAN_INTERVAL_MEDIUM, default=DEFAULT_SCAN_INTERVAL_MEDIUM
+        ): int,
+        vol.Optional(CONF_SCAN_INTERVAL_SLOW, default=DEFAULT_SCAN_INTERVAL_SLOW): int,
+        vol.Optional(CONF_PIPELINE_DEPTH, default=DEFAULT_PIPELINE_DEPTH): vol.All(
+            int, vol.Range(min=1, max=MAX_PIPELINE_DEPTH)
+        ),
+        vol.Optional(
+            CONF_FORCE_REFRESH_INTERVAL, default=DEFAULT_FORCE_REFRESH_INTERVAL
+        ): int,
+        vol.Optional(CONF_WRITE_DEBOUNCE, default=DEFAULT_WRITE_DEBOUNCE): int,
+        vol.Optional(
+            CONF_SLEEP_SCAN_INTERVAL, default=DEFAULT_SLEEP_SCAN_INTERVAL
+        ): int,
+        vol.Optional(
+            CONF_IDLE_BATTERY_SCAN_INTERVAL, default=DEFAULT_IDLE_BATTERY_SCAN_INTERVAL
+        ): int,
+        vol.Optional(
+            CONF_FAST_SCAN_INTERVAL, default=DEFAULT_FAST_SCAN_INTERVAL
+        ): vol.All(int, vol.Range(min=0)),
+        vol.Optional(CONF_FAST_KEYS, default=", ".join(DEFAULT_FAST_KEYS)): str,
+        vol.Optional(CONF_FOLLOWER_ADDRESSES, default=""): str,
         vol.Optional(
             CONF_MAX_EXPORT_CONTROL_SITE_LIMIT,
             default=DEFAULT_MAX_EXPORT_CONTROL_SITE_LIMIT,
@@ -66,11 +108,62 @@ def host_valid(host):
         return all(x and not disallowed.search(x) for x in host.split("."))
 
 
+def unit_key(data):
+    """Return the host, port and unit identifying a configured inverter."""
+    return (
+        data[CONF_HOST],
+        data.get(CONF_PORT, DEFAULT_PORT),
+        data.get(CONF_MODBUS_ADDRESS, DEFAULT_MODBUS_ADDRESS),
+    )
+
+
+def unit_keys(data):
+    """Return the host, port and unit of the leader and follower inverters."""
+    host, port, _ = unit_key(data)
+    return {unit_key(data)} | {
+        (host, port, address) for address in data.get(CONF_FOLLOWER_ADDRESSES, [])
+    }
+
+
+def parse_follower_addresses(data):
+    """Return the list of follower unit ids, or None when it is invalid.
+
+    The unit ids are entered separated by commas or spaces.
+    """
+    try:
+        addresses = [
+            int(address)
+            for address in re.split(r"[,\s]+", data.get(CONF_FOLLOWER_ADDRESSES, ""))
+            if address
+        ]
+    except ValueError:
+        return None
+    leader = data.get(CONF_MODBUS_ADDRESS, DEFAULT_MODBUS_ADDRESS)
+    if (
+        not all(1 <= address <= 247 for address in addresses)
+        or leader in addresses
+        or len(set(addresses)) != len(addresses)
+    ):
+        return None
+    return addresses
+
+
+def parse_fast_keys(data):
+    """Return the list of keys of the hot set, entered separated by commas or spaces."""
+    return [key for key in re.split(r"[,\s]+", data.get(CONF_FAST_KEYS, "")) if key]
+
+
 @callback
-def solaredge_modbus_entries(hass: HomeAssistant):
-    """Return the hosts already configured."""
+def solaredge_modbus_entries(hass: HomeAssistant, exclude_entry_id=None):
+    """Return the host, port and unit of the inverters already configured.
+
+    Several units (e.g. leader and followers) can share a host and port.
+    """
     return {
-        entry.data[CONF_HOST] for entry in hass.config_entries.async_entries(DOMAIN)
+        key
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        if entry.entry_id != exclude_entry_id
+        for key in unit_keys(entry.data)
     }
 
 
@@ -80,9 +173,9 @@ class SolaredgeModbusConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 2
     CONNECTION_CLASS = config_entries.CONN_CLASS_LOCAL_POLL
 
-    def _host_in_configuration_exists(self, host) -> bool:
-        """Return True if host exists in configuration."""
-        if host in solaredge_modbus_entries(self.hass):
+    def _unit_in_configuration_exists(self, data) -> bool:
+        """Return True if a unit on host and port exists in configuration."""
+        if unit_keys(data) & solaredge_modbus_entries(self.hass):
             return True
         return False
 
@@ -92,13 +185,26 @@ class SolaredgeModbusConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         if user_input is not None:
             host = user_input[CONF_HOST]
+            follower_addresses = parse_follower_addresses(user_input)
+            user_input = {
+                **user_input,
+                CONF_FOLLOWER_ADDRESSES: follower_addresses or [],
+                CONF_FAST_KEYS: parse_fast_keys(user_input),
+            }
 
-            if self._host_in_configuration_exists(host):
+            if follower_addresses is None:
+                errors[CONF_FOLLOWER_ADDRESSES] = "invalid_unit_ids"
+            elif self._unit_in_configuration_exists(user_input):
                 errors[CONF_HOST] = "already_configured"
             elif not host_valid(user_input[CONF_HOST]):
                 errors[CONF_HOST] = "invalid host IP"
             else:
-                await self.async_set_unique_id(user_input[CONF_HOST])
+                _, port, unit = unit_key(user_input)
+                # Keep the unique id of the first unit on a host unchanged
+                if port == DEFAULT_PORT and unit == DEFAULT_MODBUS_ADDRESS:
+                    await self.async_set_unique_id(host)
+                else:
+                    await self.async_set_unique_id(f"{host}:{port}:{unit}")
                 self._abort_if_unique_id_configured()
                 return self.async_create_entry(
                     title=user_input[CONF_NAME], data=user_input
@@ -122,15 +228,20 @@ class SolaredgeModbusConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         if user_input is not None:
             host = user_input[CONF_HOST]
-
-            # Allow same host (current entry) — only block a *different* host
-            # that is already used by another entry
-            other_hosts = {
-                e.data[CONF_HOST]
-                for e in self.hass.config_entries.async_entries(DOMAIN)
-                if e.entry_id != entry.entry_id
+            follower_addresses = parse_follower_addresses(user_input)
+            user_input = {
+                **user_input,
+                CONF_FOLLOWER_ADDRESSES: follower_addresses or [],
+                CONF_FAST_KEYS: parse_fast_keys(user_input),
             }
-            if host in other_hosts:
+
+            # Allow the units of the current entry, only block a unit on the
+            # same host and port that is already used by another entry
+            if follower_addresses is None:
+                errors[CONF_FOLLOWER_ADDRESSES] = "invalid_unit_ids"
+            elif unit_keys(user_input) & solaredge_modbus_entries(
+                self.hass, exclude_entry_id=entry.entry_id
+            ):
                 errors[CONF_HOST] = "already_configured"
             elif not host_valid(host):
                 errors[CONF_HOST] = "invalid host IP"
@@ -156,6 +267,16 @@ class SolaredgeModbusConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 vol.Optional(CONF_READ_BATTERY2, default=current.get(CONF_READ_BATTERY2, DEFAULT_READ_BATTERY2)): bool,
                 vol.Optional(CONF_READ_BATTERY3, default=current.get(CONF_READ_BATTERY3, DEFAULT_READ_BATTERY3)): bool,
                 vol.Optional(CONF_SCAN_INTERVAL, default=current.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)): int,
+                vol.Optional(CONF_SCAN_INTERVAL_MEDIUM, default=current.get(CONF_SCAN_INTERVAL_MEDIUM, DEFAULT_SCAN_INTERVAL_MEDIUM)): int,
+                vol.Optional(CONF_SCAN_INTERVAL_SLOW, default=current.get(CONF_SCAN_INTERVAL_SLOW, DEFAULT_SCAN_INTERVAL_SLOW)): int,
+                vol.Optional(CONF_PIPELINE_DEPTH, default=current.get(CONF_PIPELINE_DEPTH, DEFAULT_PIPELINE_DEPTH)): vol.All(int, vol.Range(min=1, max=MAX_PIPELINE_DEPTH)),
+                vol.Optional(CONF_FORCE_REFRESH_INTERVAL, default=current.get(CONF_FORCE_REFRESH_INTERVAL, DEFAULT_FORCE_REFRESH_INTERVAL)): int,
+                vol.Optional(CONF_WRITE_DEBOUNCE, default=current.get(CONF_WRITE_DEBOUNCE, DEFAULT_WRITE_DEBOUNCE)): int,
+                vol.Optional(CONF_SLEEP_SCAN_INTERVAL, default=current.get(CONF_SLEEP_SCAN_INTERVAL, DEFAULT_SLEEP_SCAN_INTERVAL)): int,
+                vol.Optional(CONF_IDLE_BATTERY_SCAN_INTERVAL, default=current.get(CONF_IDLE_BATTERY_SCAN_INTERVAL, DEFAULT_IDLE_BATTERY_SCAN_INTERVAL)): int,
+                vol.Optional(CONF_FAST_SCAN_INTERVAL, default=current.get(CONF_FAST_SCAN_INTERVAL, DEFAULT_FAST_SCAN_INTERVAL)): vol.All(int, vol.Range(min=0)),
+                vol.Optional(CONF_FAST_KEYS, default=", ".join(current.get(CONF_FAST_KEYS, DEFAULT_FAST_KEYS))): str,
+                vol.Optional(CONF_FOLLOWER_ADDRESSES, default=", ".join(map(str, current.get(CONF_FOLLOWER_ADDRESSES, [])))): str,
                 vol.Optional(
                     CONF_MAX_EXPORT_CONTROL_SITE_LIMIT,
                     default=current.get(CONF_MAX_EXPORT_CONTROL_SITE_LIMIT, DEFAULT_MAX_EXPORT_CONTROL_SITE_LIMIT),
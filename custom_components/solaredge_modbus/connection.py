@@ -0,0 +1,494 @@
+"""Shared Modbus TCP connections for the SolarEdge Modbus integration.
+
+SolarEdge inverters accept very few simultaneous Modbus TCP clients, so all
+config entries and the config entry migration share one connection per
+(host, port), handed out by a reference counted pool. The requests of all
+units are scheduled by priority, see scheduler.py.
+
+Requests time out after a multiple of the observed round trip times, a
+failed request is retried on a fresh socket while the retry budget of the
+cycle of its coordinator lasts, and failed connects are retried with an
+exponential backoff.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+
+from pymodbus.client import AsyncModbusTcpClient
+from pymodbus.exceptions import (
+    ConnectionException,
+    ModbusException,
+    ModbusIOException,
+)
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import DEFAULT_PIPELINE_DEPTH, DOMAIN, PRIORITY_CONTROL, PRIORITY_POLL
+from .metrics import ConnectionMetrics
+from .pipeline import PipelinedModbusTcpClient
+from .scheduler import RequestScheduler
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_CONNECTION_POOL = f"{DOMAIN}_connection_pool"
+
+# Errors which leave the connection in an unknown state, any other failure is
+# limited to the block it occurred in
+TRANSPORT_ERRORS = (ConnectionException, ModbusIOException, TimeoutError, OSError)
+
+# Lower bound of the request timeout, the configured timeout is the upper bound
+MIN_REQUEST_TIMEOUT = 1.0
+# Failed transactions retried on a fresh socket per poll cycle of a coordinator
+RETRY_BUDGET = 2
+# Delay of the first reconnect after a failed connect, doubled after every
+# further failure up to the maximum
+RECONNECT_DELAY = 5.0
+MAX_RECONNECT_DELAY = 300.0
+# Failed connects after which the connection is considered down, further
+# failures are only logged at debug level until it connects again
+CIRCUIT_BREAKER_THRESHOLD = 5
+# Transactions without error after which a pipelined connection which fell
+# back to fewer transactions in flight tries the configured depth again
+PIPELINE_RECOVERY_TRANSACTIONS = 500
+
+
+class RequestTimeout:
+    """Request timeout derived from the observed round trip times.
+
+    Follows the retransmission timeout of TCP (RFC 6298): the smoothed round
+    trip time plus four times its variation, doubled after every timeout
+    until a response arrives again.
+    """
+
+    def __init__(self, maximum: float, minimum: float = MIN_REQUEST_TIMEOUT) -> None:
+        """Initialize the timeout.
+
+        :param maximum: Seconds to wait at most, also until a round trip time is known
+        :param minimum: Seconds to wait at least
+        """
+        self.maximum = maximum
+        self.minimum = min(minimum, maximum)
+        self.smoothed: float | None = None
+        self.variation = 0.0
+        self._backoff = 1
+
+    @property
+    def timeout(self) -> float:
+        """Return the seconds to wait for the next response."""
+        if self.smoothed is None:
+            return self.maximum
+        timeout = (self.smoothed + 4 * self.variation) * self._backoff
+        return min(self.maximum, max(self.minimum, timeout))
+
+    def add(self, round_trip: float) -> None:
+        """Add the round trip time of a response."""
+        if self.smoothed is None:
+            self.smoothed = round_trip
+            self.variation = round_trip / 2
+        else:
+            self.variation = 0.75 * self.variation + 0.25 * abs(
+                self.smoothed - round_trip
+            )
+            self.smoothed = 0.875 * self.smoothed + 0.125 * round_trip
+        self._backoff = 1
+
+    def expired(self) -> None:
+        """Back off after a request timed out."""
+        self._backoff = min(self._backoff * 2, 64)
+
+
+class RetryBudget:
+    """Retries left to the requests of one cycle.
+
+    Every coordinator sharing a connection starts its cycles with a budget of
+    its own, so a cycle can not refill the budget of another one.
+    """
+
+    __slots__ = ("remaining",)
+
+    def __init__(self, retries: int = RETRY_BUDGET) -> None:
+        """Initialize the budget."""
+        self.remaining = retries
+
+    def take(self) -> bool:
+        """Use a retry, returns False when none is left."""
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+
+class SolaredgeModbusConnection:
+    """Modbus TCP connection shared by all units behind one host and port."""
+
+    def __init__(
+        self, host, port, timeout, pipeline_depth=DEFAULT_PIPELINE_DEPTH
+    ) -> None:
+        """Initialize the connection."""
+        self._client = None
+        self._host = host
+        self._port = port
+        self._timeout = timeout
+        self._max_pipeline_depth = pipeline_depth
+        self._pipeline_depth = pipeline_depth
+        # Transactions without error since the pipeline fell back
+        self._clean_transactions = 0
+        self.metrics = ConnectionMetrics()
+        self._scheduler = RequestScheduler(metrics=self.metrics.queue)
+        self.request_timeout = RequestTimeout(timeout)
+        # Incremented on every connect, retries only close the socket their
+        # transaction failed on
+        self._generation = 0
+        self._connect_failures = 0
+        self._next_connect = 0.0
+
+    @property
+    def key(self) -> tuple[str, int]:
+        """Return the key of the connection in the pool."""
+        return self._host, self._port
+
+    @property
+    def connected(self) -> bool:
+        """Return True while the socket of the client is open."""
+        return self._client is not None and self._client.connected
+
+    async def close(self, generation: int | None = None):
+        """Disconnect client.
+
+        :param generation: Only disconnect the socket of this connect
+        """
+        if self._client is None:
+            return
+
+        async with self._scheduler.slot(PRIORITY_CONTROL):
+            self._close(generation)
+
+    def _close(self, generation: int | None = None) -> None:
+        """Disconnect client while holding a slot."""
+        if self._client is None or generation not in (None, self._generation):
+            # Closed or reconnected by another transaction meanwhile
+            return
+        if isinstance(self._client, PipelinedModbusTcpClient):
+            # Keep a fallback to one transaction at a time after reconnecting
+            self._pipeline_depth = self._client.depth
+        self._client.close()
+        self._client = None
+
+    async def check_and_reconnect(self):
+        if self._client is None or not self._client.connected:
+            if (delay := self._next_connect - time.monotonic()) > 0:
+                _LOGGER.debug(
+                    "Next connect to %s:%s in %.0f s", self._host, self._port, delay
+                )
+                return False
+            _LOGGER.log(
+                logging.DEBUG if self.metrics.circuit_open else logging.INFO,
+                "Modbus client is not connected, trying to reconnect",
+            )
+            return await self.connect()
+
+        return True
+
+    async def connect(self):
+        """Connect client."""
+        async with self._scheduler.slot(PRIORITY_CONTROL):
+            return await self._connect()
+
+    async def _reconnect(self, generation: int) -> bool:
+        """Replace the socket a transaction failed on by a fresh one.
+
+        Transactions waiting meanwhile are sent on the fresh socket.
+        """
+        async with self._scheduler.slot(PRIORITY_CONTROL):
+            self._close(generation)
+            return await self._connect()
+
+    async def _connect(self) -> bool:
+        """Connect client while holding a slot, unless it is backing off."""
+        if self._client is None:
+            if self._max_pipeline_depth > 1:
+                self._client = PipelinedModbusTcpClient(
+                    self._host, self._port, self._timeout, self._pipeline_depth
+                )
+            else:
+                # Failed transactions and connects are retried by the
+                # connection instead of the client
+                self._client = AsyncModbusTcpClient(
+                    host=self._host,
+                    port=self._port,
+                    timeout=self._timeout,
+                    retries=0,
+                    reconnect_delay=0,
+                )
+        if self._client.connected:
+            # Reconnected by another unit sharing the connection
+            return True
+        if time.monotonic() < self._next_connect:
+            # Failed to connect while this connect waited for its slot
+            return False
+
+        self._set_timeout(self._timeout)
+        if not await self._client.connect():
+            self._connect_failed()
+            return False
+
+        self._generation += 1
+        self.metrics.connects += 1
+        if self.metrics.circuit_open:
+            _LOGGER.info(
+                "Connected to %s:%s again after %s failed attempts",
+                self._host,
+                self._port,
+                self._connect_failures,
+            )
+        else:
+            _LOGGER.info("Successfully connected to %s:%s", self._host, self._port)
+        self._connect_failures = 0
+        self._next_connect = 0.0
+        self.metrics.reconnect_delay = 0.0
+        self.metrics.circuit_open = False
+        return True
+
+    def _connect_failed(self) -> None:
+        """Back off from connecting after a failed connect."""
+        self._connect_failures += 1
+        self.metrics.connect_failures += 1
+        delay = min(
+            MAX_RECONNECT_DELAY, RECONNECT_DELAY * 2 ** (self._connect_failures - 1)
+        )
+        self._next_connect = time.monotonic() + delay
+        self.metrics.reconnect_delay = delay
+        if self._connect_failures < CIRCUIT_BREAKER_THRESHOLD:
+            _LOGGER.warning(
+                "Not able to connect to %s:%s, retrying in %.0f s",
+                self._host,
+                self._port,
+                delay,
+            )
+        elif not self.metrics.circuit_open:
+            self.metrics.circuit_open = True
+            _LOGGER.warning(
+                "Not able to connect to %s:%s after %s attempts, retrying at most "
+                "every %.0f s",
+                self._host,
+                self._port,
+                self._connect_failures,
+                MAX_RECONNECT_DELAY,
+            )
+        else:
+            _LOGGER.debug(
+                "Not able to connect to %s:%s, retrying in %.0f s",
+                self._host,
+                self._port,
+                delay,
+            )
+
+    def _set_timeout(self, timeout: float) -> None:
+        """Set the timeout of the next connect or transaction of the client."""
+        if isinstance(self._client, PipelinedModbusTcpClient):
+            self._client.timeout = timeout
+        else:
+            # The transactions of pymodbus wait for the connect timeout
+            self._client.ctx.comm_params.timeout_connect = timeout
+
+    def _transaction(self, priority: int):
+        """Return the context a transaction is executed in.
+
+        Transactions wait for a slot by priority. The pipelined client matches
+        responses to their requests itself and has a slot for every
+        transaction in flight, other transactions are serialized.
+        """
+        if isinstance(self._client, PipelinedModbusTcpClient):
+            self._scheduler.set_capacity(self._client.depth)
+        else:
+            self._scheduler.set_capacity(1)
+        return self._scheduler.slot(priority)
+
+    async def _execute(
+        self,
+        method,
+        priority=PRIORITY_POLL,
+        retries: RetryBudget | None = None,
+        **kwargs,
+    ):
+        """Execute a transaction of the client.
+
+        A transaction failing with a transport error is retried once on a
+        fresh socket while retries are left, it is not retried without them.
+        """
+        generation = self._generation
+        try:
+            return await self._transact(method, priority, **kwargs)
+        except TRANSPORT_ERRORS as error:
+            if (
+                retries is None
+                or time.monotonic() < self._next_connect
+                or not retries.take()
+            ):
+                raise
+            self.metrics.retries += 1
+            _LOGGER.debug(
+                "Retrying %s on %s:%s on a fresh socket: %s",
+                method,
+                self._host,
+                self._port,
+                error,
+            )
+            if not await self._reconnect(generation):
+                raise
+        return await self._transact(method, priority, **kwargs)
+
+    async def _transact(self, method, priority, **kwargs):
+        """Execute a transaction of the client, recording its metrics."""
+        metrics = self.metrics
+        start = time.perf_counter()
+        async with self._transaction(priority):
+            if self._client is None:
+                raise ConnectionException(f"Not connected to {self._host}:{self._port}")
+            timeout = self.request_timeout.timeout
+            metrics.request_timeout = timeout
+            self._set_timeout(timeout)
+            sent = time.perf_counter()
+            metrics.queue_wait.add(sent - start)
+            metrics.transactions += 1
+            try:
+                response = await getattr(self._client, method)(**kwargs)
+            except (ModbusIOException, TimeoutError):
+                metrics.timeouts += 1
+                self.request_timeout.expired()
+                self._clean_transactions = 0
+                raise
+            except (ModbusException, OSError):
+                metrics.errors += 1
+                self._clean_transactions = 0
+                raise
+            finally:
+                round_trip = time.perf_counter() - sent
+                metrics.round_trip.add(round_trip)
+            self.request_timeout.add(round_trip)
+            self._recover_pipeline()
+        if response.isError():
+            metrics.errors += 1
+        return response
+
+    def _recover_pipeline(self) -> None:
+        """Return to the configured pipeline depth after enough transactions.
+
+        The scheduler grants the additional slots with the next transaction.
+        """
+        client = self._client
+        if (
+            not isinstance(client, PipelinedModbusTcpClient)
+            or client.depth >= self._max_pipeline_depth
+        ):
+            return
+        self._clean_transactions += 1
+        if self._clean_transactions < PIPELINE_RECOVERY_TRANSACTIONS:
+            return
+        _LOGGER.info(
+            "Trying %s transactions in flight on %s:%s again",
+            self._max_pipeline_depth,
+            self._host,
+            self._port,
+        )
+        client.depth = self._pipeline_depth = self._max_pipeline_depth
+        self._clean_transactions = 0
+
+    async def read_holding_registers(
+        self,
+        unit,
+        address,
+        count,
+        priority=PRIORITY_POLL,
+        retries: RetryBudget | None = None,
+    ):
+        """Read holding registers, retrying failures while retries are left."""
+        return await self._execute(
+            "read_holding_registers",
+            priority,
+            retries,
+            address=address,
+            count=count,
+            device_id=unit,
+        )
+
+    async def write_registers(self, unit, address, payload):
+        """Write registers."""
+        try:
+            return await self._execute(
+                "write_registers",
+                PRIORITY_CONTROL,
+                RetryBudget(1),
+                address=address,
+                values=payload,
+                device_id=unit,
+            )
+        except ModbusException as err:
+            raise HomeAssistantError(err) from err
+
+    async def write_register(self, unit, address, payload):
+        """Write register."""
+        try:
+            return await self._execute(
+                "write_register",
+                PRIORITY_CONTROL,
+                RetryBudget(1),
+                address=address,
+                value=payload,
+                device_id=unit,
+            )
+        except ModbusException as err:
+            raise HomeAssistantError(err) from err
+
+
+class SolaredgeModbusConnectionPool:
+    """Reference counted pool of connections keyed by host and port."""
+
+    def __init__(self) -> None:
+        """Initialize the pool."""
+        self._connections: dict[tuple[str, int], SolaredgeModbusConnection] = {}
+        self._references: dict[tuple[str, int], int] = {}
+
+    def acquire(
+        self, host, port, timeout, pipeline_depth=DEFAULT_PIPELINE_DEPTH
+    ) -> SolaredgeModbusConnection:
+        """Return the connection to host and port, creating it when needed.
+
+        The settings of the first user of a connection apply to it.
+        """
+        key = (host, port)
+        if key not in self._connections:
+            self._connections[key] = SolaredgeModbusConnection(
+                host, port, timeout, pipeline_depth
+            )
+            self._references[key] = 0
+        self._references[key] += 1
+        _LOGGER.debug(
+            "Acquired connection to %s:%s (%s users)", host, port, self._references[key]
+        )
+        return self._connections[key]
+
+    async def release(self, connection: SolaredgeModbusConnection) -> None:
+        """Release a connection, closing it when it has no users left."""
+        key = connection.key
+        if self._connections.get(key) is not connection:
+            return
+
+        self._references[key] -= 1
+        _LOGGER.debug(
+            "Released connection to %s:%s (%s users)", *key, self._references[key]
+        )
+        if self._references[key] == 0:
+            del self._connections[key]
+            del self._references[key]
+            await connection.close()
+
+
+def get_connection_pool(hass: HomeAssistant) -> SolaredgeModbusConnectionPool:
+    """Return the connection pool of the integration."""
+    if DATA_CONNECTION_POOL not in hass.data:
+        hass.data[DATA_CONNECTION_POOL] = SolaredgeModbusConnectionPool()
+    return hass.data[DATA_CONNECTION_POOL]
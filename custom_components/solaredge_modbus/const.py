@@ -13,6 +13,7 @@ from homeassistant.components.sensor import (
 from homeassistant.const import (
     ATTR_SECONDS,
     PERCENTAGE,
+    EntityCategory,
     UnitOfApparentPower,
     UnitOfElectricCurrent,
     UnitOfElectricPotential,
@@ -21,11 +22,25 @@ from homeassistant.const import (
     UnitOfPower,
     UnitOfReactivePower,
     UnitOfTemperature,
+    UnitOfTime,
 )
 
 DOMAIN = "solaredge_modbus"
 DEFAULT_NAME = "solaredge"
 DEFAULT_SCAN_INTERVAL = 30
+DEFAULT_SCAN_INTERVAL_MEDIUM = 60
+DEFAULT_SCAN_INTERVAL_SLOW = 300
+DEFAULT_PIPELINE_DEPTH = 1
+MAX_PIPELINE_DEPTH = 16
+DEFAULT_FORCE_REFRESH_INTERVAL = 0
+# Milliseconds to wait for further writes before writing control registers
+DEFAULT_WRITE_DEBOUNCE = 200
+# Seconds between reads of a sleeping inverter and of an idle battery
+DEFAULT_SLEEP_SCAN_INTERVAL = 300
+DEFAULT_IDLE_BATTERY_SCAN_INTERVAL = 60
+# Milliseconds between the reads of the hot set, 0 disables it
+DEFAULT_FAST_SCAN_INTERVAL = 0
+DEFAULT_FAST_KEYS = ["acpower", "m1_acpower", "battery1_power"]
 DEFAULT_PORT = 1502
 DEFAULT_MODBUS_ADDRESS = 1
 DEFAULT_POWER_CONTROL = False
@@ -46,6 +61,16 @@ CONF_READ_BATTERY1 = "read_battery_1"
 CONF_READ_BATTERY2 = "read_battery_2"
 CONF_READ_BATTERY3 = "read_battery_3"
 CONF_MAX_EXPORT_CONTROL_SITE_LIMIT = "max_export_control_site_limit"
+CONF_SCAN_INTERVAL_MEDIUM = "scan_interval_medium"
+CONF_SCAN_INTERVAL_SLOW = "scan_interval_slow"
+CONF_PIPELINE_DEPTH = "pipeline_depth"
+CONF_FOLLOWER_ADDRESSES = "follower_addresses"
+CONF_FORCE_REFRESH_INTERVAL = "force_refresh_interval"
+CONF_WRITE_DEBOUNCE = "write_debounce"
+CONF_SLEEP_SCAN_INTERVAL = "sleep_scan_interval"
+CONF_IDLE_BATTERY_SCAN_INTERVAL = "idle_battery_scan_interval"
+CONF_FAST_SCAN_INTERVAL = "fast_scan_interval"
+CONF_FAST_KEYS = "fast_keys"
 DEFAULT_MAX_EXPORT_CONTROL_SITE_LIMIT = 10000
 METER_1 = "m1"
 METER_2 = "m2"
@@ -54,6 +79,17 @@ BATTERY_1 = "battery1"
 BATTERY_2 = "battery2"
 BATTERY_3 = "battery3"
 
+# Poll tiers, fast blocks are polled every scan interval
+POLL_TIER_FAST = "fast"
+POLL_TIER_MEDIUM = "medium"
+POLL_TIER_SLOW = "slow"
+
+# Priorities of Modbus requests on a connection, lower values go first
+PRIORITY_CONTROL = 0
+PRIORITY_FAST = 1
+PRIORITY_POLL = 2
+PRIORITY_BACKGROUND = 3
+
 ENERGY_VOLT_AMPERE_HOUR: Final = "VAh"
 ENERGY_VOLT_AMPERE_REACTIVE_HOUR: Final = "varh"
 
@@ -89,6 +125,28 @@ class SolarEdgeSelectDescription(
     """Class to describe an solaredge select entity."""
 
 
+@dataclass(frozen=True)
+class RegisterField:
+    """Describe a value at a register offset within a register block.
+
+    fmt is a struct format character, e.g. "h" or "f", or "32s" for a string.
+    The raw value is masked, scaled with the scale factor field sf, validated,
+    multiplied by scale, rounded to digits and finally mapped through options.
+    Fields which are not output are only used as scale factor.
+    """
+
+    key: str
+    offset: int
+    fmt: str
+    sf: str | None = None
+    scale: float | None = None
+    digits: int | None = None
+    mask: int | None = None
+    options: dict[int, str] | None = None
+    validate: tuple[tuple[str, Any], ...] = ()
+    output: bool = True
+
+
 INVERTER_CURRENT_TYPES: dict = {
     "accurrent": "AC Current",
     "accurrenta": "AC Current A",
@@ -525,6 +583,74 @@ for batteryKey, batteryList in BATTERIES.items():
         )
     )
 
+# Instrumentation of the poll cycles, disabled by default
+DIAGNOSTIC_SENSORS: list[SensorEntityDescription] = []
+
+DIAGNOSTIC_DURATION_TYPES = {
+    "poll_cycle_duration": "Poll Cycle Duration",
+    "modbus_round_trip": "Modbus Round Trip Time",
+    "modbus_queue_wait": "Modbus Queue Wait",
+    "modbus_control_wait": "Modbus Control Wait",
+    "modbus_request_timeout": "Modbus Request Timeout",
+}
+
+DIAGNOSTIC_COUNTER_TYPES = {
+    "modbus_errors": "Modbus Errors",
+    "modbus_timeouts": "Modbus Timeouts",
+    "modbus_reconnects": "Modbus Reconnects",
+    "modbus_retries": "Modbus Retries",
+}
+
+for key, value in DIAGNOSTIC_DURATION_TYPES.items():
+    DIAGNOSTIC_SENSORS.append(
+        SensorEntityDescription(
+            key=key,
+            name=value,
+            native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+            state_class=SensorStateClass.MEASUREMENT,
+            entity_category=EntityCategory.DIAGNOSTIC,
+            entity_registry_enabled_default=False,
+        )
+    )
+
+for key, value in DIAGNOSTIC_COUNTER_TYPES.items():
+    DIAGNOSTIC_SENSORS.append(
+        SensorEntityDescription(
+            key=key,
+            name=value,
+            state_class=SensorStateClass.TOTAL_INCREASING,
+            entity_category=EntityCategory.DIAGNOSTIC,
+            entity_registry_enabled_default=False,
+        )
+    )
+
+DIAGNOSTIC_SENSORS.extend(
+    [
+        SensorEntityDescription(
+            key="poll_cycle_load",
+            name="Poll Cycle Load",
+            native_unit_of_measurement=PERCENTAGE,
+            state_class=SensorStateClass.MEASUREMENT,
+            entity_category=EntityCategory.DIAGNOSTIC,
+            entity_registry_enabled_default=False,
+        ),
+        SensorEntityDescription(
+            key="poll_registers",
+            name="Poll Registers",
+            state_class=SensorStateClass.MEASUREMENT,
+            entity_category=EntityCategory.DIAGNOSTIC,
+            entity_registry_enabled_default=False,
+        ),
+        SensorEntityDescription(
+            key="modbus_queue_depth",
+            name="Modbus Queue Depth",
+            state_class=SensorStateClass.MEASUREMENT,
+            entity_category=EntityCategory.DIAGNOSTIC,
+            entity_registry_enabled_default=False,
+        ),
+    ]
+)
+
 DEVICE_STATUSSES = {
     1: "Off",
     2: "Sleeping (auto-shutdown) – Night mode",
@@ -693,3 +819,221 @@ STORAGE_NUMBER_TYPES.extend(
         ),
     ]
 )
+
+
+# Register maps of the blocks read from the inverter, offsets are relative to
+# the start address of the block.
+
+DEVICE_INFO_REGISTERS: list[RegisterField] = [
+    RegisterField("manufacturer", 0, "32s"),
+    RegisterField("model", 16, "32s"),
+    RegisterField("version", 40, "16s"),
+    RegisterField("serial_number", 48, "32s"),
+]
+
+INVERTER_REGISTERS: list[RegisterField] = [
+    RegisterField("accurrent", 0, "H", sf="accurrentsf"),
+    RegisterField("accurrenta", 1, "H", sf="accurrentsf"),
+    RegisterField("accurrentb", 2, "H", sf="accurrentsf"),
+    RegisterField("accurrentc", 3, "H", sf="accurrentsf"),
+    RegisterField("accurrentsf", 4, "h", output=False),
+    RegisterField("acvoltageab", 5, "H", sf="acvoltagesf"),
+    RegisterField("acvoltagebc", 6, "H", sf="acvoltagesf"),
+    RegisterField("acvoltageca", 7, "H", sf="acvoltagesf"),
+    RegisterField("acvoltagean", 8, "H", sf="acvoltagesf"),
+    RegisterField("acvoltagebn", 9, "H", sf="acvoltagesf"),
+    RegisterField("acvoltagecn", 10, "H", sf="acvoltagesf"),
+    RegisterField("acvoltagesf", 11, "h", output=False),
+    RegisterField("acpower", 12, "h", sf="acpowersf"),
+    RegisterField("acpowersf", 13, "h", output=False),
+    RegisterField("acfreq", 14, "H", sf="acfreqsf"),
+    RegisterField("acfreqsf", 15, "h", output=False),
+    RegisterField("acva", 16, "h", sf="acvasf"),
+    RegisterField("acvasf", 17, "h", output=False),
+    RegisterField("acvar", 18, "h", sf="acvarsf"),
+    RegisterField("acvarsf", 19, "h", output=False),
+    RegisterField("acpf", 20, "h", sf="acpfsf"),
+    RegisterField("acpfsf", 21, "h", output=False),
+    RegisterField(
+        "acenergy",
+        22,
+        "I",
+        sf="acenergysf",
+        scale=0.001,
+        digits=3,
+        validate=((">", 0),),
+    ),
+    RegisterField("acenergysf", 24, "H", output=False),
+    RegisterField("dccurrent", 25, "H", sf="dccurrentsf"),
+    RegisterField("dccurrentsf", 26, "h", output=False),
+    RegisterField("dcvoltage", 27, "H", sf="dcvoltagesf"),
+    RegisterField("dcvoltagesf", 28, "h", output=False),
+    RegisterField("dcpower", 29, "h", sf="dcpowersf"),
+    RegisterField("dcpowersf", 30, "h", output=False),
+    RegisterField("tempsink", 32, "h", sf="tempsf"),
+    RegisterField("tempsf", 35, "h", output=False),
+    RegisterField("status", 36, "h"),
+    RegisterField("statusvendor", 37, "h"),
+]
+
+POWER_LIMIT_REGISTERS: list[RegisterField] = [
+    RegisterField("nominal_active_power_limit", 0, "H"),
+]
+
+METER_REGISTERS: list[RegisterField] = [
+    RegisterField("accurrent", 0, "h", sf="accurrentsf"),
+    RegisterField("accurrenta", 1, "h", sf="accurrentsf"),
+    RegisterField("accurrentb", 2, "h", sf="accurrentsf"),
+    RegisterField("accurrentc", 3, "h", sf="accurrentsf"),
+    RegisterField("accurrentsf", 4, "h", output=False),
+    RegisterField("acvoltageln", 5, "h", sf="acvoltagesf"),
+    RegisterField("acvoltagean", 6, "h", sf="acvoltagesf"),
+    RegisterField("acvoltagebn", 7, "h", sf="acvoltagesf"),
+    RegisterField("acvoltagecn", 8, "h", sf="acvoltagesf"),
+    RegisterField("acvoltagell", 9, "h", sf="acvoltagesf"),
+    RegisterField("acvoltageab", 10, "h", sf="acvoltagesf"),
+    RegisterField("acvoltagebc", 11, "h", sf="acvoltagesf"),
+    RegisterField("acvoltageca", 12, "h", sf="acvoltagesf"),
+    RegisterField("acvoltagesf", 13, "h", output=False),
+    RegisterField("acfreq", 14, "h", sf="acfreqsf"),
+    RegisterField("acfreqsf", 15, "h", output=False),
+    RegisterField("acpower", 16, "h", sf="acpowersf"),
+    RegisterField("acpowera", 17, "h", sf="acpowersf"),
+    RegisterField("acpowerb", 18, "h", sf="acpowersf"),
+    RegisterField("acpowerc", 19, "h", sf="acpowersf"),
+    RegisterField("acpowersf", 20, "h", output=False),
+    RegisterField("acva", 21, "h", sf="acvasf"),
+    RegisterField("acvaa", 22, "h", sf="acvasf"),
+    RegisterField("acvab", 23, "h", sf="acvasf"),
+    RegisterField("acvac", 24, "h", sf="acvasf"),
+    RegisterField("acvasf", 25, "h", output=False),
+    RegisterField("acvar", 26, "h", sf="acvarsf"),
+    RegisterField("acvara", 27, "h", sf="acvarsf"),
+    RegisterField("acvarb", 28, "h", sf="acvarsf"),
+    RegisterField("acvarc", 29, "h", sf="acvarsf"),
+    RegisterField("acvarsf", 30, "h", output=False),
+    RegisterField("acpf", 31, "h", sf="acpfsf"),
+    RegisterField("acpfa", 32, "h", sf="acpfsf"),
+    RegisterField("acpfb", 33, "h", sf="acpfsf"),
+    RegisterField("acpfc", 34, "h", sf="acpfsf"),
+    RegisterField("acpfsf", 35, "h", output=False),
+    RegisterField(
+        "exported",
+        36,
+        "I",
+        sf="energywsf",
+        scale=0.001,
+        digits=3,
+        validate=((">", 0),),
+    ),
+    RegisterField("exporteda", 38, "I", sf="energywsf", scale=0.001, digits=3),
+    RegisterField("exportedb", 40, "I", sf="energywsf", scale=0.001, digits=3),
+    RegisterField("exportedc", 42, "I", sf="energywsf", scale=0.001, digits=3),
+    RegisterField(
+        "imported",
+        44,
+        "I",
+        sf="energywsf",
+        scale=0.001,
+        digits=3,
+        validate=((">", 0),),
+    ),
+    RegisterField("importeda", 46, "I", sf="energywsf", scale=0.001, digits=3),
+    RegisterField("importedb", 48, "I", sf="energywsf", scale=0.001, digits=3),
+    RegisterField("importedc", 50, "I", sf="energywsf", scale=0.001, digits=3),
+    RegisterField("energywsf", 52, "h", output=False),
+    RegisterField("exportedva", 53, "I", sf="energyvasf"),
+    RegisterField("exportedvaa", 55, "I", sf="energyvasf"),
+    RegisterField("exportedvab", 57, "I", sf="energyvasf"),
+    RegisterField("exportedvac", 59, "I", sf="energyvasf"),
+    RegisterField("importedva", 61, "I", sf="energyvasf"),
+    RegisterField("importedvaa", 63, "I", sf="energyvasf"),
+    RegisterField("importedvab", 65, "I", sf="energyvasf"),
+    RegisterField("importedvac", 67, "I", sf="energyvasf"),
+    RegisterField("energyvasf", 69, "h", output=False),
+    RegisterField("importvarhq1", 70, "I", sf="energyvarsf"),
+    RegisterField("importvarhq1a", 72, "I", sf="energyvarsf"),
+    RegisterField("importvarhq1b", 74, "I", sf="energyvarsf"),
+    RegisterField("importvarhq1c", 76, "I", sf="energyvarsf"),
+    RegisterField("importvarhq2", 78, "I", sf="energyvarsf"),
+    RegisterField("importvarhq2a", 80, "I", sf="energyvarsf"),
+    RegisterField("importvarhq2b", 82, "I", sf="energyvarsf"),
+    RegisterField("importvarhq2c", 84, "I", sf="energyvarsf"),
+    RegisterField("importvarhq3", 86, "I", sf="energyvarsf"),
+    RegisterField("importvarhq3a", 88, "I", sf="energyvarsf"),
+    RegisterField("importvarhq3b", 90, "I", sf="energyvarsf"),
+    RegisterField("importvarhq3c", 92, "I", sf="energyvarsf"),
+    RegisterField("importvarhq4", 94, "I", sf="energyvarsf"),
+    RegisterField("importvarhq4a", 96, "I", sf="energyvarsf"),
+    RegisterField("importvarhq4b", 98, "I", sf="energyvarsf"),
+    RegisterField("importvarhq4c", 100, "I", sf="energyvarsf"),
+    RegisterField("energyvarsf", 102, "h", output=False),
+]
+
+# Storage and battery blocks use little endian word order
+EXPORT_CONTROL_REGISTERS: list[RegisterField] = [
+    RegisterField("export_control_mode", 0, "H", mask=7, options=EXPORT_CONTROL_MODE),
+    RegisterField(
+        "export_control_limit_mode",
+        1,
+        "H",
+        mask=1,
+        options=EXPORT_CONTROL_LIMIT_MODE,
+    ),
+    RegisterField("export_control_site_limit", 2, "f", digits=3),
+]
+
+STORAGE_REGISTERS: list[RegisterField] = [
+    *EXPORT_CONTROL_REGISTERS,
+    RegisterField("storage_contol_mode", 4, "H", options=STORAGE_CONTROL_MODE),
+    RegisterField("storage_ac_charge_policy", 5, "H", options=STORAGE_AC_CHARGE_POLICY),
+    RegisterField("storage_ac_charge_limit", 6, "f", digits=3),
+    RegisterField("storage_backup_reserved", 8, "f", digits=3),
+    RegisterField(
+        "storage_default_mode", 10, "H", options=STORAGE_CHARGE_DISCHARGE_MODE
+    ),
+    RegisterField("storage_remote_command_timeout", 11, "I"),
+    RegisterField(
+        "storage_remote_command_mode",
+        13,
+        "H",
+        options=STORAGE_CHARGE_DISCHARGE_MODE,
+    ),
+    RegisterField("storage_remote_charge_limit", 14, "f", digits=3),
+    RegisterField("storage_remote_discharge_limit", 16, "f", digits=3),
+]
+
+BATTERY_INFO_REGISTERS: list[RegisterField] = [
+    RegisterField("manufacturer", 0x00, "32s"),
+    RegisterField("model", 0x10, "32s"),
+    RegisterField("firmware_version", 0x20, "32s"),
+    RegisterField("serial_number", 0x30, "32s"),
+    RegisterField("device_id", 0x40, "H"),
+    RegisterField("rated_energy", 0x42, "f"),
+    RegisterField("max_power_continuous_charge", 0x44, "f"),
+    RegisterField("max_power_continuous_discharge", 0x46, "f"),
+    RegisterField("max_power_peak_charge", 0x48, "f"),
+    RegisterField("max_power_peak_discharge", 0x4A, "f"),
+]
+
+# Offsets relative to register 0x6C of the battery
+BATTERY_REGISTERS: list[RegisterField] = [
+    RegisterField("temp_avg", 0x00, "f", digits=1),
+    RegisterField("temp_max", 0x02, "f", digits=1),
+    RegisterField("voltage", 0x04, "f", digits=3),
+    RegisterField("current", 0x06, "f", digits=3),
+    RegisterField("power", 0x08, "f", digits=3),
+    RegisterField("energy_discharged", 0x0A, "Q", scale=0.001, digits=3),
+    RegisterField("energy_charged", 0x0E, "Q", scale=0.001, digits=3),
+    RegisterField("size_max", 0x12, "f", digits=3),
+    RegisterField("size_available", 0x14, "f", digits=3),
+    RegisterField("state_of_health", 0x16, "f", digits=0),
+    RegisterField(
+        "state_of_charge",
+        0x18,
+        "f",
+        digits=0,
+        validate=((">=", 0.0), ("<", 101)),
+    ),
+    RegisterField("status", 0x1A, "I"),
+]
@@ -0,0 +1,302 @@
+"""Compiled register block decoders for the SolarEdge Modbus integration.
+
+A block is described declaratively by a list of register fields (see
+const.py) and compiled once into a struct which unpacks the whole block in a
+single call.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from dataclasses import replace
+import operator
+from struct import Struct, calcsize
+from typing import Any
+
+from .const import RegisterField
+from .payload import Endian
+
+VALIDATORS = {
+    ">": operator.gt,
+    "<": operator.lt,
+    ">=": operator.ge,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+
+def validate(value, comparison, against):
+    """Validate value."""
+    if not VALIDATORS[comparison](value, against):
+        raise ValueError(f"Value {value} failed validation ({comparison}{against})")
+    return value
+
+
+def calculate_value(value, sf):
+    """Calculate a value using scaling factor."""
+    return round(value * 10**sf, max(0, -sf))
+
+
+# Multiplier and rounding digits for each valid SunSpec scale factor
+SCALE_FACTORS = {sf: (10**sf, max(0, -sf)) for sf in range(-10, 11)}
+# int16 value of 0x8000, used by SunSpec for values and scale factors which
+# are not implemented
+NOT_IMPLEMENTED = -0x8000
+
+
+def scale_values(values: Iterable[int], sf: int) -> list[float | int | None]:
+    """Apply one scale factor to a group of raw values.
+
+    All values are None when the scale factor is not implemented or out of
+    range, single values are None when they are not implemented.
+    """
+    if sf not in SCALE_FACTORS:
+        return [None for _ in values]
+    multiplier, digits = SCALE_FACTORS[sf]
+    if not digits:
+        # Integer multiplier, rounding would not change the value
+        return [
+            None if value == NOT_IMPLEMENTED else value * multiplier for value in values
+        ]
+    return [
+        None if value == NOT_IMPLEMENTED else round(value * multiplier, digits)
+        for value in values
+    ]
+
+
+def scale_value(value: int, sf: int) -> float | int | None:
+    """Apply a scale factor to a single raw value."""
+    if sf not in SCALE_FACTORS or value == NOT_IMPLEMENTED:
+        return None
+    multiplier, digits = SCALE_FACTORS[sf]
+    return round(value * multiplier, digits)
+
+
+class BlockDecoder:
+    """Decode a register block described by register fields."""
+
+    def __init__(
+        self,
+        fields: Iterable[RegisterField],
+        wordorder: Endian = Endian.BIG,
+        prefix: str = "",
+        start: int = 0,
+        end: int | None = None,
+    ) -> None:
+        """Compile the register fields of a block.
+
+        :param fields: The fields of the block
+        :param wordorder: The endianness of the words of multi register values
+        :param prefix: Prefix for the keys of the decoded values
+        :param start: Offset of the first register to decode
+        :param end: Offset after the last register to decode
+        """
+        fields = sorted(
+            (
+                replace(field, offset=field.offset - start)
+                for field in fields
+                if field.offset >= start and (end is None or field.offset < end)
+            ),
+            key=lambda field: field.offset,
+        )
+        fmt = ">"
+        order: list[int] = []
+        index: dict[str, int] = {}
+        position = 0
+
+        for field in fields:
+            if field.offset < position:
+                raise ValueError(f"Register field {field.key} overlaps")
+            if field.offset > position:
+                fmt += f"{(field.offset - position) * 2}x"
+                order.extend(range(position, field.offset))
+
+            size = calcsize(f">{field.fmt}") // 2
+            words = range(field.offset, field.offset + size)
+            if wordorder == Endian.LITTLE and not field.fmt.endswith("s"):
+                words = reversed(words)
+            order.extend(words)
+
+            index[field.key] = len(index)
+            fmt += field.fmt
+            position = field.offset + size
+
+        self.fields = tuple(fields)
+        self.prefix = prefix
+        self.wordorder = wordorder
+        self.count = position
+        self._struct = Struct(fmt)
+        self._registers = Struct(f">{position}H")
+        # Swapping the words of little endian word order values up front lets
+        # the whole block be unpacked by the struct at once
+        self._order = (
+            operator.itemgetter(*order)
+            if position > 1 and order != list(range(position))
+            else None
+        )
+        # Values sharing a scale factor and needing no further processing are
+        # scaled as a group, the remaining values are processed one by one
+        scaled: dict[int, list[RegisterField]] = {}
+        plain: list[RegisterField] = []
+        special: list[RegisterField] = []
+        for field in fields:
+            if not field.output:
+                continue
+            if (
+                field.fmt.endswith("s")
+                or field.validate
+                or any(
+                    option is not None
+                    for option in (field.mask, field.scale, field.digits, field.options)
+                )
+            ):
+                special.append(field)
+            elif field.sf is not None:
+                scaled.setdefault(index[field.sf], []).append(field)
+            else:
+                plain.append(field)
+
+        # The decoded values are output in this order
+        ordered = [*plain]
+        for group in scaled.values():
+            ordered.extend(group)
+        ordered.extend(special)
+        self.keys = tuple(prefix + field.key for field in ordered)
+        self._plain = _getter(index[field.key] for field in plain)
+        self._scaled = tuple(
+            (sf, _getter(index[field.key] for field in group))
+            for sf, group in scaled.items()
+        )
+        self._special = tuple(
+            (
+                index[field.key],
+                None if field.sf is None else index[field.sf],
+                field.mask,
+                field.scale,
+                field.digits,
+                field.options,
+                field.validate,
+            )
+            for field in special
+        )
+
+    def subset(
+        self, keys: Iterable[str], max_gap: int
+    ) -> list[tuple[int, BlockDecoder]]:
+        """Return decoders of the parts of the block holding the values of keys.
+
+        The scale factors of the values are decoded along with them. Runs of
+        more than max_gap unused registers split the block into parts.
+
+        :param keys: The keys of the values to decode, including the prefix
+        :param max_gap: The largest number of unused registers within a part
+        :returns: The offset of every part with its decoder
+        """
+        keys = set(keys)
+        by_key = {field.key: field for field in self.fields}
+        spans = []
+        for field in self.fields:
+            if not field.output or self.prefix + field.key not in keys:
+                continue
+            span = [field]
+            if field.sf is not None:
+                span.append(by_key[field.sf])
+            spans.append(
+                (
+                    min(part.offset for part in span),
+                    max(part.offset + calcsize(f">{part.fmt}") // 2 for part in span),
+                    span,
+                )
+            )
+
+        parts: list[tuple[int, int, dict[str, RegisterField]]] = []
+        for start, end, span in sorted(spans, key=lambda span: span[0]):
+            if parts and start - parts[-1][1] <= max_gap:
+                part_start, part_end, fields = parts[-1]
+                parts[-1] = (part_start, max(part_end, end), fields)
+            else:
+                fields = {}
+                parts.append((start, end, fields))
+            fields.update((field.key, field) for field in span)
+
+        return [
+            (
+                start,
+                BlockDecoder(fields.values(), self.wordorder, self.prefix, start=start),
+            )
+            for start, _, fields in parts
+        ]
+
+    def decode(self, registers: Sequence[int] | memoryview) -> dict[str, Any]:
+        """Decode the registers of the block into a dict of values."""
+        return dict(zip(self.keys, self.decode_values(registers)))
+
+    def decode_values(self, registers: Sequence[int] | memoryview) -> list[Any]:
+        """Decode the registers of the block into a list of values.
+
+        The registers are either a sequence of register values or the register
+        bytes of a response, which are unpacked without packing them again.
+        The values are in the order of the keys of the decoder.
+        """
+        if isinstance(registers, memoryview):
+            if len(registers) < self.count * 2:
+                raise ValueError(
+                    f"Expected {self.count} registers, received {len(registers) // 2}"
+                )
+            if self._order is None:
+                values = self._struct.unpack_from(registers)
+            else:
+                values = self._struct.unpack(
+                    self._registers.pack(
+                        *self._order(self._registers.unpack_from(registers))
+                    )
+                )
+        else:
+            if len(registers) < self.count:
+                raise ValueError(
+                    f"Expected {self.count} registers, received {len(registers)}"
+                )
+            if self._order is not None:
+                registers = self._order(registers)
+            values = self._struct.unpack(self._registers.pack(*registers[: self.count]))
+
+        decoded = list(self._plain(values))
+        for sf, getter in self._scaled:
+            decoded.extend(scale_values(getter(values), values[sf]))
+
+        for index, sf, mask, scale, digits, options, checks in self._special:
+            value = values[index]
+            if isinstance(value, bytes):
+                # omit NULL terminators
+                decoded.append(value.rstrip(b"\0").decode())
+                continue
+            if mask is not None:
+                value &= mask
+            if sf is not None:
+                value = scale_value(value, values[sf])
+                if value is None:
+                    decoded.append(None)
+                    continue
+            for comparison, against in checks:
+                validate(value, comparison, against)
+            if scale is not None:
+                value *= scale
+            if digits is not None:
+                value = round(value, digits)
+            if options is not None:
+                value = options.get(value, value)
+            decoded.append(value)
+
+        return decoded
+
+
+def _getter(indexes: Iterable[int]):
+    """Return a callable picking the values at indexes as a tuple."""
+    indexes = tuple(indexes)
+    if not indexes:
+        return lambda values: ()
+    if len(indexes) == 1:
+        (index,) = indexes
+        return lambda values: (values[index],)
+    return operator.itemgetter(*indexes)
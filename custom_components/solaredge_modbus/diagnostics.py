@@ -0,0 +1,53 @@
+"""Diagnostics support for the SolarEdge Modbus integration."""
+
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST, CONF_NAME
+from homeassistant.core import HomeAssistant
+
+from . import SolaredgeModbusCoordinator
+from .const import DOMAIN
+from .planner import describe_plan
+
+TO_REDACT = {CONF_HOST, "serial_number"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return the poll cycle metrics of a config entry."""
+    coordinator: SolaredgeModbusCoordinator = hass.data[DOMAIN][entry.data[CONF_NAME]][
+        "hub"
+    ]
+    fast = hass.data[DOMAIN][entry.data[CONF_NAME]]["fast"]
+    return {
+        "entry": async_redact_data(dict(entry.data), TO_REDACT),
+        "cycle": coordinator.metrics.as_dict(),
+        "connection": coordinator.hub.connection.metrics.as_dict(),
+        "units": {
+            hub.get_unit(): {
+                "device_info": async_redact_data(hub.device_info, TO_REDACT),
+                "read_plan": describe_plan(hub.read_plan),
+                "block_available": hub.block_available,
+                "held_back_blocks": sorted(
+                    coordinator.held_back_blocks(hub, time.monotonic())
+                ),
+                "metrics": hub.metrics.as_dict(),
+            }
+            for hub in coordinator.hubs
+        },
+        "fast": (
+            None
+            if fast is None
+            else {
+                "read_plan": describe_plan(fast.read_plan),
+                "last_update_success": fast.last_update_success,
+                "skipped": fast.skipped,
+            }
+        ),
+    }
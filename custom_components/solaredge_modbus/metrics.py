@@ -0,0 +1,267 @@
+"""Instrumentation of the Modbus poll cycles.
+
+The metrics are always collected, they are a few counters and rolling windows
+of the most recent durations. They are shown by the diagnostic sensors and in
+the diagnostics download, to tune the scan intervals and spot overloaded
+gateways.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Any
+
+# Number of most recent samples kept by a histogram
+ROLLING_SAMPLES = 100
+# Upper bounds of the buckets of the duration histograms in seconds
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class RollingHistogram:
+    """Durations in seconds of the most recent samples."""
+
+    __slots__ = ("_samples",)
+
+    def __init__(self, size: int = ROLLING_SAMPLES) -> None:
+        """Initialize an empty histogram."""
+        self._samples: deque[float] = deque(maxlen=size)
+
+    def add(self, value: float) -> None:
+        """Add a sample, dropping the oldest one when the window is full."""
+        self._samples.append(value)
+
+    @property
+    def last(self) -> float | None:
+        """Return the most recent sample."""
+        return self._samples[-1] if self._samples else None
+
+    def percentile(self, percent: float) -> float | None:
+        """Return the sample at a percentile of the window."""
+        if not self._samples:
+            return None
+        samples = sorted(self._samples)
+        return samples[min(len(samples) - 1, int(len(samples) * percent / 100))]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a summary and the bucket counts of the window."""
+        samples = self._samples
+        if not samples:
+            return {"samples": 0}
+        buckets = dict.fromkeys(
+            [f"<={bound}" for bound in DURATION_BUCKETS] + [f">{DURATION_BUCKETS[-1]}"],
+            0,
+        )
+        for sample in samples:
+            for bound in DURATION_BUCKETS:
+                if sample <= bound:
+                    buckets[f"<={bound}"] += 1
+                    break
+            else:
+                buckets[f">{DURATION_BUCKETS[-1]}"] += 1
+        return {
+            "samples": len(samples),
+            "last": self.last,
+            "mean": sum(samples) / len(samples),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "max": max(samples),
+            "buckets": buckets,
+        }
+
+
+class RequestMetrics:
+    """Read requests of one register range of a unit."""
+
+    __slots__ = ("errors", "latency", "registers", "requests", "timeouts")
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.latency = RollingHistogram()
+        self.requests = 0
+        self.registers = 0
+        self.errors = 0
+        self.timeouts = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics for the diagnostics."""
+        return {
+            "requests": self.requests,
+            "registers": self.registers,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "latency": self.latency.as_dict(),
+        }
+
+
+class QueueMetrics:
+    """Requests waiting for a transaction slot of a connection."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.waits: dict[str, RollingHistogram] = {}
+        # Number of requests already waiting when a request is queued
+        self.depth = RollingHistogram()
+        self.max_depth = 0
+
+    def wait(self, priority: str) -> RollingHistogram:
+        """Return the wait times of the requests of a priority."""
+        if priority not in self.waits:
+            self.waits[priority] = RollingHistogram()
+        return self.waits[priority]
+
+    def add_depth(self, depth: int) -> None:
+        """Record the number of waiting requests when a request is queued."""
+        self.depth.add(depth)
+        self.max_depth = max(self.max_depth, depth)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics for the diagnostics."""
+        return {
+            "max_depth": self.max_depth,
+            # The buckets of the histogram are durations
+            "depth": {
+                "p50": self.depth.percentile(50),
+                "p95": self.depth.percentile(95),
+                "max": self.depth.percentile(100),
+            },
+            "wait": {key: value.as_dict() for key, value in self.waits.items()},
+        }
+
+
+class ConnectionMetrics:
+    """Transactions on a Modbus connection, shared by all its units."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.queue = QueueMetrics()
+        self.queue_wait = RollingHistogram()
+        self.round_trip = RollingHistogram()
+        self.transactions = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.connects = 0
+        # Transactions retried on a fresh socket
+        self.retries = 0
+        self.connect_failures = 0
+        # Timeout of the latest transaction and delay of the next connect
+        self.request_timeout: float | None = None
+        self.reconnect_delay = 0.0
+        self.circuit_open = False
+
+    @property
+    def reconnects(self) -> int:
+        """Return the number of connects after the first one."""
+        return max(0, self.connects - 1)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics for the diagnostics."""
+        return {
+            "transactions": self.transactions,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "reconnects": self.reconnects,
+            "retries": self.retries,
+            "connect_failures": self.connect_failures,
+            "request_timeout": self.request_timeout,
+            "reconnect_delay": self.reconnect_delay,
+            "circuit_open": self.circuit_open,
+            "queue_wait": self.queue_wait.as_dict(),
+            "round_trip": self.round_trip.as_dict(),
+            "queue": self.queue.as_dict(),
+        }
+
+
+class UnitMetrics:
+    """Reads and decoding of the register blocks of a unit."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.requests: dict[str, RequestMetrics] = {}
+        self.decode: dict[str, RollingHistogram] = {}
+        self.registers = 0
+
+    def request(self, key: str) -> RequestMetrics:
+        """Return the metrics of the requests reading the blocks of key."""
+        if key not in self.requests:
+            self.requests[key] = RequestMetrics()
+        return self.requests[key]
+
+    def decode_time(self, key: str) -> RollingHistogram:
+        """Return the decode times of a block."""
+        if key not in self.decode:
+            self.decode[key] = RollingHistogram()
+        return self.decode[key]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics for the diagnostics."""
+        return {
+            "registers": self.registers,
+            "requests": {key: value.as_dict() for key, value in self.requests.items()},
+            "decode": {key: value.as_dict() for key, value in self.decode.items()},
+        }
+
+
+class CycleMetrics:
+    """Poll cycles of a coordinator, compared with the scan interval."""
+
+    def __init__(self, scan_interval: float) -> None:
+        """Initialize the metrics."""
+        self.scan_interval = scan_interval
+        self.duration = RollingHistogram()
+        self.cycles = 0
+        self.failed = 0
+        self.registers: int | None = None
+
+    def add_cycle(self, duration: float, registers: int, success: bool) -> None:
+        """Record a poll cycle and the number of registers it read."""
+        self.duration.add(duration)
+        self.cycles += 1
+        if not success:
+            self.failed += 1
+        self.registers = registers
+
+    @property
+    def load(self) -> float | None:
+        """Return the duration of the last cycle as fraction of the scan interval."""
+        if self.duration.last is None:
+            return None
+        return self.duration.last / self.scan_interval
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics for the diagnostics."""
+        return {
+            "scan_interval": self.scan_interval,
+            "cycles": self.cycles,
+            "failed": self.failed,
+            "registers": self.registers,
+            "load": self.load,
+            "duration": self.duration.as_dict(),
+        }
+
+
+def milliseconds(seconds: float | None) -> float | None:
+    """Return a duration in seconds as rounded milliseconds."""
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+def poll_statistics(
+    cycle: CycleMetrics, connection: ConnectionMetrics
+) -> dict[str, Any]:
+    """Return the values of the diagnostic sensors by key."""
+    load = cycle.load
+    return {
+        "poll_cycle_duration": milliseconds(cycle.duration.last),
+        "poll_cycle_load": None if load is None else round(load * 100, 1),
+        "poll_registers": cycle.registers,
+        "modbus_round_trip": milliseconds(connection.round_trip.percentile(50)),
+        "modbus_queue_wait": milliseconds(connection.queue_wait.percentile(95)),
+        "modbus_control_wait": milliseconds(
+            connection.queue.wait("control").percentile(95)
+        ),
+        "modbus_queue_depth": connection.queue.depth.percentile(100),
+        "modbus_request_timeout": milliseconds(connection.request_timeout),
+        "modbus_errors": connection.errors,
+        "modbus_timeouts": connection.timeouts,
+        "modbus_reconnects": connection.reconnects,
+        "modbus_retries": connection.retries,
+    }
@@ -6,7 +6,7 @@ from homeassistant.components.number import NumberEntity
 from homeassistant.const import CONF_NAME
 from homeassistant.core import HomeAssistant, callback
 
-from . import SolarEdgeEntity, SolaredgeModbusCoordinator
+from . import SolarEdgeEntity, SolaredgeModbusCoordinator, SolaredgeModbusHub
 from .const import (
     ACTIVE_POWER_LIMIT_TYPES,
     DOMAIN,
@@ -14,7 +14,7 @@ from .const import (
     STORAGE_NUMBER_TYPES,
     SolarEdgeNumberDescription,
 )
-from .payload import BinaryPayloadBuilder, Endian
+from .writer import encode_registers
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -30,6 +30,8 @@ async def async_setup_entry(hass: HomeAssistant, entry, async_add_entities) -> N
     if hub.power_control_enabled:
         for number_info in ACTIVE_POWER_LIMIT_TYPES:
             entities.append(SolarEdgeNumber(hub, number_info))
+            for follower in hub.followers:
+                entities.append(SolarEdgeNumber(hub, number_info, follower))
 
     # If a meter is available add export control
     if hub.has_meter:
@@ -49,13 +51,16 @@ class SolarEdgeNumber(SolarEdgeEntity, NumberEntity):
     """Solaredge Number Entity."""
 
     def __init__(
-        self, hub: SolaredgeModbusCoordinator, description: SolarEdgeNumberDescription
+        self,
+        hub: SolaredgeModbusCoordinator,
+        description: SolarEdgeNumberDescription,
+        unit: SolaredgeModbusHub | None = None,
     ) -> None:
         """Init."""
-        super().__init__(hub)
+        super().__init__(hub, unit)
         self.entity_description = description
         self._attr_has_entity_name = True
-        self._attr_unique_id = f"{self.hub.name}_{description.key}"
+        self._attr_unique_id = f"{self.unique_id_prefix}_{description.key}"
         self._register = description.register
         self._fmt = description.fmt
         self._attr_native_min_value = description.attrs["min"]
@@ -72,21 +77,15 @@ class SolarEdgeNumber(SolarEdgeEntity, NumberEntity):
     @property
     def native_value(self) -> float:
         """Get native value."""
-        if self.entity_description.key in self.hub.modbus_data:
-            return self.hub.modbus_data[self.entity_description.key]
+        if self.entity_description.key in self.unit.modbus_data:
+            return self.unit.modbus_data[self.entity_description.key]
         return None
 
     async def async_set_native_value(self, value: float) -> None:
         """Change the selected value."""
-        builder = BinaryPayloadBuilder(byteorder=Endian.BIG, wordorder=Endian.LITTLE)
-
-        if self._fmt == "u32":
-            builder.add_32bit_uint(int(value))
-        elif self._fmt == "u16":
-            builder.add_16bit_uint(int(value))
-        elif self._fmt == "f":
-            builder.add_32bit_float(float(value))
-        else:
+        try:
+            registers = encode_registers(self._fmt, value)
+        except ValueError:
             _LOGGER.error(
                 "Invalid encoding format %s for %s",
                 self._fmt,
@@ -94,16 +93,10 @@ class SolarEdgeNumber(SolarEdgeEntity, NumberEntity):
             )
             return
 
-        response = await self.hub.hub.write_registers(
-            unit=self.hub.hub.get_unit(),
-            address=self._register,
-            payload=builder.to_registers(),
-        )
-        if response.isError():
+        # Writes in quick succession are merged into one request
+        if not await self.unit.writer.async_write(self._register, registers):
             _LOGGER.error(
                 "Could not write value %s to %s", value, self.entity_description.key
             )
             return
-
-        self.hub.modbus_data[self.entity_description.key] = value
-        self.async_write_ha_state()
+        # The value is published once it is read back from the unit
@@ -9,10 +9,14 @@ from __future__ import annotations
 __all__ = [
     "BinaryPayloadBuilder",
     "BinaryPayloadDecoder",
+    "unpack_block",
 ]
 
 # pylint: disable=missing-type-doc
-from struct import pack, unpack
+from array import array
+from functools import cache
+import re
+from struct import Struct, pack, unpack
 
 import enum
 from pymodbus.exceptions import ParameterException
@@ -21,6 +25,9 @@ from pymodbus.pdu.pdu import pack_bitstring, unpack_bitstring
 
 WC = {"b": 1, "h": 2, "e": 2, "i": 4, "l": 4, "q": 8, "f": 4, "d": 8}
 
+# A field of a block format: repeat count or string size and format character
+FIELD = re.compile(r"(\d*)([xbBhHeiIlLqQfds])")
+
 
 class Endian(str, enum.Enum):
     """An enumeration representing the various byte endianness.
@@ -269,6 +276,172 @@ class BinaryPayloadBuilder:
         self._payload.append(pack(fstring, value.encode()))
 
 
+@cache
+def _struct(fstring: str) -> Struct:
+    """Return the compiled struct of a format string."""
+    return Struct(fstring)
+
+
+@cache
+def _value_unpacker(fstring: str, byteorder: str, wordorder: str):
+    """Return a function unpacking one value at an offset of a buffer.
+
+    Values of one word only depend on the byte order. Longer values are
+    unpacked directly when the byte and word order agree, otherwise their
+    words are reordered first.
+
+    :param fstring: The struct format character of the value
+    :param byteorder: The endianness of the bytes in the words
+    :param wordorder: The endianness of the words
+    """
+    words = _struct(fstring).size // 2
+    if words <= 1 or (byteorder == wordorder and byteorder != Endian.AUTO):
+        return _struct(byteorder + fstring).unpack_from
+
+    network = _struct(f"!{words}H").unpack_from
+    repack = _struct(byteorder + f"{words}H").pack
+    value = _struct("!" + fstring).unpack
+    reverse = wordorder == Endian.LITTLE
+
+    def unpack_value(buffer, offset=0):
+        handle = network(buffer, offset)
+        if reverse:
+            handle = handle[::-1]
+        return value(repack(*handle))
+
+    return unpack_value
+
+
+@cache
+def _block_unpacker(fmt: str, byteorder: str, wordorder: str):
+    """Return the size of a block format and a function unpacking it.
+
+    The format uses the struct format characters without a byte order prefix.
+    A count repeats a value, except for strings where it is the size in bytes.
+    Strings are returned without NULL terminators and ``x`` skips bytes.
+
+    When the word order differs from the byte order, the words of all multi
+    word values are swapped at once in a copy of the block, after which the
+    whole block is unpacked by a single struct.
+
+    :param fmt: The format of the block
+    :param byteorder: The endianness of the bytes in the words
+    :param wordorder: The endianness of the words
+    :raises ParameterException:
+    """
+    fields = FIELD.findall(fmt)
+    if "".join(count + code for count, code in fields) != fmt:
+        raise ParameterException(f"Invalid block format {fmt!r}")
+
+    codes = []
+    for count, code in fields:
+        if code == "s":
+            codes.append(code)
+        elif code != "x":
+            codes.extend(code * int(count or 1))
+    strings = [index for index, code in enumerate(codes) if code == "s"]
+
+    # Runs of consecutive multi word values of the same size, as
+    # (first word, word after the run, words per value)
+    runs: list[tuple[int, int, int]] = []
+    size = 0
+    aligned = True
+    for count, code in fields:
+        if code in "sx":
+            size += int(count or 1)
+            continue
+        width = _struct(code).size
+        repeat = int(count or 1)
+        if width > 2:
+            aligned = aligned and size % 2 == 0
+            words = width // 2
+            first = size // 2
+            if runs and runs[-1][1:] == (first, words):
+                first = runs.pop()[0]
+            runs.append((first, size // 2 + repeat * words, words))
+        size += width * repeat
+
+    swap = (wordorder == Endian.LITTLE) != (byteorder == Endian.LITTLE)
+    if byteorder == Endian.AUTO or (swap and runs and not (aligned and size % 2 == 0)):
+        return size, _field_unpacker(fields, byteorder, wordorder)
+
+    block = _struct(byteorder + fmt)
+    if swap and runs:
+
+        def unpack_values(buffer, offset=0):
+            words = array("H", buffer[offset : offset + size])
+            for first, end, width in runs:
+                parts = [words[first + word : end : width] for word in range(width)]
+                for word, part in enumerate(reversed(parts)):
+                    words[first + word : end : width] = part
+            return block.unpack(words)
+
+    else:
+        unpack_values = block.unpack_from
+
+    if not strings:
+        return size, unpack_values
+
+    def unpack_strings(buffer, offset=0):
+        values = list(unpack_values(buffer, offset))
+        for index in strings:
+            values[index] = values[index].rstrip(b"\0").decode()
+        return tuple(values)
+
+    return size, unpack_strings
+
+
+def _field_unpacker(fields, byteorder: str, wordorder: str):
+    """Return a function unpacking the fields of a block value by value.
+
+    :param fields: The parsed fields of the block format
+    :param byteorder: The endianness of the bytes in the words
+    :param wordorder: The endianness of the words
+    """
+    steps = []
+    size = 0
+    for count, code in fields:
+        if code in "sx":
+            length = int(count or 1)
+            if code == "s":
+                steps.append((size, length, None))
+            size += length
+            continue
+        unpacker = _value_unpacker(code, byteorder, wordorder)
+        width = _struct(code).size
+        for _ in range(int(count or 1)):
+            steps.append((size, width, unpacker))
+            size += width
+
+    def unpack_fields(buffer, offset=0):
+        values = []
+        for start, length, unpacker in steps:
+            if unpacker is None:
+                start += offset
+                values.append(
+                    bytes(buffer[start : start + length]).rstrip(b"\0").decode()
+                )
+            else:
+                values.append(unpacker(buffer, offset + start)[0])
+        return tuple(values)
+
+    return unpack_fields
+
+
+def unpack_block(registers, fmt, byteorder=Endian.LITTLE, wordorder=Endian.BIG):
+    """Decode all values of a block of registers at once.
+
+    :param registers: The register results to decode
+    :param fmt: The format of the block, see :meth:`BinaryPayloadDecoder.decode_many`
+    :param byteorder: The Byte order of each word
+    :param wordorder: The endianness of the word (when wordcount is >= 2)
+    :returns: A tuple of the decoded values
+    """
+    return BinaryPayloadDecoder.fromRegisters(
+        registers, byteorder, wordorder
+    ).decode_many(fmt)
+
+
 class BinaryPayloadDecoder:
     """A utility that helps decode payload messages from a modbus response message.
 
@@ -279,6 +452,10 @@ class BinaryPayloadDecoder:
         decoder = BinaryPayloadDecoder(payload)
         first   = decoder.decode_8bit_uint()
         second  = decoder.decode_16bit_uint()
+
+    Several values can be decoded at once with a format string::
+
+        power, energy, name = decoder.decode_many("fQ32s")
     """
 
     def __init__(self, payload, byteorder=Endian.LITTLE, wordorder=Endian.BIG):
@@ -314,9 +491,8 @@ class BinaryPayloadDecoder:
         :returns: An initialized PayloadDecoder
         :raises ParameterException:
         """
-        Log.debug("{}", registers)
         if isinstance(registers, list):  # repack into flat binary
-            payload = b"".join(pack("!H", x) for x in registers)
+            payload = _struct(f"!{len(registers)}H").pack(*registers)
             return cls(payload, byteorder, wordorder)
         raise ParameterException("Invalid collection of registers supplied")
 
@@ -358,15 +534,37 @@ class BinaryPayloadDecoder:
         :return:
         """
         wc_value = WC.get(fstring.lower()) // 2  # type: ignore[operator]
-        handle = unpack(f"!{wc_value}H", handle)
+        handle = _struct(f"!{wc_value}H").unpack(handle)
         if self._wordorder == Endian.LITTLE:
-            handle = list(reversed(handle))
+            handle = handle[::-1]
 
         # Repack as unsigned Integer
-        handle = [pack(self._byteorder + "H", p) for p in handle]
-        Log.debug("handle: {}", handle)
-        handle = b"".join(handle)
-        return handle
+        return _struct(self._byteorder + f"{wc_value}H").pack(*handle)
+
+    def _decode(self, fstring: str):
+        """Decode a value at the pointer and advance the pointer past it."""
+        unpacker = _value_unpacker(fstring, self._byteorder, self._wordorder)
+        value = unpacker(self._payload, self._pointer)[0]
+        self._pointer += _struct(fstring).size
+        return value
+
+    def decode_many(self, fmt: str) -> tuple:
+        """Decode several values at once and advance the pointer past them.
+
+        The format consists of struct format characters without a byte order
+        prefix, which is taken from the decoder. A count repeats a value, for
+        strings (``s``) it is the size in bytes and ``x`` skips bytes, e.g.
+        ``"32sHf"`` decodes a string of 16 registers, a 16 bit unsigned int and
+        a 32 bit float.
+
+        :param fmt: The format of the values to decode
+        :returns: A tuple of the decoded values
+        :raises ParameterException:
+        """
+        size, unpacker = _block_unpacker(fmt, self._byteorder, self._wordorder)
+        values = unpacker(self._payload, self._pointer)
+        self._pointer += size
+        return values
 
     def reset(self):
         """Reset the decoder pointer back to the start."""
@@ -374,10 +572,7 @@ class BinaryPayloadDecoder:
 
     def decode_8bit_uint(self):
         """Decode a 8 bit unsigned int from the buffer."""
-        self._pointer += 1
-        fstring = self._byteorder + "B"
-        handle = self._payload[self._pointer - 1 : self._pointer]
-        return unpack(fstring, handle)[0]
+        return self._decode("B")
 
     def decode_bits(self, package_len=1):
         """Decode a byte worth of bits from the buffer."""
@@ -388,80 +583,43 @@ class BinaryPayloadDecoder:
 
     def decode_16bit_uint(self):
         """Decode a 16 bit unsigned int from the buffer."""
-        self._pointer += 2
-        fstring = self._byteorder + "H"
-        handle = self._payload[self._pointer - 2 : self._pointer]
-        return unpack(fstring, handle)[0]
+        return self._decode("H")
 
     def decode_32bit_uint(self):
         """Decode a 32 bit unsigned int from the buffer."""
-        self._pointer += 4
-        fstring = "I"
-        handle = self._payload[self._pointer - 4 : self._pointer]
-        handle = self._unpack_words(fstring, handle)
-        return unpack("!" + fstring, handle)[0]
+        return self._decode("I")
 
     def decode_64bit_uint(self):
         """Decode a 64 bit unsigned int from the buffer."""
-        self._pointer += 8
-        fstring = "Q"
-        handle = self._payload[self._pointer - 8 : self._pointer]
-        handle = self._unpack_words(fstring, handle)
-        return unpack("!" + fstring, handle)[0]
+        return self._decode("Q")
 
     def decode_8bit_int(self):
         """Decode a 8 bit signed int from the buffer."""
-        self._pointer += 1
-        fstring = self._byteorder + "b"
-        handle = self._payload[self._pointer - 1 : self._pointer]
-        return unpack(fstring, handle)[0]
+        return self._decode("b")
 
     def decode_16bit_int(self):
         """Decode a 16 bit signed int from the buffer."""
-        self._pointer += 2
-        fstring = self._byteorder + "h"
-        handle = self._payload[self._pointer - 2 : self._pointer]
-        return unpack(fstring, handle)[0]
+        return self._decode("h")
 
     def decode_32bit_int(self):
         """Decode a 32 bit signed int from the buffer."""
-        self._pointer += 4
-        fstring = "i"
-        handle = self._payload[self._pointer - 4 : self._pointer]
-        handle = self._unpack_words(fstring, handle)
-        return unpack("!" + fstring, handle)[0]
+        return self._decode("i")
 
     def decode_64bit_int(self):
         """Decode a 64 bit signed int from the buffer."""
-        self._pointer += 8
-        fstring = "q"
-        handle = self._payload[self._pointer - 8 : self._pointer]
-        handle = self._unpack_words(fstring, handle)
-        return unpack("!" + fstring, handle)[0]
+        return self._decode("q")
 
     def decode_16bit_float(self):
         """Decode a 16 bit float from the buffer."""
-        self._pointer += 2
-        fstring = "e"
-        handle = self._payload[self._pointer - 2 : self._pointer]
-        handle = self._unpack_words(fstring, handle)
-        return unpack("!" + fstring, handle)[0]
+        return self._decode("e")
 
     def decode_32bit_float(self):
         """Decode a 32 bit float from the buffer."""
-        self._pointer += 4
-        fstring = "f"
-        handle = self._payload[self._pointer - 4 : self._pointer]
-        handle = self._unpack_words(fstring, handle)
-        return unpack("!" + fstring, handle)[0]
+        return self._decode("f")
 
     def decode_64bit_float(self):
         """Decode a 64 bit float(double) from the buffer."""
-        self._pointer += 8
-        fstring = "d"
-        handle = self._payload[self._pointer - 8 : self._pointer]
-        handle = self._unpack_words(fstring, handle)
-        return unpack("!" + fstring, handle)[0]
+        return self._decode("d")
 
     def decode_string(self, size=1):
         """Decode a string from the buffer.
@@ -0,0 +1,266 @@
+"""Pipelined Modbus TCP client for the SolarEdge Modbus integration.
+
+The pymodbus client waits for the response of a transaction before sending
+the next request. Modbus TCP identifies every transaction by the transaction
+id in its MBAP header, so several requests can be in flight on a single
+connection, which saves round trips on high latency links.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Sequence
+import logging
+from struct import Struct
+
+from pymodbus.exceptions import ConnectionException, ModbusIOException
+
+_LOGGER = logging.getLogger(__name__)
+
+# Transaction id, protocol id, length and unit id
+MBAP_HEADER = Struct(">HHHB")
+# The length of the MBAP header counts the unit id and the PDU
+MAX_PDU_SIZE = 253
+
+READ_HOLDING_REGISTERS = 0x03
+WRITE_SINGLE_REGISTER = 0x06
+WRITE_MULTIPLE_REGISTERS = 0x10
+
+
+class ModbusResponse:
+    """Response to a pipelined transaction.
+
+    Read responses keep the register bytes of the PDU, which the register
+    block decoders unpack directly. The list of registers is only built when
+    it is used.
+    """
+
+    def __init__(
+        self,
+        function_code: int,
+        registers: list[int] | None = None,
+        exception_code: int = 0,
+        register_bytes: memoryview | None = None,
+    ) -> None:
+        """Initialize the response."""
+        self.function_code = function_code
+        self._registers = registers
+        self.exception_code = exception_code
+        self.register_bytes = register_bytes
+
+    @property
+    def registers(self) -> list[int]:
+        """Return the registers of the response."""
+        if self._registers is None:
+            if self.register_bytes is None:
+                self._registers = []
+            else:
+                count = len(self.register_bytes) // 2
+                self._registers = list(
+                    Struct(f">{count}H").unpack_from(self.register_bytes)
+                )
+        return self._registers
+
+    def isError(self) -> bool:
+        """Return true if the device returned an exception response."""
+        return self.exception_code != 0
+
+    def __str__(self) -> str:
+        """Return a string representation of the response."""
+        if self.isError():
+            return (
+                f"Exception response {self.function_code | 0x80}"
+                f" / {self.exception_code}"
+            )
+        return f"Response {self.function_code} ({len(self.registers)} registers)"
+
+
+class PipelinedModbusTcpClient:
+    """Modbus TCP client allowing several transactions in flight.
+
+    Responses are matched to their request by transaction id. When a
+    transaction times out while others are in flight, the device is assumed
+    not to support pipelining and the client falls back to a single
+    transaction at a time.
+    """
+
+    def __init__(self, host: str, port: int, timeout: float, depth: int) -> None:
+        """Initialize the client.
+
+        :param host: The host to connect to
+        :param port: The port to connect to
+        :param timeout: Seconds to wait for a connection or a response
+        :param depth: The maximum number of transactions in flight
+        """
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.depth = max(1, depth)
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._receiver: asyncio.Task | None = None
+        # Unit id and response of the transactions in flight
+        self._transactions: dict[int, tuple[int, asyncio.Future]] = {}
+        self._transaction_id = 0
+        self._in_flight = 0
+        self._slots = asyncio.Condition()
+
+    @property
+    def connected(self) -> bool:
+        """Return true if the connection is open."""
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def connect(self) -> bool:
+        """Open the connection."""
+        try:
+            self._reader, self._writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port), self.timeout
+            )
+        except (OSError, TimeoutError) as err:
+            _LOGGER.debug("Connection to %s:%s failed: %s", self.host, self.port, err)
+            return False
+
+        self._receiver = asyncio.get_running_loop().create_task(self._receive())
+        return True
+
+    def close(self) -> None:
+        """Close the connection and fail all transactions in flight."""
+        if self._receiver is not None:
+            self._receiver.cancel()
+            self._receiver = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        self._fail_transactions(ConnectionException("Connection closed"))
+
+    async def read_holding_registers(
+        self, address: int, count: int, device_id: int = 1
+    ) -> ModbusResponse:
+        """Read holding registers."""
+        function_code, data = await self._execute(
+            device_id, READ_HOLDING_REGISTERS, address.to_bytes(2) + count.to_bytes(2)
+        )
+        if function_code & 0x80:
+            return ModbusResponse(READ_HOLDING_REGISTERS, exception_code=data[0])
+        return ModbusResponse(
+            READ_HOLDING_REGISTERS, register_bytes=data[1 : 1 + data[0]]
+        )
+
+    async def write_register(
+        self, address: int, value: int, device_id: int = 1
+    ) -> ModbusResponse:
+        """Write a single register."""
+        function_code, data = await self._execute(
+            device_id, WRITE_SINGLE_REGISTER, address.to_bytes(2) + value.to_bytes(2)
+        )
+        if function_code & 0x80:
+            return ModbusResponse(WRITE_SINGLE_REGISTER, exception_code=data[0])
+        return ModbusResponse(WRITE_SINGLE_REGISTER, [value])
+
+    async def write_registers(
+        self, address: int, values: Sequence[int], device_id: int = 1
+    ) -> ModbusResponse:
+        """Write multiple registers."""
+        count = len(values)
+        function_code, data = await self._execute(
+            device_id,
+            WRITE_MULTIPLE_REGISTERS,
+            address.to_bytes(2)
+            + count.to_bytes(2)
+            + (count * 2).to_bytes(1)
+            + Struct(f">{count}H").pack(*values),
+        )
+        if function_code & 0x80:
+            return ModbusResponse(WRITE_MULTIPLE_REGISTERS, exception_code=data[0])
+        return ModbusResponse(WRITE_MULTIPLE_REGISTERS, list(values))
+
+    async def _execute(
+        self, unit: int, function_code: int, data: bytes
+    ) -> tuple[int, memoryview]:
+        """Send a request and wait for the function code and data of its response."""
+        async with self._slots:
+            await self._slots.wait_for(lambda: self._in_flight < self.depth)
+            self._in_flight += 1
+
+        try:
+            if not self.connected:
+                raise ConnectionException(f"Not connected to {self.host}:{self.port}")
+
+            self._transaction_id = (self._transaction_id + 1) & 0xFFFF
+            transaction_id = self._transaction_id
+            future = asyncio.get_running_loop().create_future()
+            self._transactions[transaction_id] = (unit, future)
+            self._writer.write(
+                MBAP_HEADER.pack(transaction_id, 0, len(data) + 2, unit)
+                + function_code.to_bytes(1)
+                + data
+            )
+
+            try:
+                return await asyncio.wait_for(future, self.timeout)
+            except TimeoutError as err:
+                if self._in_flight > 1 and self.depth > 1:
+                    _LOGGER.warning(
+                        "No response from %s:%s with %s transactions in flight, "
+                        "falling back to one transaction at a time",
+                        self.host,
+                        self.port,
+                        self._in_flight,
+                    )
+                    self.depth = 1
+                raise ModbusIOException(
+                    f"No response to transaction {transaction_id}"
+                ) from err
+            finally:
+                self._transactions.pop(transaction_id, None)
+        finally:
+            async with self._slots:
+                self._in_flight -= 1
+                self._slots.notify_all()
+
+    async def _receive(self) -> None:
+        """Dispatch the responses received to their transactions."""
+        try:
+            while True:
+                header = await self._reader.readexactly(MBAP_HEADER.size)
+                transaction_id, _, length, unit = MBAP_HEADER.unpack(header)
+                # The stream can not be framed any further after a bad length
+                if not 2 <= length <= MAX_PDU_SIZE + 1:
+                    raise ModbusIOException(
+                        f"Invalid length {length} of the response to "
+                        f"transaction {transaction_id}"
+                    )
+                pdu = await self._reader.readexactly(length - 1)
+                expected_unit, future = self._transactions.get(
+                    transaction_id, (unit, None)
+                )
+                if future is None or future.done():
+                    _LOGGER.debug(
+                        "Discarding response to transaction %s", transaction_id
+                    )
+                elif unit != expected_unit:
+                    future.set_exception(
+                        ModbusIOException(
+                            f"Response of unit {unit} to transaction "
+                            f"{transaction_id} of unit {expected_unit}"
+                        )
+                    )
+                else:
+                    future.set_result((pdu[0], memoryview(pdu)[1:]))
+        except (OSError, asyncio.IncompleteReadError, ModbusIOException) as err:
+            _LOGGER.debug("Connection to %s:%s lost: %s", self.host, self.port, err)
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            self._fail_transactions(
+                err
+                if isinstance(err, ModbusIOException)
+                else ConnectionException("Connection lost")
+            )
+
+    def _fail_transactions(self, error: Exception) -> None:
+        """Fail all transactions waiting for a response."""
+        for _, future in self._transactions.values():
+            if not future.done():
+                future.set_exception(error)
+        self._transactions.clear()
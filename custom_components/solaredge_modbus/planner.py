@@ -0,0 +1,147 @@
+"""Read planner for the SolarEdge Modbus integration.
+
+Coalesces the register blocks that need to be read in a poll cycle into as
+few read holding registers requests as possible.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+
+from .const import POLL_TIER_FAST
+
+# A single read holding registers request returns at most 125 registers.
+MAX_READ_COUNT = 125
+# Largest run of unused registers still worth reading through to save a
+# round trip.
+DEFAULT_MAX_READ_GAP = 32
+
+
+@dataclass(frozen=True)
+class RegisterBlock:
+    """A contiguous run of holding registers that is decoded as a unit.
+
+    Blocks which are not mergeable are always read with their own request,
+    e.g. because the device may reject them when a feature is disabled. The
+    tier sets how often the block is polled.
+    """
+
+    key: str
+    address: int
+    count: int
+    mergeable: bool = True
+    tier: str = POLL_TIER_FAST
+
+    @property
+    def end(self) -> int:
+        """Return the address directly after the block."""
+        return self.address + self.count
+
+
+@dataclass(frozen=True)
+class ReadRequest:
+    """A single read holding registers request covering one or more blocks."""
+
+    address: int
+    count: int
+    blocks: tuple[RegisterBlock, ...]
+
+    @property
+    def gaps(self) -> list[tuple[int, int]]:
+        """Return the (start, end) address ranges read which belong to no block."""
+        gaps = []
+        end = self.address
+        for block in sorted(self.blocks, key=lambda block: block.address):
+            if block.address > end:
+                gaps.append((end, block.address))
+            end = max(end, block.end)
+        return gaps
+
+    @property
+    def gap(self) -> int:
+        """Return the number of registers read which belong to no block."""
+        covered = set()
+        for block in self.blocks:
+            covered.update(range(block.address, block.end))
+        return self.count - len(covered)
+
+    def split(
+        self, registers: Sequence[int] | memoryview
+    ) -> dict[str, list[int] | memoryview]:
+        """Split the registers of the response over the blocks.
+
+        Register bytes are split into views of the response without copying.
+        """
+        if isinstance(registers, memoryview):
+            return {
+                block.key: registers[
+                    (block.address - self.address) * 2 : (block.end - self.address) * 2
+                ]
+                for block in self.blocks
+            }
+        return {
+            block.key: list(
+                registers[block.address - self.address : block.end - self.address]
+            )
+            for block in self.blocks
+        }
+
+
+def plan_reads(
+    blocks: Iterable[RegisterBlock],
+    max_count: int = MAX_READ_COUNT,
+    max_gap: int = DEFAULT_MAX_READ_GAP,
+    unreadable: Iterable[tuple[int, int]] = (),
+) -> list[ReadRequest]:
+    """Merge register blocks into as few read requests as possible.
+
+    Blocks are merged in address order as long as the merged request stays
+    within max_count registers and the unused gap between them is at most
+    max_gap registers. Gaps overlapping one of the unreadable (start, end)
+    address ranges are never read through.
+    """
+    unreadable = tuple(unreadable)
+    requests: list[ReadRequest] = []
+    group: list[RegisterBlock] = []
+    start = end = 0
+
+    def flush() -> None:
+        if group:
+            requests.append(ReadRequest(start, end - start, tuple(group)))
+
+    for block in sorted(blocks, key=lambda block: (block.address, block.count)):
+        if block.count > max_count:
+            raise ValueError(
+                f"Block {block.key} of {block.count} registers exceeds {max_count}"
+            )
+        if (
+            group
+            and block.mergeable
+            and group[-1].mergeable
+            and block.address - end <= max_gap
+            and max(end, block.end) - start <= max_count
+            and not any(low < block.address and high > end for low, high in unreadable)
+        ):
+            group.append(block)
+            end = max(end, block.end)
+            continue
+
+        flush()
+        group = [block]
+        start, end = block.address, block.end
+
+    flush()
+    return requests
+
+
+def describe_plan(plan: Sequence[ReadRequest]) -> str:
+    """Return a short human readable summary of a read plan."""
+    registers = sum(request.count for request in plan)
+    gap = sum(request.gap for request in plan)
+    requests = ", ".join(
+        f"{request.address}/{request.count}"
+        f"[{'+'.join(block.key for block in request.blocks)}]"
+        for request in plan
+    )
+    return f"{len(plan)} requests, {registers} registers ({gap} unused): {requests}"
@@ -0,0 +1,81 @@
+"""State dependent poll intervals for the SolarEdge Modbus integration.
+
+While an inverter sleeps at night or a battery is idle, their values hardly
+change. A poll rule reads a block of a unit in such a state at a slower
+interval. The state itself is still read at its normal rate, so the block is
+read at the normal rate again from the first poll after the state changed.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import partial
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from . import SolaredgeModbusHub
+
+# Inverter status: Off, Sleeping (night mode)
+INVERTER_SLEEP_STATES = frozenset({1, 2})
+# Battery status: Charging, Discharging
+BATTERY_ACTIVE_STATES = frozenset({3, 4})
+
+
+@dataclass(frozen=True)
+class PollRule:
+    """Slower poll interval of a block while its unit is in some state.
+
+    :param block: The key of the block
+    :param interval: Seconds between the reads of the block in the state
+    :param applies: Returns True while the unit of a hub is in the state
+    :param probe: Keys which are still read every poll, to notice when the
+        state changes
+    """
+
+    block: str
+    interval: float
+    applies: Callable[[SolaredgeModbusHub], bool]
+    probe: frozenset[str] = frozenset()
+
+
+def inverter_sleeping(hub: SolaredgeModbusHub) -> bool:
+    """Return True while the inverter is off or sleeping."""
+    return hub.modbus_data.get("status") in INVERTER_SLEEP_STATES
+
+
+def battery_idle(battery_prefix: str, hub: SolaredgeModbusHub) -> bool:
+    """Return True while a battery is neither charging nor discharging."""
+    status = hub.battery_status.get(battery_prefix)
+    return status is not None and status not in BATTERY_ACTIVE_STATES
+
+
+def poll_rules(
+    sleep_interval: float, idle_battery_interval: float
+) -> tuple[PollRule, ...]:
+    """Return the poll rules of the configured intervals, 0 disables a rule.
+
+    :param sleep_interval: Seconds between the reads of the inverter data
+        while the inverter sleeps, its status is read every poll
+    :param idle_battery_interval: Seconds between the reads of the battery
+        power, voltage and current while the battery is idle, its status is
+        read every poll
+    """
+    rules = []
+    if sleep_interval:
+        rules.append(
+            PollRule(
+                "inverter", sleep_interval, inverter_sleeping, frozenset({"status"})
+            )
+        )
+    if idle_battery_interval:
+        rules.extend(
+            PollRule(
+                battery_prefix.rstrip("_"),
+                idle_battery_interval,
+                partial(battery_idle, battery_prefix),
+                frozenset({battery_prefix + "status"}),
+            )
+            for battery_prefix in ("battery1_", "battery2_", "battery3_")
+        )
+    return tuple(rules)
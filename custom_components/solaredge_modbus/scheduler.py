@@ -0,0 +1,107 @@
+"""Priority scheduling of the Modbus requests on a shared connection.
+
+Every transaction waits for one of the slots of the connection, one for the
+plain client and one per transaction in flight for the pipelined client. Free
+slots go to the waiting request with the highest priority, so control writes
+and their read-backs overtake the poll reads queued before them, and a poll
+yields to them between its requests. The reads of the hot set go between the
+two, so they wait for at most the poll request in flight.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+import heapq
+import itertools
+import time
+
+from .const import PRIORITY_BACKGROUND, PRIORITY_CONTROL, PRIORITY_FAST, PRIORITY_POLL
+from .metrics import QueueMetrics
+
+PRIORITY_NAMES = {
+    PRIORITY_CONTROL: "control",
+    PRIORITY_FAST: "fast",
+    PRIORITY_POLL: "poll",
+    PRIORITY_BACKGROUND: "background",
+}
+
+
+class RequestScheduler:
+    """Grants the transaction slots of a connection by priority."""
+
+    def __init__(self, capacity: int = 1, metrics: QueueMetrics | None = None) -> None:
+        """Initialize the scheduler.
+
+        :param capacity: The number of requests which may run at once
+        :param metrics: Receives the wait times and queue depths
+        """
+        self.capacity = capacity
+        self.metrics = metrics or QueueMetrics()
+        self._active = 0
+        # Waiting requests ordered by priority, then by arrival
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._arrivals = itertools.count()
+
+    @property
+    def queued(self) -> int:
+        """Return the number of requests waiting for a slot."""
+        return len(self._waiters)
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_POLL) -> AsyncIterator[None]:
+        """Hold a slot of the connection."""
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, priority: int = PRIORITY_POLL) -> None:
+        """Wait for a free slot, ahead of the requests of lower priority."""
+        start = time.perf_counter()
+        self.metrics.add_depth(len(self._waiters))
+        if self._active < self.capacity and not self._waiters:
+            self._active += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            waiter = (priority, next(self._arrivals), future)
+            heapq.heappush(self._waiters, waiter)
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    with suppress(ValueError):
+                        self._waiters.remove(waiter)
+                        heapq.heapify(self._waiters)
+                else:
+                    # The slot was granted just before the cancellation
+                    self.release()
+                raise
+        self.metrics.wait(PRIORITY_NAMES.get(priority, str(priority))).add(
+            time.perf_counter() - start
+        )
+
+    def set_capacity(self, capacity: int) -> None:
+        """Change the number of requests which may run at once.
+
+        Slots added by a larger capacity are granted to waiting requests
+        right away.
+        """
+        self.capacity = capacity
+        self._grant()
+
+    def release(self) -> None:
+        """Free a slot and grant it to the next waiting request."""
+        self._active -= 1
+        self._grant()
+
+    def _grant(self) -> None:
+        """Grant the free slots to the waiting requests by priority."""
+        while self._waiters and self._active < self.capacity:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self._active += 1
+            future.set_result(None)
@@ -78,9 +78,10 @@ class SolarEdgeSelect(SelectEntity, SolarEdgeEntity):
     async def async_select_option(self, option: str) -> None:
         """Change the selected option."""
         new_mode = get_key(self._option_dict, option)
-        await self.hub.hub.write_register(
-            unit=self.hub.hub.get_unit(), address=self._register, payload=new_mode
-        )
-
-        self.hub.modbus_data[self.entity_description.key] = option
-        self.async_write_ha_state()
+        # Writes in quick succession are merged into one request
+        if not await self.hub.hub.writer.async_write(self._register, [new_mode]):
+            _LOGGER.error(
+                "Could not write option %s to %s", option, self.entity_description.key
+            )
+            return
+        # The option is published once it is read back from the unit
@@ -1,5 +1,6 @@
 """Solaredge sensors."""
 
+from dataclasses import replace
 import logging
 
 from homeassistant.components.sensor import (
@@ -10,7 +11,13 @@ from homeassistant.components.sensor import (
 from homeassistant.const import CONF_NAME
 from homeassistant.core import HomeAssistant, callback
 
-from . import SolarEdgeEntity, SolaredgeModbusCoordinator
+from . import (
+    DATA_LAYOUT,
+    SolarEdgeEntity,
+    SolaredgeFastCoordinator,
+    SolaredgeModbusCoordinator,
+    SolaredgeModbusHub,
+)
 from .const import (
     ATTR_STATUS_DESCRIPTION,
     BATTERIES,
@@ -18,6 +25,7 @@ from .const import (
     BATTERY_2,
     BATTERY_3,
     DEVICE_STATUSSES,
+    DIAGNOSTIC_SENSORS,
     DOMAIN,
     INVERTER_SENSORS,
     METER_1,
@@ -39,6 +47,10 @@ async def async_setup_entry(hass: HomeAssistant, entry, async_add_entities):
     for sensor_info in INVERTER_SENSORS:
         entities.append(SolarEdgeSensor(hub, sensor_info))
 
+    for follower in hub.followers:
+        for sensor_info in INVERTER_SENSORS:
+            entities.append(SolarEdgeSensor(hub, sensor_info, follower))
+
     if hub.read_meter1:
         for meter_sensor_info in METERS.get(METER_1):
             entities.append(SolarEdgeSensor(hub, meter_sensor_info))
@@ -63,6 +75,23 @@ async def async_setup_entry(hass: HomeAssistant, entry, async_add_entities):
         for battery_sensor_info in BATTERIES.get(BATTERY_3):
             entities.append(SolarEdgeSensor(hub, battery_sensor_info))
 
+    for sensor_info in DIAGNOSTIC_SENSORS:
+        entities.append(SolarEdgeDiagnosticSensor(hub, sensor_info))
+
+    fast = hass.data[DOMAIN][hub_name]["fast"]
+    if fast is not None:
+        descriptions = {
+            sensor_info.key: sensor_info
+            for sensor_info in (
+                *INVERTER_SENSORS,
+                *(info for infos in METERS.values() for info in infos),
+                *(info for infos in BATTERIES.values() for info in infos),
+            )
+        }
+        for key in sorted(fast.keys):
+            if key in descriptions:
+                entities.append(SolarEdgeFastSensor(hub, fast, descriptions[key]))
+
     async_add_entities(entities)
     return True
 
@@ -71,18 +100,34 @@ class SolarEdgeSensor(SolarEdgeEntity, SensorEntity):
     """Representation of a solaredge sensor."""
 
     def __init__(
-        self, hub: SolaredgeModbusCoordinator, description: SensorEntityDescription
+        self,
+        hub: SolaredgeModbusCoordinator,
+        description: SensorEntityDescription,
+        unit: SolaredgeModbusHub | None = None,
     ) -> None:
         """Init the sensor."""
-        super().__init__(hub)
+        super().__init__(hub, unit)
         self.entity_description = description
         self._attr_has_entity_name = True
-        self._attr_unique_id = f"{self.hub.name}_{description.key}"
+        self._attr_unique_id = f"{self.unique_id_prefix}_{description.key}"
+        self._field = DATA_LAYOUT.index(description.key)
+
+    @property
+    def data_keys(self) -> tuple[str, ...]:
+        """Return the keys of the data the state of the sensor depends on."""
+        key = self.entity_description.key
+        if key.startswith("battery"):
+            # The battery information is shown as attributes
+            return (key, key[: len("battery1")] + "_attrs")
+        return (key,)
 
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        new_value = self.hub.modbus_data.get(self.entity_description.key)
+        if not self.state_changed():
+            return
+
+        new_value = self.unit.modbus_data.get_field(self._field)
         """We keep old value when we would get a new value of 0 for a total increasing sensor."""
         if (
             (self.entity_description.state_class != SensorStateClass.TOTAL_INCREASING)
@@ -107,16 +152,86 @@ class SolarEdgeSensor(SolarEdgeEntity, SensorEntity):
             }
         elif (
             "battery1" in self.entity_description.key
-            and "battery1_attrs" in self.hub.modbus_data
+            and "battery1_attrs" in self.unit.modbus_data
         ):
-            self._attr_extra_state_attributes = self.hub.modbus_data["battery1_attrs"]
+            self._attr_extra_state_attributes = self.unit.modbus_data["battery1_attrs"]
         elif (
             "battery2" in self.entity_description.key
-            and "battery2_attrs" in self.hub.modbus_data
+            and "battery2_attrs" in self.unit.modbus_data
         ):
-            self._attr_extra_state_attributes = self.hub.modbus_data["battery2_attrs"]
+            self._attr_extra_state_attributes = self.unit.modbus_data["battery2_attrs"]
         elif (
             "battery3" in self.entity_description.key
-            and "battery3_attrs" in self.hub.modbus_data
+            and "battery3_attrs" in self.unit.modbus_data
+        ):
+            self._attr_extra_state_attributes = self.unit.modbus_data["battery3_attrs"]
+
+
+class SolarEdgeDiagnosticSensor(SolarEdgeEntity, SensorEntity):
+    """Representation of a statistic of the poll cycles."""
+
+    def __init__(
+        self, hub: SolaredgeModbusCoordinator, description: SensorEntityDescription
+    ) -> None:
+        """Init the sensor."""
+        super().__init__(hub)
+        self.entity_description = description
+        self._attr_has_entity_name = True
+        self._attr_unique_id = f"{self.unique_id_prefix}_{description.key}"
+        self._attr_native_value = hub.statistics.get(description.key)
+
+    @property
+    def available(self) -> bool:
+        """Return True, the statistics include the failed updates."""
+        return True
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state when the statistic changed."""
+        value = self.hub.statistics.get(self.entity_description.key)
+        if value != self._attr_native_value or self.hub.refresh_all:
+            self._attr_native_value = value
+            self.async_write_ha_state()
+
+
+class SolarEdgeFastSensor(SolarEdgeEntity, SensorEntity):
+    """Representation of a value of the hot set, read at the fast interval."""
+
+    def __init__(
+        self,
+        hub: SolaredgeModbusCoordinator,
+        fast: SolaredgeFastCoordinator,
+        description: SensorEntityDescription,
+    ) -> None:
+        """Init the sensor."""
+        super().__init__(hub, coordinator=fast)
+        self.fast = fast
+        self._key = description.key
+        self.entity_description = replace(
+            description, key=f"{description.key}_fast", name=f"{description.name} Fast"
+        )
+        self._attr_has_entity_name = True
+        self._attr_unique_id = f"{self.unique_id_prefix}_{self.entity_description.key}"
+
+    @property
+    def data_keys(self) -> tuple[str, ...]:
+        """Return the keys of the data the state of the sensor depends on."""
+        return (self._key,)
+
+    @property
+    def available(self) -> bool:
+        """Return True if the value was read by the last update."""
+        return self.fast.last_update_success and self._key in (self.fast.data or {})
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only when the value or availability changed."""
+        value = (self.fast.data or {}).get(self._key)
+        if (
+            value == self._attr_native_value
+            and self.available == self._published_available
         ):
-            self._attr_extra_state_attributes = self.hub.modbus_data["battery3_attrs"]
+            return
+        self._attr_native_value = value
+        self._published_available = self.available
+        self.async_write_ha_state()
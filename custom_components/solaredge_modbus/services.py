@@ -0,0 +1,123 @@
+"""Services of the SolarEdge Modbus integration."""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Any
+
+import voluptuous as vol
+
+from homeassistant.const import CONF_NAME
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+
+from .const import DOMAIN, STORAGE_NUMBER_TYPES, STORAGE_SELECT_TYPES
+from .writer import encode_registers
+
+if TYPE_CHECKING:
+    from . import SolaredgeModbusCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+SERVICE_SET_STORAGE_COMMAND = "set_storage_command"
+
+STORAGE_SELECTS = {description.key: description for description in STORAGE_SELECT_TYPES}
+STORAGE_NUMBERS = {description.key: description for description in STORAGE_NUMBER_TYPES}
+# Fields of the storage command service and the keys of the values they set
+STORAGE_COMMAND_FIELDS = {
+    "control_mode": "storage_contol_mode",
+    "ac_charge_policy": "storage_ac_charge_policy",
+    "ac_charge_limit": "storage_ac_charge_limit",
+    "backup_reserved": "storage_backup_reserved",
+    "default_mode": "storage_default_mode",
+    "remote_command_timeout": "storage_remote_command_timeout",
+    "remote_command_mode": "storage_remote_command_mode",
+    "remote_charge_limit": "storage_remote_charge_limit",
+    "remote_discharge_limit": "storage_remote_discharge_limit",
+}
+
+STORAGE_COMMAND_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        **{
+            vol.Optional(field): vol.In(
+                list(STORAGE_SELECTS[key].options_dict.values())
+            )
+            for field, key in STORAGE_COMMAND_FIELDS.items()
+            if key in STORAGE_SELECTS
+        },
+        **{
+            vol.Optional(field): vol.All(
+                vol.Coerce(float),
+                vol.Range(
+                    min=STORAGE_NUMBERS[key].attrs["min"],
+                    max=STORAGE_NUMBERS[key].attrs["max"],
+                ),
+            )
+            for field, key in STORAGE_COMMAND_FIELDS.items()
+            if key in STORAGE_NUMBERS
+        },
+    }
+)
+
+
+def storage_command_writes(data: dict[str, Any]) -> dict[int, list[int]]:
+    """Return the register writes of a storage command.
+
+    The writer reads the written registers back and publishes their values.
+    """
+    writes: dict[int, list[int]] = {}
+    for field, key in STORAGE_COMMAND_FIELDS.items():
+        if field not in data:
+            continue
+        value = data[field]
+        if key in STORAGE_SELECTS:
+            description = STORAGE_SELECTS[key]
+            modes = {option: mode for mode, option in description.options_dict.items()}
+            writes[description.register] = [modes[value]]
+        else:
+            description = STORAGE_NUMBERS[key]
+            if description.fmt != "f":
+                value = int(value)
+            writes[description.register] = encode_registers(description.fmt, value)
+    return writes
+
+
+def get_coordinator(hass: HomeAssistant, entry_id: str) -> SolaredgeModbusCoordinator:
+    """Return the coordinator of a loaded config entry."""
+    entry = hass.config_entries.async_get_entry(entry_id)
+    if (
+        entry is None
+        or entry.domain != DOMAIN
+        or entry.data[CONF_NAME] not in hass.data.get(DOMAIN, {})
+    ):
+        raise ServiceValidationError(f"No loaded {DOMAIN} entry {entry_id}")
+    return hass.data[DOMAIN][entry.data[CONF_NAME]]["hub"]
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+
+    async def async_set_storage_command(call: ServiceCall) -> None:
+        """Write the values of a storage command in one transaction."""
+        coordinator = get_coordinator(hass, call.data[ATTR_CONFIG_ENTRY_ID])
+        if not coordinator.has_battery:
+            raise ServiceValidationError(f"{coordinator.name} has no battery")
+        writes = storage_command_writes(call.data)
+        if not writes:
+            return
+        if not await coordinator.hub.writer.async_write_many(writes):
+            raise HomeAssistantError(
+                f"Could not write the storage command to {coordinator.name}"
+            )
+        _LOGGER.debug("Storage command written to %s: %s", coordinator.name, writes)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_STORAGE_COMMAND,
+        async_set_storage_command,
+        schema=STORAGE_COMMAND_SCHEMA,
+    )
@@ -0,0 +1,123 @@
+"""Compact snapshots of the decoded data of a SolarEdge unit.
+
+The keys of all values are known up front, so they are laid out once and
+each snapshot only holds a list of values. Entities bind to the index of
+their value when they are created.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, MutableMapping, Sequence
+from typing import Any
+
+
+class DataLayout:
+    """Fixed assignment of value keys to field indexes."""
+
+    __slots__ = ("_indexes", "keys")
+
+    def __init__(self, keys: Iterable[str]) -> None:
+        """Lay out the keys, ignoring duplicates."""
+        self.keys = tuple(dict.fromkeys(keys))
+        self._indexes = {key: index for index, key in enumerate(self.keys)}
+
+    def __len__(self) -> int:
+        """Return the number of fields."""
+        return len(self.keys)
+
+    def index(self, key: str) -> int:
+        """Return the field index of a key."""
+        return self._indexes[key]
+
+    def indexes(self, keys: Iterable[str]) -> tuple[int, ...]:
+        """Return the field indexes of keys."""
+        return tuple(self._indexes[key] for key in keys)
+
+
+class _Missing:
+    """Marks fields which have not been read yet."""
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+
+MISSING: Any = _Missing()
+
+
+class Snapshot(MutableMapping):
+    """The latest values of a unit, with a dict like view by key.
+
+    Values updated by field index are compared with the current value, the
+    indexes of the values that changed are collected in changed.
+    """
+
+    __slots__ = ("_extra", "changed", "layout", "values")
+
+    def __init__(self, layout: DataLayout) -> None:
+        """Initialize an empty snapshot."""
+        self.layout = layout
+        self.values: list[Any] = [MISSING] * len(layout)
+        self.changed: set[int] = set()
+        # Values of keys which are not part of the layout
+        self._extra: dict[str, Any] = {}
+
+    def get_field(self, index: int, default: Any = None) -> Any:
+        """Return the value of a field."""
+        value = self.values[index]
+        return default if value is MISSING else value
+
+    def update_fields(self, indexes: Sequence[int], values: Iterable[Any]) -> None:
+        """Update fields, recording the indexes of the values that changed."""
+        current = self.values
+        changed = self.changed
+        for index, value in zip(indexes, values):
+            if current[index] is MISSING or current[index] != value:
+                current[index] = value
+                changed.add(index)
+
+    def update_values(self, values: dict[str, Any]) -> None:
+        """Update values by key, recording the values that changed."""
+        self.update_fields(self.layout.indexes(values), values.values())
+
+    def __getitem__(self, key: str) -> Any:
+        """Return the value of key."""
+        try:
+            value = self.values[self.layout.index(key)]
+        except KeyError:
+            return self._extra[key]
+        if value is MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        """Set the value of key, without recording it as changed."""
+        try:
+            self.values[self.layout.index(key)] = value
+        except KeyError:
+            self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        """Remove the value of key."""
+        try:
+            index = self.layout.index(key)
+        except KeyError:
+            del self._extra[key]
+            return
+        if self.values[index] is MISSING:
+            raise KeyError(key)
+        self.values[index] = MISSING
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the keys which have a value."""
+        for key, value in zip(self.layout.keys, self.values):
+            if value is not MISSING:
+                yield key
+        yield from self._extra
+
+    def __len__(self) -> int:
+        """Return the number of keys which have a value."""
+        return len(self.values) - self.values.count(MISSING) + len(self._extra)
+
+    def __repr__(self) -> str:
+        """Return a representation of the values."""
+        return f"Snapshot({dict(self)!r})"
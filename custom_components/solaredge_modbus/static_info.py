@@ -0,0 +1,64 @@
+"""Stored static information of the units of the SolarEdge Modbus integration.
+
+The device information of every unit and the information of its batteries
+rarely change. They are kept in the storage of Home Assistant per config
+entry, so entities are set up from the stored copy without reading the
+registers first, also while the inverter is briefly unreachable. The stored
+copy is read again after STATIC_INFO_TTL.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+DATA_STATIC_INFO_CACHE = f"{DOMAIN}_static_info"
+STORAGE_KEY = f"{DOMAIN}.static_info"
+STORAGE_VERSION = 1
+# Seconds to wait for further changes before writing the storage
+STORAGE_SAVE_DELAY = 10
+
+# Seconds after which the static information is read from the unit again
+STATIC_INFO_TTL = 24 * 60 * 60
+
+
+class StaticInfoCache:
+    """Static information of the units of every config entry."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the cache."""
+        self._store: Store[dict[str, dict[str, dict[str, Any]]]] = Store(
+            hass, STORAGE_VERSION, STORAGE_KEY
+        )
+        self._entries: dict[str, dict[str, dict[str, Any]]] | None = None
+
+    async def async_get(self, entry_id: str) -> dict[str, dict[str, Any]]:
+        """Return the static information of the units of an entry by unit id."""
+        if self._entries is None:
+            self._entries = await self._store.async_load() or {}
+        return self._entries.get(entry_id, {})
+
+    async def async_set(self, entry_id: str, units: dict[str, dict[str, Any]]) -> None:
+        """Store the static information of the units of an entry."""
+        if self._entries is None:
+            self._entries = await self._store.async_load() or {}
+        self._entries[entry_id] = units
+        self._store.async_delay_save(lambda: self._entries, STORAGE_SAVE_DELAY)
+
+    async def async_remove(self, entry_id: str) -> None:
+        """Remove the static information of an entry."""
+        if self._entries is None:
+            self._entries = await self._store.async_load() or {}
+        if self._entries.pop(entry_id, None) is not None:
+            self._store.async_delay_save(lambda: self._entries, STORAGE_SAVE_DELAY)
+
+
+def get_static_info_cache(hass: HomeAssistant) -> StaticInfoCache:
+    """Return the static information cache of the integration."""
+    if DATA_STATIC_INFO_CACHE not in hass.data:
+        hass.data[DATA_STATIC_INFO_CACHE] = StaticInfoCache(hass)
+    return hass.data[DATA_STATIC_INFO_CACHE]
@@ -0,0 +1,128 @@
+"""SunSpec model discovery for the SolarEdge Modbus integration.
+
+The SunSpec registers start with the "SunS" marker at 40000, followed by a
+chain of models. Every model starts with its model id and the number of
+registers which follow, the chain ends with model id 0xFFFF. Walking the
+chain tells where the inverter and meter models are, the discovered models
+are kept in the storage of Home Assistant per serial number and firmware
+version, so they are only discovered once.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+SUNSPEC_BASE_ADDRESS = 40000
+# "SunS"
+SUNSPEC_MARKER = (0x5375, 0x6E53)
+SUNSPEC_END = 0xFFFF
+# Guards against a corrupt chain which never ends
+MAX_MODELS = 32
+
+INVERTER_MODELS = (101, 102, 103)
+METER_MODELS = (201, 202, 203, 204)
+
+DATA_MODEL_CACHE = f"{DOMAIN}_sunspec_models"
+STORAGE_KEY = f"{DOMAIN}.sunspec_models"
+STORAGE_VERSION = 1
+
+
+@dataclass(frozen=True)
+class SunSpecModel:
+    """A model in the SunSpec model chain."""
+
+    model_id: int
+    address: int
+    length: int
+
+    @property
+    def data_address(self) -> int:
+        """Return the address of the first register after the model header."""
+        return self.address + 2
+
+
+async def discover_models(
+    read: Callable[[int, int], Awaitable[Any]],
+) -> list[SunSpecModel] | None:
+    """Walk the SunSpec model chain.
+
+    :param read: Reads count registers at an address, returning the response
+    :returns: The models in chain order, None if the chain can not be read
+    """
+    response = await read(SUNSPEC_BASE_ADDRESS, 2)
+    if response.isError() or tuple(response.registers[:2]) != SUNSPEC_MARKER:
+        return None
+
+    models = []
+    address = SUNSPEC_BASE_ADDRESS + 2
+    for _ in range(MAX_MODELS):
+        response = await read(address, 2)
+        if response.isError():
+            return None
+        model_id, length = response.registers[:2]
+        if model_id == SUNSPEC_END:
+            return models
+        models.append(SunSpecModel(model_id, address, length))
+        address += 2 + length
+
+    _LOGGER.debug("SunSpec model chain has no end after %s models", MAX_MODELS)
+    return None
+
+
+def find_models(
+    models: list[SunSpecModel], model_ids: tuple[int, ...]
+) -> list[SunSpecModel]:
+    """Return the models with one of the model ids, in chain order."""
+    return [model for model in models if model.model_id in model_ids]
+
+
+class SunSpecModelCache:
+    """Discovered model chains, stored per serial number and firmware version."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the cache."""
+        self._store: Store[dict[str, list[list[int]]]] = Store(
+            hass, STORAGE_VERSION, STORAGE_KEY
+        )
+        self._models: dict[str, list[list[int]]] | None = None
+
+    @staticmethod
+    def key(device_info: dict[str, Any]) -> str:
+        """Return the key of the models of a device."""
+        return f"{device_info['serial_number']}_{device_info['version']}"
+
+    async def async_get(self, device_info: dict[str, Any]) -> list[SunSpecModel] | None:
+        """Return the stored models of a device."""
+        if self._models is None:
+            self._models = await self._store.async_load() or {}
+        if (models := self._models.get(self.key(device_info))) is None:
+            return None
+        return [SunSpecModel(*model) for model in models]
+
+    async def async_set(
+        self, device_info: dict[str, Any], models: list[SunSpecModel]
+    ) -> None:
+        """Store the models of a device."""
+        if self._models is None:
+            self._models = await self._store.async_load() or {}
+        self._models[self.key(device_info)] = [
+            [model.model_id, model.address, model.length] for model in models
+        ]
+        await self._store.async_save(self._models)
+
+
+def get_model_cache(hass: HomeAssistant) -> SunSpecModelCache:
+    """Return the SunSpec model cache of the integration."""
+    if DATA_MODEL_CACHE not in hass.data:
+        hass.data[DATA_MODEL_CACHE] = SunSpecModelCache(hass)
+    return hass.data[DATA_MODEL_CACHE]
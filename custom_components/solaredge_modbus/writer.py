@@ -0,0 +1,237 @@
+"""Coalesced register writes for the SolarEdge Modbus integration.
+
+Writes are held back for a short debounce delay. A later write to the same
+register replaces the pending one, e.g. while a slider is dragged, and
+pending writes to adjacent registers of the control block are sent in a
+single write multiple registers request. The written registers are read
+back right away, so the values the unit accepted are known without waiting
+for the next poll.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Iterable
+import logging
+from typing import TYPE_CHECKING, Any
+
+from pymodbus.exceptions import ModbusException
+
+from homeassistant.exceptions import HomeAssistantError
+
+from .payload import BinaryPayloadBuilder, Endian
+
+if TYPE_CHECKING:
+    from . import SolaredgeModbusHub
+
+_LOGGER = logging.getLogger(__name__)
+
+# Export and storage control registers, pending writes within this range are
+# merged when they are adjacent
+CONTROL_BLOCK_START = 0xE000
+CONTROL_BLOCK_END = 0xE012
+
+
+def encode_registers(fmt: str, value: float) -> list[int]:
+    """Encode a value of a control register format into registers.
+
+    :param fmt: The format of the value, "u16", "u32" or "f"
+    :param value: The value to encode
+    :raises ValueError: If the format is unknown
+    """
+    builder = BinaryPayloadBuilder(byteorder=Endian.BIG, wordorder=Endian.LITTLE)
+    if fmt == "u32":
+        builder.add_32bit_uint(int(value))
+    elif fmt == "u16":
+        builder.add_16bit_uint(int(value))
+    elif fmt == "f":
+        builder.add_32bit_float(float(value))
+    else:
+        raise ValueError(f"Invalid encoding format {fmt}")
+    return builder.to_registers()
+
+
+def in_control_block(address: int) -> bool:
+    """Return true if the register is part of the control block."""
+    return CONTROL_BLOCK_START <= address < CONTROL_BLOCK_END
+
+
+class RegisterWriter:
+    """Debounces and merges the register writes of one unit."""
+
+    def __init__(self, hub: SolaredgeModbusHub, debounce: float = 0) -> None:
+        """Initialize the writer.
+
+        :param hub: The hub of the unit written to
+        :param debounce: Seconds to wait for further writes before writing
+        """
+        self._hub = hub
+        self.debounce = debounce
+        # Pending register values of the control block by address, and
+        # pending writes of other registers by start address
+        self._control: dict[int, int] = {}
+        self._writes: dict[int, list[int]] = {}
+        self._waiters: list[tuple[frozenset[int], asyncio.Future[bool]]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self._lock = asyncio.Lock()
+        # Receives the values read back after writing
+        self.on_written: Callable[[dict[str, Any]], None] = (
+            hub.modbus_data.update_values
+        )
+
+    async def async_write(self, address: int, registers: list[int]) -> bool:
+        """Write registers after the debounce delay.
+
+        Returns True when the registers, or the values of later writes which
+        replaced them, were written.
+        """
+        future = self._queue({address: registers})
+        if self.debounce <= 0:
+            await self.flush()
+        else:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = asyncio.get_running_loop().call_later(
+                self.debounce, self._start_flush
+            )
+        return await future
+
+    async def async_write_many(self, writes: dict[int, list[int]]) -> bool:
+        """Write several values at once together with all pending writes.
+
+        Returns True when all registers were written.
+        """
+        future = self._queue(writes)
+        await self.flush()
+        return await future
+
+    def _queue(self, writes: dict[int, list[int]]) -> asyncio.Future[bool]:
+        """Add writes to the pending writes, returning the future of their result."""
+        addresses = set()
+        for address, registers in writes.items():
+            if in_control_block(address):
+                for offset, value in enumerate(registers):
+                    self._control[address + offset] = value
+            else:
+                self._writes[address] = list(registers)
+            addresses.update(range(address, address + len(registers)))
+        future: asyncio.Future[bool] = asyncio.get_running_loop().create_future()
+        self._waiters.append((frozenset(addresses), future))
+        return future
+
+    def _start_flush(self) -> None:
+        """Flush the pending writes once the debounce delay passed."""
+        self._timer = None
+        task = asyncio.get_running_loop().create_task(self.flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def flush(self) -> None:
+        """Write all pending writes, adjacent control registers at once."""
+        async with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            writes = [*merge_registers(self._control), *self._writes.items()]
+            waiters = self._waiters
+            self._control = {}
+            self._writes = {}
+            self._waiters = []
+
+            failed: set[int] = set()
+            outcome: BaseException | None = None
+            try:
+                for address, registers in sorted(writes):
+                    addresses = set(range(address, address + len(registers)))
+                    try:
+                        if not await self._write(address, registers):
+                            failed.update(addresses)
+                    except (
+                        HomeAssistantError,
+                        ModbusException,
+                        OSError,
+                        TimeoutError,
+                    ) as error:
+                        # Pass the error on to the callers of the failed registers
+                        for waited, future in waiters:
+                            if not future.done() and not waited.isdisjoint(addresses):
+                                future.set_exception(error)
+                        failed.update(addresses)
+
+                written = [
+                    (address, registers)
+                    for address, registers in writes
+                    if failed.isdisjoint(range(address, address + len(registers)))
+                ]
+                if written and (values := await self._hub.read_back(written)):
+                    self.on_written(values)
+            except BaseException as error:
+                outcome = error
+                raise
+            finally:
+                # Every caller gets a result or the error, instead of waiting
+                # forever
+                for waited, future in waiters:
+                    if future.done():
+                        continue
+                    if isinstance(outcome, asyncio.CancelledError):
+                        future.cancel()
+                    elif outcome is not None:
+                        future.set_exception(outcome)
+                    else:
+                        future.set_result(waited.isdisjoint(failed))
+
+    async def async_close(self) -> None:
+        """Cancel the pending writes, e.g. when the config entry is unloaded.
+
+        A flush after the connection was released would connect it again.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._control = {}
+        self._writes = {}
+        for _, future in self._waiters:
+            future.cancel()
+        self._waiters = []
+
+    async def _write(self, address: int, registers: list[int]) -> bool:
+        """Write registers in one request, returning True on success."""
+        unit = self._hub.get_unit()
+        if len(registers) == 1:
+            response = await self._hub.write_register(
+                unit=unit, address=address, payload=registers[0]
+            )
+        else:
+            response = await self._hub.write_registers(
+                unit=unit, address=address, payload=registers
+            )
+        if response.isError():
+            _LOGGER.debug(
+                "Writing %s registers at %s to unit %s failed: %s",
+                len(registers),
+                address,
+                unit,
+                response,
+            )
+            return False
+        return True
+
+
+def merge_registers(values: dict[int, int]) -> Iterable[tuple[int, list[int]]]:
+    """Merge register values by address into runs of adjacent registers."""
+    run: list[int] = []
+    start = 0
+    for address in sorted(values):
+        if run and address != start + len(run):
+            yield start, run
+            run = []
+        if not run:
+            start = address
+        run.append(values[address])
+    if run:
+        yield start, run
@@ -0,0 +1,144 @@
+"""Tests of the decode path on the captured register blocks of a fixture.
+
+The fixture of the benchmarks is served by an in-process connection, so no
+inverter is needed. The decoded values are compared with the values stored in
+tests/fixtures, which have to be updated when a change of the decoded values is
+intended.
+"""
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from benchmarks.bench_decode import (
+    DEFAULT_FIXTURE,
+    FixtureConnection,
+    create_coordinator,
+    payload_decode_inverter,
+    payload_decode_many_inverter,
+    payload_decode_many_storage,
+    payload_decode_storage,
+)
+from custom_components.solaredge_modbus import (
+    DATA_LAYOUT,
+    INVERTER_BLOCK,
+    INVERTER_DECODER,
+    METER_DECODERS,
+    SolaredgeModbusHub,
+)
+from custom_components.solaredge_modbus.planner import DEFAULT_MAX_READ_GAP
+from custom_components.solaredge_modbus.snapshot import Snapshot
+
+EXPECTED = Path(__file__).parent / "fixtures" / DEFAULT_FIXTURE.name
+
+
+@pytest.fixture
+def fixture():
+    """Return the captured register blocks."""
+    return json.loads(DEFAULT_FIXTURE.read_text())
+
+
+@pytest.fixture
+def blocks(fixture):
+    """Return the registers of the captured blocks by key."""
+    return {block["key"]: block["registers"] for block in fixture["blocks"]}
+
+
+def register_bytes(registers) -> memoryview:
+    """Return registers as the register bytes of a pipelined response."""
+    return memoryview(b"".join(value.to_bytes(2, "big") for value in registers))
+
+
+def test_poll_cycle_decodes_the_stored_values(fixture):
+    """A poll cycle of all tiers decodes the values stored for the fixture."""
+    coordinator = create_coordinator(fixture, FixtureConnection(fixture))
+
+    assert asyncio.run(coordinator.read_modbus_data())
+
+    assert all(coordinator.hub.block_available.values())
+    assert json.loads(json.dumps(dict(coordinator.hub.modbus_data))) == (
+        json.loads(EXPECTED.read_text())
+    )
+
+
+def test_block_decoder_matches_payload_decoder(blocks):
+    """The block decoder agrees with decoding value by value."""
+    expected = INVERTER_DECODER.decode(blocks["inverter"])
+
+    assert payload_decode_inverter(blocks["inverter"]) == expected
+    assert payload_decode_many_inverter(blocks["inverter"]) == expected
+    assert payload_decode_many_storage(blocks["storage"]) == payload_decode_storage(
+        blocks["storage"]
+    )
+
+
+def test_block_decoder_decodes_register_bytes(blocks):
+    """Register bytes decode to the same values as the registers."""
+    assert INVERTER_DECODER.decode(
+        register_bytes(blocks["inverter"])
+    ) == INVERTER_DECODER.decode(blocks["inverter"])
+
+
+def test_block_decoder_rejects_short_blocks(blocks):
+    """A response with too few registers fails to decode."""
+    with pytest.raises(ValueError):
+        INVERTER_DECODER.decode(blocks["inverter"][:-1])
+    with pytest.raises(ValueError):
+        INVERTER_DECODER.decode(register_bytes(blocks["inverter"][:-1]))
+
+
+@pytest.mark.parametrize(
+    ("decoder", "block_key", "keys"),
+    [
+        (INVERTER_DECODER, "inverter", {"acpower", "status"}),
+        (INVERTER_DECODER, "inverter", {"acpower", "tempsink", "acenergy"}),
+        (METER_DECODERS["m1_"][0], "m1", {"m1_acpower", "m1_accurrent"}),
+    ],
+)
+def test_subset_decodes_the_values_of_the_block(blocks, decoder, block_key, keys):
+    """The parts of a subset decode the values like the whole block."""
+    expected = decoder.decode(blocks[block_key])
+    values = {}
+    for offset, subset in decoder.subset(keys, DEFAULT_MAX_READ_GAP):
+        values.update(subset.decode(blocks[block_key][offset : offset + subset.count]))
+
+    assert values == {key: expected[key] for key in keys}
+
+
+def test_block_parts_follow_the_enabled_keys(fixture):
+    """Only the registers of the enabled keys and their scale factors are read."""
+    hub = SolaredgeModbusHub(FixtureConnection(fixture), fixture["unit"])
+
+    assert hub.block_parts(INVERTER_BLOCK) == ((INVERTER_BLOCK, INVERTER_DECODER),)
+
+    hub.enabled_keys = frozenset({"acpower"})
+    ((part, decoder),) = hub.block_parts(INVERTER_BLOCK)
+    assert part.key == INVERTER_BLOCK.key
+    assert part.count == 2
+    assert decoder.keys == ("acpower",)
+
+
+def test_snapshot_tracks_changed_fields():
+    """Only fields whose value changed are marked as changed."""
+    snapshot = Snapshot(DATA_LAYOUT)
+    snapshot.update_values({"acpower": 1000, "status": 4})
+    snapshot.changed.clear()
+
+    snapshot.update_values({"acpower": 1200, "status": 4})
+
+    assert snapshot.changed == {DATA_LAYOUT.index("acpower")}
+    assert snapshot["acpower"] == 1200
+    assert snapshot.get_field(DATA_LAYOUT.index("status")) == 4
+
+
+def test_snapshot_keeps_values_outside_the_layout():
+    """Keys which are not laid out are kept as well."""
+    snapshot = Snapshot(DATA_LAYOUT)
+    snapshot["not_laid_out"] = 1
+
+    assert snapshot["not_laid_out"] == 1
+    assert "not_laid_out" in snapshot
+    del snapshot["not_laid_out"]
+    assert "not_laid_out" not in snapshot